@@ -1,137 +1,823 @@
+import json
+import time
 import numpy as np
 import scipy as sp
 import cvxpy as cp
-from quanestimation.Common.Common import suN_generator
-from quanestimation.AsymptoticBound.CramerRao import QFIM
+from functools import lru_cache
+from quanestimation.Common.Common import suN_stack, suN_structure
+from quanestimation.AsymptoticBound.CramerRao import QFIM, FisherContext, _context, _dense
 from numpy.linalg import matrix_rank
 
 
-def HCRB(rho, drho, W, eps=1e-8):
-    """
+def HCRB(rho, drho=None, W=None, eps=1e-8, method="cvxpy", tol=1e-6, max_iter=1000, result=False, verbose=True):
+    r"""
     Calculation of the Holevo Cramer-Rao bound (HCRB) via the semidefinite program (SDP).
+    If the numerical rank $r$ of the density matrix is smaller than its dimension $d$, 
+    the SDP is formulated on the Hermitian operators with at least one index in 
+    the support of $\rho$, whose dimension is $2rd-r^2$ instead of $d^2$, see 
+    `HCRBSolver`.
 
     Parameters
     ----------
-    > **rho:** `matrix`
-        -- Density matrix.
+    > **rho:** `matrix or FisherContext`
+        -- Density matrix or a `FisherContext` whose cached quantities are reused.
 
     > **drho:** `list`
         -- Derivatives of the density matrix on the unknown parameters to be 
         estimated. For example, drho[0] is the derivative vector on the first 
-        parameter.
+        parameter. It is not needed if rho is a `FisherContext`.
 
     > **W:** `matrix`
         -- Weight matrix.
 
     > **eps:** `float`
-        -- Machine epsilon.
+        -- Machine epsilon. The eigenvalues of rho larger than eps define its support.
+
+    > **method:** `string`
+        -- Options are:  
+        "cvxpy" (default) -- The SDP is solved by cvxpy.  
+        "native" -- The dual problem is solved by the projected gradient ascent 
+        in NumPy, see `HCRBSolver`.
+
+    > **tol:** `float`
+        -- Tolerance of the relative duality gap for `method="native"`.
+
+    > **max_iter:** `int`
+        -- The maximum number of iterations for `method="native"`.
+
+    > **result:** `bool`
+        -- Whether or not to return a `SDPResult` with the solver information 
+        instead of the value.
+
+    > **verbose:** `bool`
+        -- Whether or not to print the notes in the single parameter scenario 
+        and for the rank-one weight matrix.
 
     Returns
     ----------
-    **HCRB:** `float`
+    **HCRB:** `float or SDPResult`
         -- The value of Holevo Cramer-Rao bound.
     """
 
-    if type(drho) != list:
+    if not isinstance(rho, FisherContext) and type(drho) != list:
         raise TypeError("Please make sure drho is a list!")
 
+    ctx = _context(rho, drho)
+    rho, drho = ctx.rho, ctx.drho
+
     if len(drho) == 1:
-        print(
-            "In single parameter scenario, HCRB is equivalent to QFI. This function will return the value of QFI."
-        )
-        f = QFIM(rho, drho, eps=eps)
+        if verbose:
+            print(
+                "In single parameter scenario, HCRB is equivalent to QFI. This function will return the value of QFI."
+            )
+        start = time.perf_counter()
+        f = QFIM(ctx, eps=eps)
+        if result:
+            return SDPResult(f, "optimal", "QFIM", 0.0, time.perf_counter() - start)
         return f
     elif matrix_rank(W) == 1:
-        print(
-            "For rank-one weight matrix, the HCRB is equivalent to QFIM. This function will return the value of Tr(WF^{-1})."
-        )
-        F = QFIM(rho, drho, eps=eps)
-        return np.trace(np.dot(W, np.linalg.pinv(F)))
+        if verbose:
+            print(
+                "For rank-one weight matrix, the HCRB is equivalent to QFIM. This function will return the value of Tr(WF^{-1})."
+            )
+        start = time.perf_counter()
+        F = QFIM(ctx, eps=eps)
+        value = np.trace(np.dot(W, np.linalg.pinv(F)))
+        if result:
+            return SDPResult(value, "optimal", "QFIM", 0.0, time.perf_counter() - start)
+        return value
     else:
         dim = len(rho)
-        num = dim * dim
-        para_num = len(drho)
-
-        Lambda = [np.identity(dim)] + suN_generator(dim)
-        Lambda = Lambda / np.sqrt(2)
-
-        vec_drho = [[] for i in range(para_num)]
-        for pi in range(para_num):
-            vec_drho[pi] = np.array(
-                [
-                    np.real(np.trace(np.dot(drho[pi], Lambda[i])))
-                    for i in range(len(Lambda))
-                ]
-            )
+        rank = int(np.sum(ctx.eig[0] > eps))
+        # the support-reduced formulation needs a vanishing kernel block of drho
+        if rank == dim or not _HCRB_support_check(ctx, rank, eps):
+            rank = None
+        solver = HCRBSolver(dim, len(drho), W, eps, rank, None, method, tol, max_iter)
+        return solver.solve(ctx, result=result)
+
+
+class HCRBSolver:
+    r"""
+    Reusable semidefinite program of the Holevo Cramer-Rao bound (HCRB). The matrix 
+    $R$ with $S=R^{\dagger}R$ and the vectorized derivatives of the density matrix 
+    are declared as `cvxpy.Parameter` in a DPP-compliant formulation, so that the 
+    problem is canonicalized once and only the parameter values are updated for 
+    each new state. With `solve(..., warm_start=True)` the solution of the previous 
+    call is passed to the solver as the initial point if the solver supports warm 
+    starts (for example SCS). A solver keeps the state of its last call, so an 
+    instance should not be shared between threads.
+
+    If the rank $r$ is set, the problem is restricted to the Hermitian operators 
+    $X$ with at least one index in the support of $\rho$. In the eigenbasis of 
+    $\rho=\sum_{i<r}\lambda_i|\lambda_i\rangle\langle\lambda_i|$ the entries 
+    $\langle\lambda_i|X|\lambda_j\rangle$ with $i,j\geq r$ neither enter 
+    $\mathrm{Tr}(\rho X_aX_b)$ nor the constraints (the kernel block of 
+    $\partial_a\rho$ vanishes for a family of states with a fixed rank), so the 
+    basis has $2rd-r^2$ elements and $S=R^{\dagger}R$ with $R$ built from the 
+    columns of the basis in the support, an $O(rd)$-sized SDP. `solve` raises a 
+    ValueError if rho has more than r eigenvalues above eps or the kernel block of 
+    $\partial_a\rho$ does not vanish, since the reduced problem does not give the 
+    HCRB in these cases.
+
+    With `method="native"` cvxpy is not used. The constraint $V\geq Z(X)$ with 
+    $Z_{ab}(X)=\mathrm{Tr}(\rho X_aX_b)$ is dualized with the multiplier 
+    $W^{1/2}(\openone+iK)W^{1/2}\geq 0$, $K$ a real antisymmetric matrix with 
+    $\|K\|\leq 1$, and the concave dual function (an equality-constrained 
+    quadratic program in $X$) is maximized by the projected gradient ascent. The 
+    minimizer $X$ of every step gives the feasible primal value 
+    $\mathrm{Tr}(W\mathrm{Re}Z)+\|W^{1/2}\mathrm{Im}Z W^{1/2}\|_1$, the iteration 
+    stops when the duality gap is below tol and $K$ is kept as the warm start of 
+    the next call with `warm_start=True`. The duality gap, the number of iterations and the status of the 
+    last call are stored in the attributes `gap`, `num_iters` and `status`.
+
+    Parameters
+    ----------
+    > **dim:** `int`
+        -- The dimension of the density matrix.
+
+    > **para_num:** `int`
+        -- The number of the unknown parameters.
+
+    > **W:** `matrix`
+        -- Weight matrix.
+
+    > **eps:** `float`
+        -- Machine epsilon.
+
+    > **rank:** `int`
+        -- The rank of the density matrices. The support-reduced formulation is 
+        used if it is smaller than dim, the largest rank eigenvalues of rho are 
+        taken as its support.
+
+    > **solver:** `string`
+        -- The solver of cvxpy. The default solver of cvxpy is used if it is not set.
 
-        S = np.zeros((num, num), dtype=np.complex128)
-        for a in range(num):
-            for b in range(num):
-                S[a][b] = np.trace(np.dot(Lambda[a], np.dot(Lambda[b], rho)))
+    > **method:** `string`
+        -- Options are:  
+        "cvxpy" (default) -- The SDP is solved by cvxpy.  
+        "native" -- The dual problem is solved by the projected gradient ascent.
 
-        accu = len(str(int(1 / eps))) - 1
-        lu, d, perm = sp.linalg.ldl(S.round(accu))
-        R = np.dot(lu, sp.linalg.sqrtm(d)).conj().T
+    > **tol:** `float`
+        -- Tolerance of the relative duality gap for `method="native"`.
+
+    > **max_iter:** `int`
+        -- The maximum number of iterations for `method="native"`.
+    """
+
+    def __init__(self, dim, para_num, W, eps=1e-8, rank=None, solver=None, method="cvxpy", tol=1e-6, max_iter=1000):
+        if method not in ["cvxpy", "native"]:
+            raise ValueError("{!r} is not a valid value for method, supported values are 'cvxpy' and 'native'.".format(method))
+
+        self.dim = dim
+        self.para_num = para_num
+        self.W = np.asarray(W, dtype=np.float64)
+        self.eps = eps
+        self.rank = None if rank is None or rank >= dim else rank
+        self.solver = solver
+        self.method = method
+        self.tol = tol
+        self.max_iter = max_iter
+        self.K = None
+        self.gap, self.num_iters, self.status = None, None, None
+        if method == "native":
+            return
+
+        if self.rank is None:
+            num = dim * dim
+            row = num
+        else:
+            num = 2 * self.rank * dim - self.rank**2
+            row = min(dim * self.rank, num)
+        self.R = cp.Parameter((row, num), complex=True)
+        self.vec_drho = cp.Parameter((para_num, num))
         # ============optimization variables================
         V = cp.Variable((para_num, para_num))
         X = cp.Variable((num, para_num))
         # ================add constraints===================
-        constraints = [cp.bmat([[V, X.T @ R.conj().T], [R @ X, np.identity(num)]]) >> 0]
-        for i in range(para_num):
-            for j in range(para_num):
-                if i == j:
-                    constraints += [X[:, i].T @ vec_drho[j] == 1]
-                else:
-                    constraints += [X[:, i].T @ vec_drho[j] == 0]
+        constraints = [
+            cp.bmat([[V, X.T @ self.R.H], [self.R @ X, np.identity(row)]]) >> 0,
+            X.T @ self.vec_drho.T == np.identity(para_num),
+        ]
+        self.problem = cp.Problem(cp.Minimize(cp.trace(self.W @ V)), constraints)
+        self._X, self._V = X, V
 
-        prob = cp.Problem(cp.Minimize(cp.trace(W @ V)), constraints)
-        prob.solve()
+    def solve(self, rho, drho=None, result=False, warm_start=False):
+        """
+        Calculation of the HCRB for a new state.
 
-        return prob.value
+        Parameters
+        ----------
+        > **rho:** `matrix or FisherContext`
+            -- Density matrix or a `FisherContext`.
 
-def NHB(rho, drho, W):
-    """
+        > **drho:** `list`
+            -- Derivatives of the density matrix on the unknown parameters to be 
+            estimated. It is not needed if rho is a `FisherContext`.
+
+        > **result:** `bool`
+            -- Whether or not to return a `SDPResult` instead of the value.
+
+        > **warm_start:** `bool`
+            -- Whether or not to start from the solution of the previous call of this 
+            solver. If it is False (default) the result does not depend on the 
+            previous calls.
+
+        Returns
+        ----------
+        **HCRB:** `float or SDPResult`
+            -- The value of Holevo Cramer-Rao bound.
+        """
+        ctx = _context(rho, drho)
+        if len(ctx.rho) != self.dim or ctx.para_num != self.para_num:
+            raise ValueError("Please make sure the dimension of rho and the length of drho are {} and {}!".format(self.dim, self.para_num))
+
+        if self.rank is not None and not _HCRB_support_check(ctx, self.rank, self.eps):
+            raise ValueError("Please make sure rho has the rank {} and the derivatives vanish on its kernel!".format(self.rank))
+
+        start = time.perf_counter()
+        if self.rank is None:
+            S = _HCRB_S(_dense(ctx.rho))
+            vec_drho = _HCRB_vec(ctx.drho, self.dim)
+        else:
+            R, vec_drho = _HCRB_support(ctx.eig[0], ctx.drho_eig, self.rank)
+
+        if self.method == "native":
+            if self.rank is not None:
+                S = R.conj().T @ R
+            setup_time = time.perf_counter() - start
+            start = time.perf_counter()
+            K = self.K if warm_start else None
+            value, X, V, self.K, self.gap, self.num_iters, converged = _HCRB_native(
+                S, vec_drho, self.W, K, self.tol, self.max_iter
+            )
+            solve_time = time.perf_counter() - start
+            self.status = "optimal" if converged else "max_iter"
+            solver_name, residuals = "projected gradient", None
+        else:
+            if self.rank is None:
+                accu = len(str(int(1 / self.eps))) - 1
+                lu, d, perm = sp.linalg.ldl(S.round(accu))
+                # sqrtm may return an extended precision array which cvxpy casts to real
+                R = np.asarray(np.dot(lu, sp.linalg.sqrtm(d)).conj().T, dtype=np.complex128)
+            self.R.value = R
+            self.vec_drho.value = vec_drho
+            setup_time = time.perf_counter() - start
+            start = time.perf_counter()
+            self.problem.solve(solver=self.solver, warm_start=warm_start)
+            setup_time, solve_time = _cvxpy_time(self.problem, setup_time, time.perf_counter() - start)
+            value, X, V = self.problem.value, self._X.value, self._V.value
+            stats = self.problem.solver_stats
+            self.status, self.num_iters, self.gap = self.problem.status, stats.num_iters, None
+            solver_name, residuals = stats.solver_name, (_violation(self.problem), None)
+
+        if result == False:
+            return value
+        if X is not None:
+            X = _HCRB_operators(X, ctx.eig[1], self.rank)
+        return SDPResult(
+            value, self.status, solver_name, setup_time, solve_time, 
+            self.num_iters, residuals, self.gap, X, V,
+        )
+
+
+@lru_cache(maxsize=None)
+def _HCRB_basis(dim):
+    # {I, lambda_1, ..., lambda_{d^2-1}}/sqrt(2) stacked with the shape (d^2, d, d)
+    Lambda = np.concatenate([np.identity(dim)[None], suN_stack(dim)]) / np.sqrt(2)
+    Lambda.flags.writeable = False
+    return Lambda
+
+
+def _HCRB_vec(drho, dim):
+    # vec_drho[a, i] = Tr(drho_a Lambda_i)
+    drho = np.array([_dense(drho_i) for drho_i in drho])
+    return np.real(np.einsum("aij,kji->ak", drho, _HCRB_basis(dim)))
+
+
+def _HCRB_S(rho):
+    # S_ab = Tr(Lambda_a Lambda_b rho) from the Bloch vector r_c = Tr(lambda_c rho):
+    # S_00 = Tr(rho)/2, S_0a = S_a0 = r_a/2 and 
+    # S_ab = delta_ab Tr(rho)/d + sum_c t_abc r_c/2 with t_abc = Tr(lambda_a lambda_b lambda_c)/2
+    dim = len(rho)
+    num = dim * dim
+    tr = np.trace(rho)
+    r = np.einsum("cij,ji->c", suN_stack(dim), rho)
+    S = np.zeros((num, num), dtype=np.complex128)
+    S[0, 0] = 0.5 * tr
+    S[0, 1:] = 0.5 * r
+    S[1:, 0] = 0.5 * r
+    S[1:, 1:] = (suN_structure(dim) @ r).reshape(num - 1, num - 1) * 0.5
+    S[1:, 1:] += np.identity(num - 1) * tr / dim
+    return S
+
+
+def _HCRB_support_check(ctx, rank, eps):
+    # rho has at most rank eigenvalues above eps and the block of drho on the 
+    # kernel (the first eigenvectors in the ascending order) vanishes
+    kernel = len(ctx.rho) - rank
+    if np.any(ctx.eig[0][:kernel] > eps):
+        return False
+    return np.abs(np.asarray(ctx.drho_eig)[:, :kernel, :kernel]).max() <= eps
+
+
+def _HCRB_support(val, drho_eig, rank):
+    # Hermitian basis G_k with at least one index in the support (the first rank 
+    # eigenvectors after sorting in the descending order): E_ii, (E_ij+E_ji)/sqrt(2) 
+    # and i(E_ij-E_ji)/sqrt(2) for i < rank and i < j. With M_k = G_k[:, :rank]*sqrt(lambda),
+    # S_kl = Tr(rho G_k G_l) = vec(M_k)^dagger vec(M_l), i.e., R = vec(M)^T.
+    val = np.asarray(val[::-1][:rank], dtype=np.float64)
+    D = np.asarray(drho_eig[..., ::-1, ::-1], dtype=np.complex128)
+    dim = D.shape[-1]
+
+    i, j = np.triu_indices(dim)
+    idx = i < rank
+    i, j = i[idx], j[idx]
+    off = i < j
+    i_d, i_o, j_o = i[~off], i[off], j[off]
+    n_d, n_o = len(i_d), len(i_o)
+    num = n_d + 2 * n_o
+    k_s = n_d + np.arange(n_o)
+    k_a = k_s + n_o
+    c = 1 / np.sqrt(2)
+    s = np.sqrt(np.maximum(val, 0.0))
+
+    M = np.zeros((num, dim, rank), dtype=np.complex128)
+    M[np.arange(n_d), i_d, i_d] = s[i_d]
+    # the entries (j, i) are in the columns of the support
+    M[k_s, j_o, i_o] = c * s[i_o]
+    M[k_a, j_o, i_o] = -1j * c * s[i_o]
+    # the entries (i, j) only if j is in the support
+    supp = j_o < rank
+    M[k_s[supp], i_o[supp], j_o[supp]] = c * s[j_o[supp]]
+    M[k_a[supp], i_o[supp], j_o[supp]] = 1j * c * s[j_o[supp]]
+    R = M.reshape(num, dim * rank).T
+    if R.shape[0] > num:
+        R = np.linalg.qr(R, mode="r")
+
+    # Tr(drho_a G_k)
+    vec_drho = np.concatenate(
+        [
+            np.real(D[:, i_d, i_d]),
+            np.sqrt(2) * np.real(D[:, i_o, j_o]),
+            np.sqrt(2) * np.imag(D[:, i_o, j_o]),
+        ],
+        axis=1,
+    )
+    return R, vec_drho
+
+
+def _HCRB_native(S, vec_drho, W, K, tol, max_iter):
+    # projected gradient ascent on the dual function
+    # g(K) = min_X Re Tr[Lambda Z(X)] s.t. X^T vec_drho^T = I, Lambda = W + i W^{1/2} K W^{1/2}, 
+    # over the real antisymmetric K with the spectral norm not larger than one
+    para_num, num = vec_drho.shape
+    val, vec = np.linalg.eigh(W)
+    W_half = (vec * np.sqrt(np.maximum(val, 0.0))) @ vec.T
+    S_re, S_im = np.real(S), np.imag(S)
+
+    # KKT system of the quadratic program in vec(X) = [x_1; ...; x_P]
+    n = para_num * num
+    KKT = np.zeros((n + para_num**2, n + para_num**2))
+    C = np.kron(np.identity(para_num), vec_drho)
+    KKT[:n, n:] = C.T
+    KKT[n:, :n] = C
+    rhs = np.zeros(n + para_num**2)
+    rhs[n:] = np.identity(para_num).reshape(-1)
+
+    def dual(K):
+        Lambda_im = W_half @ K @ W_half
+        KKT[:n, :n] = np.kron(W, S_re) + np.kron(Lambda_im, S_im)
+        try:
+            x = np.linalg.solve(KKT, rhs)
+        except np.linalg.LinAlgError:
+            x = np.linalg.lstsq(KKT, rhs, rcond=None)[0]
+        X = x[:n].reshape(para_num, num).T
+        Z = X.T @ S @ X
+        g = np.real(np.trace(W @ Z)) + np.sum(Lambda_im * np.imag(Z))
+        grad = W_half @ np.imag(Z) @ W_half
+        # Tr(W Re Z) + ||W^{1/2} Im Z W^{1/2}||_1 is the optimal V for this X
+        f = np.real(np.trace(W @ Z)) + np.sum(np.linalg.svd(grad, compute_uv=False))
+        return g, grad, f, X, Z
+
+    def project(K):
+        U, s, Vh = np.linalg.svd(K)
+        K = (U * np.minimum(s, 1.0)) @ Vh
+        return (K - K.T) / 2
+
+    K = np.zeros((para_num, para_num)) if K is None else K
+    g, grad, f, X, Z = dual(K)
+    step = 1.0
+    converged = f - g <= tol * max(1.0, abs(f))
+    num_iters = 0
+    while not converged and num_iters < max_iter:
+        num_iters += 1
+        # backtracking on the quadratic lower model of the concave dual function
+        while True:
+            K_new = project(K + step * grad)
+            g_new, grad_new, f_new, X_new, Z_new = dual(K_new)
+            dK = K_new - K
+            if g_new >= g + np.sum(grad * dK) - np.sum(dK**2) / (2 * step) or step < 1e-12:
+                break
+            step /= 2
+        K, g, grad = K_new, g_new, grad_new
+        if f_new < f:
+            f, X, Z = f_new, X_new, Z_new
+        step *= 2
+        converged = f - g <= tol * max(1.0, abs(f))
+
+    # V = Re Z + W^{-1/2}|W^{1/2} Im Z W^{1/2}|W^{-1/2} attains the primal value
+    W_half_inv = np.linalg.pinv(W_half)
+    val, vec = np.linalg.eigh(1j * (W_half @ np.imag(Z) @ W_half))
+    V = np.real(Z) + W_half_inv @ np.real((vec * np.abs(val)) @ vec.conj().T) @ W_half_inv
+    return f, X, V, K, f - g, num_iters, converged
+
+
+def NHB(rho, drho=None, W=None, method="cvxpy", tol=1e-4, max_iter=10000, result=False):
+    r"""
     Calculation of the Nagaoka-Hayashi bound (NHB) via the semidefinite program (SDP).
 
     Parameters
     ----------
-    > **rho:** `matrix`
-        -- Density matrix.
+    > **rho:** `matrix or FisherContext`
+        -- Density matrix or a `FisherContext` whose cached quantities are reused.
 
     > **drho:** `list`
         -- Derivatives of the density matrix on the unknown parameters to be 
         estimated. For example, drho[0] is the derivative vector on the first 
-        parameter.
+        parameter. It is not needed if rho is a `FisherContext`.
 
     > **W:** `matrix`
         -- Weight matrix.
 
+    > **method:** `string`
+        -- Options are:  
+        "cvxpy" (default) -- The SDP is solved by cvxpy.  
+        "native" -- The SDP is solved by the alternating direction method of 
+        multipliers (ADMM) in NumPy, see `NHBSolver`.
+
+    > **tol:** `float`
+        -- Tolerance of the relative residuals for `method="native"`.
+
+    > **max_iter:** `int`
+        -- The maximum number of iterations for `method="native"`.
+
+    > **result:** `bool`
+        -- Whether or not to return a `SDPResult` with the solver information 
+        instead of the value.
+
     Returns
     ----------
-    **NHB:** `float`
+    **NHB:** `float or SDPResult`
         -- The value of Nagaoka-Hayashi bound.
     """
-    dim = len(rho)
-    para_num = len(drho)
-    
-    L_tp = [[[] for i in range(para_num)] for j in range(para_num)]
-    for para_i in range(para_num):
-        for para_j in range(para_i, para_num):
-            L_tp[para_i][para_j] = cp.Variable((dim, dim), hermitian=True)
-            L_tp[para_j][para_i] = L_tp[para_i][para_j]
-    L = cp.vstack([cp.hstack(L_tp[i]) for i in range(para_num)])
-    X = [cp.Variable((dim, dim), hermitian=True) for j in range(para_num)]
-    
-    constraints = [cp.bmat([[L, cp.vstack(X)], [cp.hstack(X), np.identity(dim)]])  >> 0]
-    
-    for i in range(para_num):
-        constraints += [cp.trace(X[i] @ rho) == 0]
-        for j in range(para_num):
-            if i == j:
-                constraints += [cp.trace(X[i] @ drho[j]) == 1]
-            else:
-                constraints += [cp.trace(X[i] @ drho[j]) == 0]
-    prob = cp.Problem(cp.Minimize(cp.real(cp.trace(cp.kron(W, rho) @ L))), constraints)
-    prob.solve()
-
-    return prob.value
+    if isinstance(rho, FisherContext):
+        rho, drho = rho.rho, rho.drho
+
+    solver = NHBSolver(len(rho), len(drho), W, None, method, tol, max_iter)
+    return solver.solve(rho, drho, result=result)
+
+
+class NHBSolver:
+    r"""
+    Reusable semidefinite program of the Nagaoka-Hayashi bound (NHB). The density 
+    matrix and its derivatives are declared as `cvxpy.Parameter` and the objective 
+    $\mathrm{Tr}[(W\otimes\rho)\mathbb{L}]$ is written blockwise as 
+    $\sum_{ab}W_{ab}\mathrm{Tr}(\rho\mathbb{L}_{ba})$, which keeps the problem 
+    DPP-compliant. The problem is canonicalized once and with 
+    `solve(..., warm_start=True)` the solution of the previous call is used as the 
+    initial point if the solver supports warm starts. A solver keeps the state of 
+    its last call, so an instance should not be shared between threads.
+
+    With `method="native"` the SDP $\min\,\mathrm{Tr}(CY)$ over the positive 
+    semidefinite $Y=\begin{pmatrix}\mathbb{L} & \mathbb{X}\\ \mathbb{X}^{\dagger} & \openone
+    \end{pmatrix}$ satisfying the affine constraints is solved by the alternating 
+    direction method of multipliers (ADMM) in NumPy. The projection onto the affine 
+    set acts blockwise (Hermitian and symmetric blocks of $\mathbb{L}$, Hermitian 
+    $X_a$ with the constraints on $\mathrm{Tr}(\rho X_a)$ and $\mathrm{Tr}(\partial_b\rho X_a)$), 
+    and the projection onto the positive semidefinite cone is one eigendecomposition 
+    of a $(P+1)d$-dimensional matrix per iteration. The iterates of the last call 
+    are the warm start of the next call with `warm_start=True`. The complementary slackness gap, the 
+    primal and dual residuals, the number of iterations and the status of the last 
+    call are stored in the attributes `gap`, `residuals`, `num_iters` and `status`.
+
+    Parameters
+    ----------
+    > **dim:** `int`
+        -- The dimension of the density matrix.
+
+    > **para_num:** `int`
+        -- The number of the unknown parameters.
+
+    > **W:** `matrix`
+        -- Weight matrix.
+
+    > **solver:** `string`
+        -- The solver of cvxpy. The default solver of cvxpy is used if it is not set.
+
+    > **method:** `string`
+        -- Options are:  
+        "cvxpy" (default) -- The SDP is solved by cvxpy.  
+        "native" -- The SDP is solved by ADMM.
+
+    > **tol:** `float`
+        -- Tolerance of the relative residuals for `method="native"`.
+
+    > **max_iter:** `int`
+        -- The maximum number of iterations for `method="native"`.
+    """
+
+    def __init__(self, dim, para_num, W, solver=None, method="cvxpy", tol=1e-4, max_iter=10000):
+        if method not in ["cvxpy", "native"]:
+            raise ValueError("{!r} is not a valid value for method, supported values are 'cvxpy' and 'native'.".format(method))
+
+        self.dim = dim
+        self.para_num = para_num
+        self.W = np.asarray(W, dtype=np.float64)
+        self.solver = solver
+        self.method = method
+        self.tol = tol
+        self.max_iter = max_iter
+        self.iterates = None
+        self.gap, self.residuals, self.num_iters, self.status = None, None, None, None
+        if method == "native":
+            return
+
+        self.rho = cp.Parameter((dim, dim), hermitian=True)
+        self.drho = [cp.Parameter((dim, dim), hermitian=True) for i in range(para_num)]
+
+        L_tp = [[[] for i in range(para_num)] for j in range(para_num)]
+        for para_i in range(para_num):
+            for para_j in range(para_i, para_num):
+                L_tp[para_i][para_j] = cp.Variable((dim, dim), hermitian=True)
+                L_tp[para_j][para_i] = L_tp[para_i][para_j]
+        L = cp.vstack([cp.hstack(L_tp[i]) for i in range(para_num)])
+        X = [cp.Variable((dim, dim), hermitian=True) for j in range(para_num)]
+
+        constraints = [cp.bmat([[L, cp.vstack(X)], [cp.hstack(X), np.identity(dim)]]) >> 0]
+        for i in range(para_num):
+            constraints += [cp.trace(X[i] @ self.rho) == 0]
+            for j in range(para_num):
+                if i == j:
+                    constraints += [cp.trace(X[i] @ self.drho[j]) == 1]
+                else:
+                    constraints += [cp.trace(X[i] @ self.drho[j]) == 0]
+        obj = cp.real(sum(
+            self.W[i, j] * cp.trace(self.rho @ L_tp[j][i])
+            for i in range(para_num) for j in range(para_num)
+        ))
+        self.problem = cp.Problem(cp.Minimize(obj), constraints)
+        self._X, self._L = X, L
+
+    def solve(self, rho, drho=None, result=False, warm_start=False):
+        """
+        Calculation of the NHB for a new state.
+
+        Parameters
+        ----------
+        > **rho:** `matrix or FisherContext`
+            -- Density matrix or a `FisherContext`.
+
+        > **drho:** `list`
+            -- Derivatives of the density matrix on the unknown parameters to be 
+            estimated. It is not needed if rho is a `FisherContext`.
+
+        > **result:** `bool`
+            -- Whether or not to return a `SDPResult` instead of the value.
+
+        > **warm_start:** `bool`
+            -- Whether or not to start from the solution of the previous call of this 
+            solver. If it is False (default) the result does not depend on the 
+            previous calls.
+
+        Returns
+        ----------
+        **NHB:** `float or SDPResult`
+            -- The value of Nagaoka-Hayashi bound.
+        """
+        if isinstance(rho, FisherContext):
+            rho, drho = rho.rho, rho.drho
+        if len(rho) != self.dim or len(drho) != self.para_num:
+            raise ValueError("Please make sure the dimension of rho and the length of drho are {} and {}!".format(self.dim, self.para_num))
+
+        start = time.perf_counter()
+        rho = _hermitian(rho)
+        drho = [_hermitian(drho_i) for drho_i in drho]
+        setup_time = time.perf_counter() - start
+
+        if self.method == "native":
+            start = time.perf_counter()
+            iterates = self.iterates if warm_start else None
+            value, self.iterates, self.gap, self.residuals, self.num_iters, converged = _NHB_admm(
+                rho, drho, self.W, iterates, self.tol, self.max_iter
+            )
+            solve_time = time.perf_counter() - start
+            self.status = "optimal" if converged else "max_iter"
+            solver_name = "ADMM"
+            m = self.para_num * self.dim
+            Z = self.iterates[0]
+            X, L = Z[:m, m:].reshape(self.para_num, self.dim, self.dim), Z[:m, :m]
+        else:
+            self.rho.value = rho
+            for drho_p, drho_i in zip(self.drho, drho):
+                drho_p.value = drho_i
+            start = time.perf_counter()
+            self.problem.solve(solver=self.solver, warm_start=warm_start)
+            setup_time, solve_time = _cvxpy_time(self.problem, setup_time, time.perf_counter() - start)
+            value = self.problem.value
+            stats = self.problem.solver_stats
+            self.status, self.num_iters, self.gap = self.problem.status, stats.num_iters, None
+            self.residuals = (_violation(self.problem), None)
+            solver_name = stats.solver_name
+            X = None if self._X[0].value is None else np.array([X_i.value for X_i in self._X])
+            L = self._L.value
+
+        if result == False:
+            return value
+        return SDPResult(
+            value, self.status, solver_name, setup_time, solve_time, 
+            self.num_iters, self.residuals, self.gap, X, L,
+        )
+
+
+def _NHB_admm(rho, drho, W, iterates, tol, max_iter):
+    # scaled ADMM for min Tr(CY) s.t. Y in the affine set A and Y >= 0 with 
+    # Y = [[L, X], [X^dagger, I]], X = [X_1; ...; X_P] and C = [[W kron rho, 0], [0, 0]]
+    dim, para_num = len(rho), len(drho)
+    m, n = para_num * dim, (para_num + 1) * dim
+    C = np.zeros((n, n), dtype=np.complex128)
+    C[:m, :m] = np.kron(W, rho)
+
+    # the constraints Tr(X_a F_k) = c_ak with F = [rho, drho_1, ..., drho_P]
+    F = np.array([rho] + list(drho))
+    G_inv = np.linalg.pinv(np.real(np.einsum("kij,lji->kl", F, F)))
+    c = np.concatenate([np.zeros((para_num, 1)), np.identity(para_num)], axis=1)
+
+    def project_affine(T):
+        Y = np.zeros_like(T)
+        # Hermitian blocks with L_ab = L_ba
+        B = T[:m, :m].reshape(para_num, dim, para_num, dim)
+        Y[:m, :m] = ((B + B.conj().transpose(0, 3, 2, 1)) / 2).reshape(m, m)
+        H = T[:m, m:].reshape(para_num, dim, dim)
+        H = (H + H.conj().swapaxes(-1, -2)) / 2
+        mu = (np.real(np.einsum("aij,kji->ak", H, F)) - c) @ G_inv
+        X = H - np.einsum("ak,kij->aij", mu, F)
+        Y[:m, m:] = X.reshape(m, dim)
+        Y[m:, :m] = Y[:m, m:].conj().T
+        Y[m:, m:] = np.identity(dim)
+        return Y
+
+    def project_psd(T):
+        val, vec = np.linalg.eigh(T)
+        return (vec * np.maximum(val, 0.0)) @ vec.conj().T
+
+    if iterates is None:
+        Z = project_psd(project_affine(np.zeros((n, n), dtype=np.complex128)))
+        U = np.zeros((n, n), dtype=np.complex128)
+        sigma = 1.0
+    else:
+        Z, U, sigma = iterates
+
+    converged = False
+    num_iters = 0
+    while not converged and num_iters < max_iter:
+        num_iters += 1
+        Y = project_affine(Z - U - C / sigma)
+        Z_old = Z
+        Z = project_psd(Y + U)
+        U = U + Y - Z
+        res_primal = np.linalg.norm(Y - Z)
+        res_dual = sigma * np.linalg.norm(Z - Z_old)
+        value = np.real(np.sum(C.conj() * Y))
+        # complementary slackness of the multiplier -sigma*U of the cone constraint
+        gap = sigma * abs(np.real(np.sum(U.conj() * Y)))
+        converged = (
+            res_primal <= tol * max(1.0, np.linalg.norm(Y))
+            and res_dual <= tol * max(1.0, sigma * np.linalg.norm(U))
+            and gap <= tol * max(1.0, abs(value))
+        )
+        # residual balancing of the penalty parameter
+        if num_iters % 20 == 0:
+            if res_primal > 10 * res_dual:
+                sigma, U = sigma * 2, U / 2
+            elif res_dual > 10 * res_primal:
+                sigma, U = sigma / 2, U * 2
+    return value, (Z, U, sigma), gap, (res_primal, res_dual), num_iters, converged
+
+
+class SDPResult:
+    r"""
+    Result of the semidefinite programs of `HCRB` and `NHB` with the information 
+    of the solver. It can be serialized with `to_dict` and `to_json`.
+
+    Attributes
+    ----------
+    > **value:** `float`
+        -- The optimal value.
+
+    > **status:** `string`
+        -- The status reported by the solver, for example "optimal", 
+        "optimal_inaccurate" or "max_iter".
+
+    > **solver:** `string`
+        -- The name of the solver.
+
+    > **setup_time:** `float`
+        -- Wall time of the preprocessing and the compilation of the problem in 
+        seconds.
+
+    > **solve_time:** `float`
+        -- Wall time of the solver in seconds.
+
+    > **num_iters:** `int`
+        -- The number of iterations.
+
+    > **residuals:** `tuple`
+        -- The primal and dual residuals, None if the solver does not report them.
+
+    > **gap:** `float`
+        -- The duality gap of the native solvers.
+
+    > **X:** `array`
+        -- The optimal operators $X_a$ with the shape (P, d, d).
+
+    > **V:** `array`
+        -- The optimal matrix $V$ of the HCRB or $\mathbb{L}$ of the NHB.
+    """
+
+    def __init__(self, value, status, solver, setup_time=None, solve_time=None, 
+                 num_iters=None, residuals=None, gap=None, X=None, V=None):
+        self.value = value
+        self.status = status
+        self.solver = solver
+        self.setup_time = setup_time
+        self.solve_time = solve_time
+        self.num_iters = num_iters
+        self.residuals = residuals
+        self.gap = gap
+        self.X = X
+        self.V = V
+
+    def __repr__(self):
+        return "SDPResult(value={!r}, status={!r}, solver={!r})".format(self.value, self.status, self.solver)
+
+    def to_dict(self):
+        """
+        The attributes as a dictionary of Python types, complex arrays are stored 
+        as {"real": ..., "imag": ...}.
+        """
+        return {key: _to_builtin(val) for key, val in vars(self).items()}
+
+    def to_json(self, **kwargs):
+        """
+        The attributes as a JSON string, the keyword arguments are passed to 
+        `json.dumps`.
+        """
+        return json.dumps(self.to_dict(), **kwargs)
+
+
+def _to_builtin(val):
+    if isinstance(val, (list, tuple)):
+        return [_to_builtin(v) for v in val]
+    if isinstance(val, (np.ndarray, np.generic)):
+        if np.iscomplexobj(val):
+            return {"real": np.real(val).tolist(), "imag": np.imag(val).tolist()}
+        return val.tolist()
+    return val
+
+
+def _cvxpy_time(problem, setup_time, wall_time):
+    # split the wall time of problem.solve into the compilation and the solver time
+    solve_time = problem.solver_stats.solve_time
+    if solve_time is None:
+        return setup_time, wall_time
+    return setup_time + max(wall_time - solve_time, 0.0), solve_time
+
+
+def _violation(problem):
+    return max(float(np.max(np.atleast_1d(c.violation()))) for c in problem.constraints)
+
+
+def _HCRB_operators(X, vec, rank):
+    # coordinates X (num, P) in the HCRB basis to the operators X_a with the shape (P, d, d)
+    X = np.asarray(X).T
+    dim = len(vec)
+    if rank is None:
+        return np.einsum("ak,kij->aij", X, _HCRB_basis(dim))
+    i, j = np.triu_indices(dim)
+    idx = i < rank
+    i, j = i[idx], j[idx]
+    off = i < j
+    i_d, i_o, j_o = i[~off], i[off], j[off]
+    n_d, n_o = len(i_d), len(i_o)
+    X_eig = np.zeros((len(X), dim, dim), dtype=np.complex128)
+    X_eig[:, i_d, i_d] = X[:, :n_d]
+    X_eig[:, i_o, j_o] = (X[:, n_d : n_d + n_o] + 1j * X[:, n_d + n_o :]) / np.sqrt(2)
+    X_eig[:, j_o, i_o] = X_eig[:, i_o, j_o].conj()
+    vec = vec[:, ::-1]
+    return vec @ X_eig @ vec.conj().T
+
+
+def _hermitian(A):
+    # cvxpy checks the hermiticity of the parameter values exactly
+    A = _dense(A)
+    return (A + A.conj().T) / 2
@@ -1,11 +1,14 @@
+import os
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from numpy.linalg import inv
 from scipy.linalg import sqrtm, schur, eigvals
-from quanestimation.Common.Common import SIC, suN_generator
-from scipy.integrate import quad
-from scipy.stats import norm, poisson, rayleigh, gamma
+from scipy.sparse import issparse, csr_matrix, vstack as sparse_vstack
+from scipy.sparse.linalg import eigsh
+from quanestimation.Common.Common import SIC, suN_structure, get_precision, precision_cast, precision_promote
+from scipy.special import gammaln, digamma, polygamma
 
-def CFIM(rho, drho, M=[], eps=1e-8):
+def CFIM(rho, drho=None, M=[], eps=1e-8):
     r"""
     Calculation of the classical Fisher information (CFI) and classical Fisher 
     information matrix (CFIM) for a density matrix. The entry of CFIM $\mathcal{I}$
@@ -19,17 +22,22 @@ def CFIM(rho, drho, M=[], eps=1e-8):
 
     Parameters
     ----------
-    > **rho:** `matrix`
-        -- Density matrix.
+    > **rho:** `matrix or FisherContext`
+        -- Density matrix. It can be a dense array, a `scipy.sparse` matrix or a 
+        `FisherContext`.
 
     > **drho:** `list`
         -- Derivatives of the density matrix on the unknown parameters to be 
         estimated. For example, drho[0] is the derivative vector on the first 
-        parameter.
+        parameter. The derivatives can be `scipy.sparse` matrices. It is not 
+        needed if rho is a `FisherContext`.
 
-    > **M:** `list of matrices`
-        -- A set of positive operator-valued measure (POVM). The default measurement 
-        is a set of rank-one symmetric informationally complete POVM (SIC-POVM).
+    > **M:** `list of matrices or array`
+        -- A set of positive operator-valued measure (POVM). It can be a list of 
+        matrices (dense or `scipy.sparse`), an array with the shape (m, d, d) or an 
+        array with the shape (m, d) whose rows are the vectors $|m_y\rangle$ of a 
+        rank-one POVM $\Pi_y=|m_y\rangle\langle m_y|$. The default measurement is a 
+        set of rank-one symmetric informationally complete POVM (SIC-POVM).
 
     > **eps:** `float`
         -- Machine epsilon.
@@ -47,32 +55,22 @@ def CFIM(rho, drho, M=[], eps=1e-8):
         solutions.html).
     """
 
+    if isinstance(rho, FisherContext):
+        rho, drho = rho.rho, rho.drho
+
     if type(drho) != list:
         raise TypeError("Please make sure drho is a list!")
 
-    if M == []:
-        M = SIC(len(rho[0]))
-    else:
-        if type(M) != list:
-            raise TypeError("Please make sure M is a list!")
+    if not issparse(rho):
+        rho = np.asarray(rho)
+    M = _POVM_check(M, rho.shape[0])
 
-    m_num = len(M)
     para_num = len(drho)
-    CFIM_res = np.zeros([para_num, para_num])
-    for pi in range(0, m_num):
-        Mp = M[pi]
-        p = np.real(np.trace(np.dot(rho, Mp)))
-        Cadd = np.zeros([para_num, para_num])
-        if p > eps:
-            for para_i in range(0, para_num):
-                drho_i = drho[para_i]
-                dp_i = np.real(np.trace(np.dot(drho_i, Mp)))
-                for para_j in range(para_i, para_num):
-                    drho_j = drho[para_j]
-                    dp_j = np.real(np.trace(np.dot(drho_j, Mp)))
-                    Cadd[para_i][para_j] = np.real(dp_i * dp_j / p)
-                    Cadd[para_j][para_i] = np.real(dp_i * dp_j / p)
-        CFIM_res += Cadd
+    if issparse(rho) or issparse(drho[0]) or (type(M) == list and issparse(M[0])):
+        p, dp = _POVM_prob_sparse(precision_cast(rho), [precision_cast(drho_i) for drho_i in drho], M)
+    else:
+        p, dp = _POVM_prob(precision_cast(rho), precision_cast(np.array(drho)), M)
+    CFIM_res = precision_promote(_FIM_prob(p, dp, eps))
 
     if para_num == 1:
         return CFIM_res[0][0]
@@ -80,7 +78,179 @@ def CFIM(rho, drho, M=[], eps=1e-8):
         return CFIM_res
 
 
-def FIM(p, dp, eps=1e-8):
+def CFIM_batch(rho, drho, M=[], eps=1e-8):
+    r"""
+    Calculation of the classical Fisher information matrix (CFIM) for a stack of 
+    density matrices. The probabilities $p(y|\textbf{x})=\mathrm{Tr}(\rho\Pi_y)$ 
+    and their derivatives of all the states are obtained in one contraction and 
+    the CFIMs are given by one weighted outer product of the derivatives.
+
+    Parameters
+    ----------
+    > **rho:** `array`
+        -- Density matrices with the shape (N, d, d).
+
+    > **drho:** `array`
+        -- Derivatives of the density matrices on the unknown parameters to be 
+        estimated with the shape (N, P, d, d). For example, drho[n][0] is the 
+        derivative of rho[n] on the first parameter.
+
+    > **M:** `list of matrices or array`
+        -- A set of positive operator-valued measure (POVM). It can be a list of 
+        matrices, an array with the shape (m, d, d) or an array with the shape (m, d) 
+        whose rows are the vectors of a rank-one POVM. The default measurement is a 
+        set of rank-one symmetric informationally complete POVM (SIC-POVM).
+
+    > **eps:** `float`
+        -- Machine epsilon.
+
+    Returns
+    ----------
+    **CFIM:** `array`
+        -- CFIMs with the shape (N, P, P). The output is always a stack of matrices, 
+        also for single parameter estimation.
+    """
+
+    rho = np.asarray(rho)
+    drho = np.asarray(drho)
+    if rho.ndim < 3 or drho.ndim != rho.ndim + 1:
+        raise ValueError("Please make sure the shapes of rho and drho are (N, d, d) and (N, P, d, d)!")
+
+    M = _POVM_dense(_POVM_check(M, rho.shape[-1]))
+    p, dp = _POVM_prob(precision_cast(rho), precision_cast(drho), M)
+    return precision_promote(_FIM_prob(p, dp, eps))
+
+
+def CFIM_pure(psi, dpsi, M=[], eps=1e-8):
+    r"""
+    Calculation of the classical Fisher information (CFI) and classical Fisher 
+    information matrix (CFIM) for a pure state. The probabilities and their 
+    derivatives are calculated from the ket directly via 
+    $p(y|\textbf{x})=\langle\psi|\Pi_y|\psi\rangle$ and 
+    $\partial_a p(y|\textbf{x})=2\mathrm{Re}(\langle\psi|\Pi_y|\partial_a\psi\rangle)$, 
+    the density matrix is not constructed.
+
+    Parameters
+    ----------
+    > **psi:** `array`
+        -- The probe state (ket) with the shape (d,) or (d, 1), or a stack of kets 
+        with the shape (N, d).
+
+    > **dpsi:** `list or array`
+        -- Derivatives of the ket on the unknown parameters to be estimated. For 
+        example, dpsi[0] is the derivative vector on the first parameter. For a 
+        stack of kets its shape is (N, P, d).
+
+    > **M:** `list of matrices or array`
+        -- A set of positive operator-valued measure (POVM). It can be a list of 
+        matrices, an array with the shape (m, d, d) or an array with the shape (m, d) 
+        whose rows are the vectors of a rank-one POVM. The default measurement is a 
+        set of rank-one symmetric informationally complete POVM (SIC-POVM).
+
+    > **eps:** `float`
+        -- Machine epsilon.
+
+    Returns
+    ----------
+    **CFI (CFIM):** `float or matrix` 
+        -- For single parameter estimation (the length of dpsi is equal to one), 
+        the output is CFI and for multiparameter estimation (the length of dpsi 
+        is more than one), it returns CFIM. For a stack of kets it returns the 
+        CFIMs with the shape (N, P, P).
+    """
+
+    psi, dpsi, batch = _ket_check(psi, dpsi)
+    psi, dpsi = precision_cast(psi), precision_cast(dpsi)
+    M = precision_cast(_POVM_dense(_POVM_check(M, psi.shape[-1])))
+    if M.ndim == 2:
+        # amplitudes <m_y|psi> and <m_y|d_a psi>
+        amp = psi @ M.T.conj()
+        damp = dpsi @ M.T.conj()
+        p = np.abs(amp) ** 2
+        dp = 2 * np.real(amp.conj()[..., None, :] * damp)
+    else:
+        M_psi = np.einsum("yij,...j->...yi", M, psi)
+        p = np.real(np.einsum("...i,...yi->...y", psi.conj(), M_psi))
+        dp = 2 * np.real(np.einsum("...yi,...ai->...ay", M_psi.conj(), dpsi))
+    CFIM_res = precision_promote(_FIM_prob(p, dp.swapaxes(-1, -2), eps))
+
+    if batch or len(dpsi) > 1:
+        return CFIM_res
+    else:
+        return CFIM_res[0][0]
+
+
+def _ket_check(psi, dpsi):
+    psi = np.asarray(psi)
+    if psi.ndim == 2 and psi.shape[1] == 1:
+        psi = psi[:, 0]
+    if psi.ndim == 1:
+        dpsi = np.array([np.asarray(dpsi_i).reshape(-1) for dpsi_i in dpsi])
+        return psi, dpsi, False
+    else:
+        dpsi = np.asarray(dpsi)
+        if dpsi.ndim != 3:
+            raise ValueError("Please make sure the shapes of psi and dpsi are (N, d) and (N, P, d)!")
+        return psi, dpsi, True
+
+
+def _POVM_check(M, dim):
+    if len(M) == 0:
+        return SIC(dim, rank_one=True)
+    elif type(M) != list and type(M) != np.ndarray:
+        raise TypeError("Please make sure M is a list or an array!")
+    return M
+
+
+def _POVM_dense(M):
+    # stack of the POVM elements, sparse elements are converted to dense arrays
+    if type(M) == list:
+        return np.array([_dense(Mi) for Mi in M])
+    return np.asarray(M)
+
+
+def _POVM_prob(rho, drho, M):
+    # p with the shape (..., m) and dp with the shape (..., m, P) for rho (..., d, d)
+    # and drho (..., P, d, d).
+    M = precision_cast(np.asarray(M))
+    if M.ndim == 2:
+        # rank-one POVM: p_y = <m_y|rho|m_y>
+        rho_M = rho @ M.T
+        drho_M = drho @ M.T
+        p = np.sum(M.T.conj() * rho_M, axis=-2)
+        dp = np.sum(M.T.conj() * drho_M, axis=-2).swapaxes(-1, -2)
+    else:
+        # p_y = Tr(rho M_y) = sum_ij rho_ji (M_y)_ij
+        p = np.einsum("yij,...ji->...y", M, rho)
+        dp = np.einsum("yij,...aji->...ya", M, drho)
+    return np.real(p), np.real(dp)
+
+
+def _POVM_prob_sparse(rho, drho, M):
+    # Tr(rho M_y) = sum_ij rho_ij (M_y)_ji is evaluated over the sparsity pattern, 
+    # the operators are flattened into the rows of sparse matrices.
+    if type(M) == np.ndarray and M.ndim == 2:
+        p = np.sum(M.T.conj() * (rho @ M.T), axis=0)
+        dp = np.array([np.sum(M.T.conj() * (drho_i @ M.T), axis=0) for drho_i in drho]).T
+        return np.real(p), np.real(dp)
+
+    dim = rho.shape[0]
+    M_vec = sparse_vstack([csr_matrix(Mi).T.reshape((1, dim**2)) for Mi in M]).tocsr()
+    drho_vec = sparse_vstack([csr_matrix(drho_i).reshape((1, dim**2)) for drho_i in drho]).tocsr()
+    p = M_vec @ csr_matrix(rho).reshape((dim**2, 1))
+    dp = M_vec @ drho_vec.T
+    return np.real(p.toarray()[:, 0]), np.real(dp.toarray())
+
+
+def _FIM_prob(p, dp, eps):
+    # I_ab = sum_y dp_ya dp_yb / p_y over the outcomes with p_y > eps
+    eps = _eps_floor(eps, p.dtype)
+    idx = p > eps
+    p_inv = np.where(idx, 1 / np.where(idx, p, 1), 0).astype(p.dtype)
+    return np.einsum("...ya,...y,...yb->...ab", dp, p_inv, dp)
+
+
+def FIM(p, dp, eps=1e-8, dtype=None):
     r"""
     Calculation of the classical Fisher information (CFI) and classical Fisher 
     information matrix (CFIM) for classical scenarios. The entry of FIM $I$
@@ -94,16 +264,24 @@ def FIM(p, dp, eps=1e-8):
     Parameters
     ----------
     > **p:** `array` 
-        -- The probability distribution.
+        -- The probability distribution. A stack of distributions with the shape 
+        (N, m) can be input, in which case the output is a stack of CFIMs with the 
+        shape (N, P, P).
 
     > **dp:** `list`
         -- Derivatives of the probability distribution on the unknown parameters to 
         be estimated. For example, dp[0] is the derivative vector on the first 
-        parameter.
+        parameter. For a stack of distributions its shape is (N, m, P).
 
     > **eps:** `float`
         -- Machine epsilon.
 
+    > **dtype:** `data-type`
+        -- The floating point type used in the calculation, for example `np.float32`
+        to halve the memory of large scans. The default is the type of the inputs, 
+        or `np.float32` in the single precision mode (see `set_precision`) in 
+        which case the result is returned in double precision.
+
     Returns
     ----------
     **CFI (CFIM):** `float or matrix` 
@@ -112,21 +290,21 @@ def FIM(p, dp, eps=1e-8):
         is more than one), it returns CFIM.
     """
 
-    para_num = len(dp[0])
-    m_num = len(p)
-    FIM_res = np.zeros([para_num, para_num])
-    for pi in range(0, m_num):
-        p_tp = p[pi]
-        Cadd = np.zeros([para_num, para_num])
-        if p_tp > eps:
-            for para_i in range(0, para_num):
-                dp_i = dp[pi][para_i]
-                for para_j in range(para_i, para_num):
-                    dp_j = dp[pi][para_j]
-                    Cadd[para_i][para_j] = np.real(dp_i * dp_j / p_tp)
-                    Cadd[para_j][para_i] = np.real(dp_i * dp_j / p_tp)
-        FIM_res += Cadd
+    promote = dtype is None and get_precision() == "single"
+    if promote:
+        dtype = np.float32
+    p = np.real(np.asarray(p, dtype=dtype))
+    dp = np.real(np.asarray(dp, dtype=dtype))
+    if dp.ndim != p.ndim + 1:
+        raise ValueError("Please make sure the shapes of p and dp are (m,) and (m, P), or (N, m) and (N, m, P)!")
+
+    FIM_res = _FIM_prob(p, dp, eps)
+    if promote:
+        FIM_res = precision_promote(FIM_res)
+    if p.ndim > 1:
+        return FIM_res
 
+    para_num = dp.shape[-1]
     if para_num == 1:
         return FIM_res[0][0]
     else:
@@ -135,6 +313,10 @@ def FIM(p, dp, eps=1e-8):
 def FI_Expt(y1, y2, dx, ftype="norm"):
     r"""
     Calculation of the classical Fisher information (CFI) based on the experiment data. 
+    The distributions are fitted by maximum likelihood from the sufficient statistics 
+    of the data and the fidelity between them is given by the closed-form 
+    Bhattacharyya coefficient of the family. The gamma and rayleigh distributions 
+    are supported on $[0, \infty)$.
 
     Parameters
     ----------
@@ -158,36 +340,293 @@ def FI_Expt(y1, y2, dx, ftype="norm"):
     ----------
     **CFI:** `float or matrix` 
     """
-    fidelity = 0.0
+    fidelity = _Bhattacharyya(
+        _Expt_params(_Expt_stats(y1, ftype), ftype),
+        _Expt_params(_Expt_stats(y2, ftype), ftype),
+        ftype,
+    )
+    Fc = 8*(1-fidelity)/dx**2
+    return Fc
+
+
+def FI_Expt_CI(y1, y2, dx, ftype="norm", n_boot=1000, alpha=0.05, workers=None, seed=None):
+    r"""
+    Bootstrap confidence interval of the classical Fisher information (CFI) based 
+    on the experiment data. The data sets are resampled with replacement and the 
+    CFI of each resample is calculated with `FI_Expt`. The resamples are distributed 
+    over worker processes.
+
+    Parameters
+    ----------
+    > **y1:** `array` 
+        -- Experimental data obtained at the truth value (x).
+
+    > **y2:** `list`
+        -- Experimental data obtained at x+dx.
+
+    > **dx:** `float`
+        -- A known small drift of the parameter.
+
+    > **ftype:** `string`
+        -- The distribution the data follows. Options are:  
+        "norm" (default) -- normal distribution.  
+        "gamma" -- gamma distribution.
+        "rayleigh" -- rayleigh distribution.
+        "poisson" -- poisson distribution.
+
+    > **n_boot:** `int`
+        -- Number of bootstrap resamples.
+
+    > **alpha:** `float`
+        -- The confidence level of the interval is 1-alpha.
+
+    > **workers:** `int`
+        -- Number of worker processes. The default is the number of processors. 
+        If it is set to 1, the resamples are calculated in the current process.
+
+    > **seed:** `int`
+        -- Seed of the random number generator. The resamples are drawn in chunks 
+        of fixed size with one child seed per chunk, so the interval for a given 
+        seed does not depend on the number of workers.
+
+    Returns
+    ----------
+    **CFI:** `float` 
+        -- CFI of the full data sets.
+
+    **CI:** `tuple` 
+        -- The lower and upper bound of the confidence interval.
+    """
+
+    y1 = np.asarray(y1)
+    y2 = np.asarray(y2)
+    Fc = FI_Expt(y1, y2, dx, ftype=ftype)
+
+    workers = os.cpu_count() if workers is None else workers
+    counts = [min(_BOOT_CHUNK, n_boot - start) for start in range(0, n_boot, _BOOT_CHUNK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(counts))
+    jobs = [(y1, y2, dx, ftype, n, s) for n, s in zip(counts, seeds)]
+    if workers == 1:
+        res = [_FI_Expt_boot(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            res = list(executor.map(_FI_Expt_boot, jobs))
+    Fc_boot = np.concatenate(res)
+    CI = tuple(float(x) for x in np.quantile(Fc_boot, [alpha / 2, 1 - alpha / 2]))
+    return Fc, CI
+
+
+class FI_ExptStream:
+    r"""
+    Streaming calculation of the classical Fisher information (CFI) based on the 
+    experiment data. Only the sufficient statistics of the two data sets are kept, 
+    so the data can be added chunk by chunk as it arrives.
+
+    Parameters
+    ----------
+    > **dx:** `float`
+        -- A known small drift of the parameter.
+
+    > **ftype:** `string`
+        -- The distribution the data follows. Options are:  
+        "norm" (default) -- normal distribution.  
+        "gamma" -- gamma distribution.
+        "rayleigh" -- rayleigh distribution.
+        "poisson" -- poisson distribution.
+    """
+
+    def __init__(self, dx, ftype="norm"):
+        if ftype not in ["norm", "gamma", "rayleigh", "poisson"]:
+            raise ValueError("{!r} is not a valid value for ftype, supported values are 'norm', 'poisson', 'gamma' and 'rayleigh'.".format(ftype))
+        self.dx = dx
+        self.ftype = ftype
+        self.stats1 = 0.0
+        self.stats2 = 0.0
+
+    def update(self, y1=None, y2=None):
+        """
+        Add a chunk of the experimental data obtained at the truth value (y1) 
+        and/or at x+dx (y2).
+        """
+        if y1 is not None:
+            self.stats1 = self.stats1 + _Expt_stats(y1, self.ftype)
+        if y2 is not None:
+            self.stats2 = self.stats2 + _Expt_stats(y2, self.ftype)
+        return self
+
+    def FI(self):
+        """
+        CFI of all the data added so far.
+        """
+        if np.ravel(self.stats1)[0] == 0 or np.ravel(self.stats2)[0] == 0:
+            raise ValueError("Please add the data of both y1 and y2 with update() before calling FI()!")
+        fidelity = _Bhattacharyya(
+            _Expt_params(self.stats1, self.ftype),
+            _Expt_params(self.stats2, self.ftype),
+            self.ftype,
+        )
+        return 8*(1-fidelity)/self.dx**2
+
+
+# number of bootstrap resamples per task of FI_Expt_CI
+_BOOT_CHUNK = 64
+
+
+def _FI_Expt_boot(job):
+    y1, y2, dx, ftype, n_boot, seed = job
+    rng = np.random.default_rng(seed)
+    Fc = np.zeros(n_boot)
+    for i in range(n_boot):
+        stats1 = _Expt_stats(y1[rng.integers(0, len(y1), len(y1))], ftype)
+        stats2 = _Expt_stats(y2[rng.integers(0, len(y2), len(y2))], ftype)
+        fidelity = _Bhattacharyya(_Expt_params(stats1, ftype), _Expt_params(stats2, ftype), ftype)
+        Fc[i] = 8*(1-fidelity)/dx**2
+    return Fc
+
+
+def _Expt_stats(y, ftype):
+    # sufficient statistics of the data, they are additive over chunks
+    y = np.asarray(y, dtype=np.float64).ravel()
     if ftype == "norm":
-        mu1, std1 = norm.fit(y1)
-        mu2, std2 = norm.fit(y2)
-        f_func = lambda x: np.sqrt(norm.pdf(x, mu1, std1)*norm.pdf(x, mu2, std2))
-        fidelity, err = quad(f_func, -np.inf, np.inf)
+        return np.array([len(y), np.sum(y), np.sum(y**2)])
     elif ftype == "gamma":
-        a1, alpha1, beta1 = gamma.fit(y1)
-        a2, alpha2, beta2 = gamma.fit(y2)
-        f_func = lambda x: np.sqrt(gamma.pdf(x, a1, alpha1, beta1)*gamma.pdf(x, a2, alpha2, beta2))
-        fidelity, err = quad(f_func, 0., np.inf)
+        return np.array([len(y), np.sum(y), np.sum(np.log(y))])
     elif ftype == "rayleigh":
-        mean1, var1 = rayleigh.fit(y1)
-        mean2, var2 = rayleigh.fit(y2)
-        f_func = lambda x: np.sqrt(rayleigh.pdf(x, mean1, var1)*rayleigh.pdf(x, mean2, var2))
-        fidelity, err = quad(f_func, -np.inf, np.inf)
+        return np.array([len(y), np.sum(y**2)])
     elif ftype == "poisson":
-        k1 = np.arange(max(y1)+1)
-        k2 = np.arange(max(y2)+1)
-        p1_pois = poisson.pmf(k1, np.mean(y1))
-        p2_pois = poisson.pmf(k2, np.mean(y2))
-        p1_pois, p2_pois = p1_pois/sum(p1_pois), p2_pois/sum(p2_pois)
-        fidelity = sum([np.sqrt(p1_pois[i]*p2_pois[i]) for i in range(len(p1_pois))])
+        return np.array([len(y), np.sum(y)])
     else:
         raise ValueError("{!r} is not a valid value for ftype, supported values are 'norm', 'poisson', 'gamma' and 'rayleigh'.".format(ftype))
-    Fc = 8*(1-fidelity)/dx**2
-    return Fc
 
 
-def SLD(rho, drho, rep="original", eps=1e-8):
+def _Expt_params(stats, ftype):
+    # maximum likelihood estimates from the sufficient statistics
+    n = stats[0]
+    if ftype == "norm":
+        mu = stats[1] / n
+        return mu, np.sqrt(max(stats[2] / n - mu**2, 0.0))
+    elif ftype == "gamma":
+        # shape from ln(a) - digamma(a) = ln(mean) - mean(ln y) via Newton's method
+        mean = stats[1] / n
+        s = np.log(mean) - stats[2] / n
+        a = (3 - s + np.sqrt((s - 3)**2 + 24 * s)) / (12 * s)
+        for _ in range(50):
+            a_new = a - (np.log(a) - digamma(a) - s) / (1 / a - polygamma(1, a))
+            a_new = a_new if a_new > 0 else a / 2
+            if np.abs(a_new - a) < 1e-12 * a:
+                a = a_new
+                break
+            a = a_new
+        return a, mean / a
+    elif ftype == "rayleigh":
+        return (np.sqrt(stats[1] / (2 * n)),)
+    else:
+        return (stats[1] / n,)
+
+
+def _Bhattacharyya(par1, par2, ftype):
+    # Bhattacharyya coefficient \int\sqrt{p_1(y)p_2(y)}dy of two distributions of the same family
+    if ftype == "norm":
+        (mu1, std1), (mu2, std2) = par1, par2
+        var = std1**2 + std2**2
+        return np.sqrt(2 * std1 * std2 / var) * np.exp(-(mu1 - mu2)**2 / (4 * var))
+    elif ftype == "gamma":
+        (a1, theta1), (a2, theta2) = par1, par2
+        a = (a1 + a2) / 2
+        beta = (1 / theta1 + 1 / theta2) / 2
+        return np.exp(
+            gammaln(a) - a * np.log(beta)
+            - 0.5 * (gammaln(a1) + gammaln(a2) + a1 * np.log(theta1) + a2 * np.log(theta2))
+        )
+    elif ftype == "rayleigh":
+        (sigma1,), (sigma2,) = par1, par2
+        return 2 * sigma1 * sigma2 / (sigma1**2 + sigma2**2)
+    else:
+        (lam1,), (lam2,) = par1, par2
+        return np.exp(-(np.sqrt(lam1) - np.sqrt(lam2))**2 / 2)
+
+
+class FisherContext:
+    r"""
+    Shared cache for the logarithmic derivatives and the quantum Fisher information 
+    of a parameterized density matrix. The eigendecomposition 
+    $\rho=\sum_i\lambda_i|\lambda_i\rangle\langle\lambda_i|$, the derivatives 
+    $\langle\lambda_i|\partial_a\rho|\lambda_j\rangle$ in the eigenspace and the 
+    logarithmic derivatives are calculated at the first use and reused afterwards. 
+    The object can be passed to `SLD`, `RLD`, `LLD`, `QFIM`, `CFIM`, `HCRB` and `NHB` 
+    in place of the density matrix, in which case drho is not needed.
+
+    Parameters
+    ----------
+    > **rho:** `matrix`
+        -- Density matrix. It can be a dense array or a `scipy.sparse` matrix.
+
+    > **drho:** `list`
+        -- Derivatives of the density matrix on the unknown parameters to be 
+        estimated. For example, drho[0] is the derivative vector on the first 
+        parameter.
+    """
+
+    def __init__(self, rho, drho):
+        if type(drho) != list:
+            raise TypeError("Please make sure drho is a list!")
+
+        self.rho = rho
+        self.drho = drho
+        self.para_num = len(drho)
+        self._eig = None
+        self._drho_eig = None
+        self._LD_eig = {}
+        self._LD = {}
+
+    @property
+    def eig(self):
+        """
+        Eigenvalues and eigenvectors of the density matrix.
+        """
+        if self._eig is None:
+            self._eig = np.linalg.eigh(precision_cast(_dense(self.rho)))
+        return self._eig
+
+    @property
+    def drho_eig(self):
+        """
+        Derivatives of the density matrix in the eigenspace of the density matrix.
+        """
+        if self._drho_eig is None:
+            self._drho_eig = _eig_project(self.eig[1], [precision_cast(drho_i) for drho_i in self.drho])
+        return self._drho_eig
+
+    def LD_eig(self, LDtype="SLD", eps=1e-8):
+        """
+        Logarithmic derivatives in the eigenspace of the density matrix, the 
+        output is an array with the shape (P, d, d).
+        """
+        if (LDtype, eps) not in self._LD_eig:
+            self._LD_eig[(LDtype, eps)] = _LD_eig(self.eig[0], self.drho_eig, LDtype, eps)
+        return self._LD_eig[(LDtype, eps)]
+
+    def LD(self, LDtype="SLD", eps=1e-8):
+        """
+        Logarithmic derivatives in the basis of the input density matrix, the 
+        output is a list.
+        """
+        if (LDtype, eps) not in self._LD:
+            vec = self.eig[1]
+            self._LD[(LDtype, eps)] = [
+                np.dot(vec, np.dot(LD_i, vec.conj().transpose())) 
+                for LD_i in self.LD_eig(LDtype, eps)
+            ]
+        return self._LD[(LDtype, eps)]
+
+
+def _context(rho, drho):
+    if isinstance(rho, FisherContext):
+        return rho
+    return FisherContext(rho, drho)
+
+
+def SLD(rho, drho=None, rep="original", eps=1e-8):
     r"""
     Calculation of the symmetric logarithmic derivative (SLD) for a density matrix.
     The SLD operator $L_a$ is determined by
@@ -205,13 +644,15 @@ def SLD(rho, drho, rep="original", eps=1e-8):
 
     Parameters
     ----------
-    > **rho:** `matrix`
-        -- Density matrix.
+    > **rho:** `matrix or FisherContext`
+        -- Density matrix. It can be a dense array, a `scipy.sparse` matrix or a 
+        `FisherContext` whose cached eigendecomposition is reused.
 
     > **drho:** `list`
         -- Derivatives of the density matrix on the unknown parameters to be 
         estimated. For example, drho[0] is the derivative vector on the first 
-        parameter.
+        parameter. The derivatives can be `scipy.sparse` matrices. It is not 
+        needed if rho is a `FisherContext`.
 
     > **rep:** `string`
         -- The basis for the SLDs. Options are:  
@@ -231,15 +672,17 @@ def SLD(rho, drho, rep="original", eps=1e-8):
         is more than one), it returns a list.
     """
 
-    if type(drho) != list:
-        raise TypeError("Please make sure drho is a list!")
+    if isinstance(rho, FisherContext):
+        para_num = rho.para_num
+        purity = 0.0
+    else:
+        if type(drho) != list:
+            raise TypeError("Please make sure drho is a list!")
+        para_num = len(drho)
+        purity = _trace_prod(rho, rho)
 
-    para_num = len(drho)
-    dim = len(rho)
     SLD = [[] for i in range(0, para_num)]
 
-    purity = np.trace(np.dot(rho, rho))
-
     if np.abs(1 - purity) < eps:
         SLD_org = [[] for i in range(0, para_num)]
         for para_i in range(0, para_num):
@@ -248,11 +691,8 @@ def SLD(rho, drho, rep="original", eps=1e-8):
             if rep == "original":
                 SLD[para_i] = SLD_org[para_i]
             elif rep == "eigen":
-                val, vec = np.linalg.eig(rho)
-                val = np.real(val)
-                SLD[para_i] = np.dot(
-                    vec.conj().transpose(), np.dot(SLD_org[para_i], vec)
-                )
+                val, vec = np.linalg.eigh(_dense(rho))
+                SLD[para_i] = vec.conj().transpose() @ (SLD_org[para_i] @ vec)
             else:
                 raise ValueError("{!r} is not a valid value for rep, supported values are 'original' and 'eigen'.".format(rep))
         if para_num == 1:
@@ -260,29 +700,13 @@ def SLD(rho, drho, rep="original", eps=1e-8):
         else:
             return SLD
     else:
-        val, vec = np.linalg.eig(rho)
-        val = np.real(val)
+        ctx = _context(rho, drho)
+        SLD_eig = ctx.LD_eig("SLD", eps)
         for para_i in range(0, para_num):
-            SLD_eig = np.array(
-                [[0.0 + 0.0 * 1.0j for i in range(0, dim)] for i in range(0, dim)]
-            )
-            for fi in range(0, dim):
-                for fj in range(0, dim):
-                    if np.abs(val[fi] + val[fj]) > eps:
-                        SLD_eig[fi][fj] = (
-                            2
-                            * np.dot(
-                                vec[:, fi].conj().transpose(),
-                                np.dot(drho[para_i], vec[:, fj]),
-                            )
-                            / (val[fi] + val[fj])
-                        )
-            SLD_eig[SLD_eig == np.inf] = 0.0
-
             if rep == "original":
-                SLD[para_i] = np.dot(vec, np.dot(SLD_eig, vec.conj().transpose()))
+                SLD[para_i] = ctx.LD("SLD", eps)[para_i]
             elif rep == "eigen":
-                SLD[para_i] = SLD_eig
+                SLD[para_i] = SLD_eig[para_i]
             else:
                 raise ValueError("{!r} is not a valid value for rep, supported values are 'original' and 'eigen'.".format(rep))
 
@@ -292,7 +716,7 @@ def SLD(rho, drho, rep="original", eps=1e-8):
             return SLD
 
 
-def RLD(rho, drho, rep="original", eps=1e-8):
+def RLD(rho, drho=None, rep="original", eps=1e-8):
     r"""
     Calculation of the right logarithmic derivative (RLD) for a density matrix.
     The RLD operator defined by $\partial_{a}\rho=\rho \mathcal{R}_a$
@@ -306,13 +730,14 @@ def RLD(rho, drho, rep="original", eps=1e-8):
 
     Parameters
     ----------
-    > **rho:** `matrix`
-        -- Density matrix.
+    > **rho:** `matrix or FisherContext`
+        -- Density matrix or a `FisherContext` whose cached eigendecomposition 
+        is reused.
 
     > **drho:** `list`
         -- Derivatives of the density matrix on the unknown parameters to be 
         estimated. For example, drho[0] is the derivative vector on the first 
-        parameter.
+        parameter. It is not needed if rho is a `FisherContext`.
 
     > **rep:** `string`
         -- The basis for the RLD(s). Options are:  
@@ -332,34 +757,18 @@ def RLD(rho, drho, rep="original", eps=1e-8):
         it returns a list.
     """
     
-    if type(drho) != list:
+    if not isinstance(rho, FisherContext) and type(drho) != list:
         raise TypeError("Please make sure drho is a list!")
 
-    para_num = len(drho)
-    dim = len(rho)
+    ctx = _context(rho, drho)
+    para_num = ctx.para_num
     RLD = [[] for i in range(0, para_num)]
 
-    val, vec = np.linalg.eig(rho)
-    val = np.real(val)
     for para_i in range(0, para_num):
-        RLD_eig = np.array(
-            [[0.0 + 0.0 * 1.0j for i in range(0, dim)] for i in range(0, dim)]
-        )
-        for fi in range(0, dim):
-            for fj in range(0, dim):
-                term_tp = np.dot(vec[:, fi].conj().transpose(),np.dot(drho[para_i], vec[:, fj]))
-                if np.abs(val[fi]) > eps:
-                    RLD_eig[fi][fj] = (term_tp/val[fi])
-                else:
-                    if np.abs(term_tp) < eps:
-                        raise ValueError("The RLD does not exist. It only exist when the support of drho is contained in the support of rho.",
-            )
-        RLD_eig[RLD_eig == np.inf] = 0.0
-
         if rep == "original":
-            RLD[para_i] = np.dot(vec, np.dot(RLD_eig, vec.conj().transpose()))
+            RLD[para_i] = ctx.LD("RLD", eps)[para_i]
         elif rep == "eigen":
-            RLD[para_i] = RLD_eig
+            RLD[para_i] = ctx.LD_eig("RLD", eps)[para_i]
         else:
             raise ValueError("{!r} is not a valid value for rep, supported values are 'original' and 'eigen'.".format(rep))
     if para_num == 1:
@@ -368,7 +777,7 @@ def RLD(rho, drho, rep="original", eps=1e-8):
         return RLD
 
 
-def LLD(rho, drho, rep="original", eps=1e-8):
+def LLD(rho, drho=None, rep="original", eps=1e-8):
     r"""
     Calculation of the left logarithmic derivative (LLD) for a density matrix $\rho$.
     The LLD operator is defined by $\partial_{a}\rho=\mathcal{R}_a^{\dagger}\rho$. 
@@ -382,13 +791,14 @@ def LLD(rho, drho, rep="original", eps=1e-8):
 
     Parameters
     ----------
-    > **rho:** `matrix`
-        -- Density matrix.
+    > **rho:** `matrix or FisherContext`
+        -- Density matrix or a `FisherContext` whose cached eigendecomposition 
+        is reused.
 
     > **drho:** `list`
         -- Derivatives of the density matrix on the unknown parameters to be 
         estimated. For example, drho[0] is the derivative vector on the first 
-        parameter.
+        parameter. It is not needed if rho is a `FisherContext`.
 
     > **rep:** `string`
         -- The basis for the LLD(s). Options are:  
@@ -408,35 +818,18 @@ def LLD(rho, drho, rep="original", eps=1e-8):
         it returns a list.
     """
 
-    if type(drho) != list:
+    if not isinstance(rho, FisherContext) and type(drho) != list:
         raise TypeError("Please make sure drho is a list!")
 
-    para_num = len(drho)
-    dim = len(rho)
+    ctx = _context(rho, drho)
+    para_num = ctx.para_num
     LLD = [[] for i in range(0, para_num)]
 
-    val, vec = np.linalg.eig(rho)
-    val = np.real(val)
     for para_i in range(0, para_num):
-        LLD_eig = np.array(
-            [[0.0 + 0.0 * 1.0j for i in range(0, dim)] for i in range(0, dim)]
-        )
-        for fi in range(0, dim):
-            for fj in range(0, dim):
-                term_tp = np.dot(vec[:, fi].conj().transpose(), np.dot(drho[para_i], vec[:, fj]),)
-                if np.abs(val[fj]) > eps:
-                    LLD_eig_tp = (term_tp/val[fj])
-                    LLD_eig[fj][fi] = LLD_eig_tp.conj()
-                else: 
-                    if np.abs(term_tp) < eps:
-                        raise ValueError("The LLD does not exist. It only exist when the support of drho is contained in the support of rho.",
-            )
-        LLD_eig[LLD_eig == np.inf] = 0.0
-
         if rep == "original":
-            LLD[para_i] = np.dot(vec, np.dot(LLD_eig, vec.conj().transpose()))
+            LLD[para_i] = ctx.LD("LLD", eps)[para_i]
         elif rep == "eigen":
-            LLD[para_i] = LLD_eig
+            LLD[para_i] = ctx.LD_eig("LLD", eps)[para_i]
         else:
             raise ValueError("{!r} is not a valid value for rep, supported values are 'original' and 'eigen'.".format(rep))
 
@@ -446,7 +839,7 @@ def LLD(rho, drho, rep="original", eps=1e-8):
         return LLD
 
 
-def QFIM(rho, drho, LDtype="SLD", exportLD=False, eps=1e-8):
+def QFIM(rho, drho=None, LDtype="SLD", exportLD=False, eps=1e-8, rank=None):
     r"""
     Calculation of the quantum Fisher information (QFI) and quantum Fisher 
     information matrix (QFIM) for all types. The entry of QFIM $\mathcal{F}$
@@ -466,13 +859,16 @@ def QFIM(rho, drho, LDtype="SLD", exportLD=False, eps=1e-8):
 
     Parameters
     ----------
-    > **rho:** `matrix`
-        -- Density matrix.
+    > **rho:** `matrix or FisherContext`
+        -- Density matrix. It can be a dense array, a `scipy.sparse` matrix or a 
+        `FisherContext` whose cached eigendecomposition and logarithmic derivatives 
+        are reused.
 
     > **drho:** `list`
         Derivatives of the density matrix on the unknown parameters to be 
         estimated. For example, drho[0] is the derivative vector on the first 
-        parameter.
+        parameter. The derivatives can be `scipy.sparse` matrices. It is not 
+        needed if rho is a `FisherContext`.
 
     > **LDtype:** `string`
         -- Types of QFI (QFIM) can be set as the objective function. Options are:  
@@ -487,6 +883,12 @@ def QFIM(rho, drho, LDtype="SLD", exportLD=False, eps=1e-8):
     > **eps:** `float`
         -- Machine epsilon.
 
+    > **rank:** `int`
+        -- The number of the largest eigenvalues of the density matrix to be 
+        calculated. If it is set, only the support of rho is obtained via the 
+        iterative eigensolver and the QFI (QFIM) is calculated with `QFIM_support`. 
+        This mode is only available for `LDtype="SLD"` and `exportLD=False`.
+
     Returns
     ----------
     **QFI or QFIM:** `float or matrix` 
@@ -495,75 +897,407 @@ def QFIM(rho, drho, LDtype="SLD", exportLD=False, eps=1e-8):
         is more than one), it returns QFIM.
     """
 
-    if type(drho) != list:
+    if not isinstance(rho, FisherContext) and type(drho) != list:
         raise TypeError("Please make sure drho is a list")
 
-    para_num = len(drho)
+    ctx = _context(rho, drho)
+
+    if rank is not None:
+        if LDtype != "SLD" or exportLD == True:
+            raise ValueError("The rank-restricted QFIM is only available for LDtype='SLD' without exporting the SLDs.")
+        return QFIM_support(ctx.rho, ctx.drho, rank=rank, eps=eps)
+
+    para_num = ctx.para_num
+    QFIM_res = precision_promote(_QFIM_LD_eig(ctx.eig[0], ctx.LD_eig(LDtype, eps), LDtype))
+
+    if exportLD == True:
+        LD_tp = ctx.LD(LDtype, eps)
 
     # single parameter estimation
     if para_num == 1:
-        if LDtype == "SLD":
-            LD_tp = SLD(rho, drho, eps=eps)
-            SLD_ac = np.dot(LD_tp, LD_tp) + np.dot(LD_tp, LD_tp)
-            QFIM_res = np.real(0.5 * np.trace(np.dot(rho, SLD_ac)))
-        elif LDtype == "RLD":
-            LD_tp = RLD(rho, drho, eps=eps)
-            QFIM_res = np.real(
-                np.trace(np.dot(rho, np.dot(LD_tp, LD_tp.conj().transpose())))
-            )
-        elif LDtype == "LLD":
-            LD_tp = LLD(rho, drho, eps=eps)
-            QFIM_res = np.real(
-                np.trace(np.dot(rho, np.dot(LD_tp, LD_tp.conj().transpose())))
-            )
-        else:
-            raise ValueError("{!r} is not a valid value for LDtype, supported values are 'SLD', 'RLD' and 'LLD'.".format(LDtype))
+        QFIM_res = np.real(QFIM_res[0][0])
+        if exportLD == True:
+            LD_tp = LD_tp[0]
 
-    # multiparameter estimation
+    if exportLD == False:
+        return QFIM_res
     else:
-        if LDtype == "SLD":
-            QFIM_res = np.zeros([para_num, para_num])
-            LD_tp = SLD(rho, drho, eps=eps)
-            for para_i in range(0, para_num):
-                for para_j in range(para_i, para_num):
-                    SLD_ac = np.dot(LD_tp[para_i], LD_tp[para_j]) + np.dot(
-                        LD_tp[para_j], LD_tp[para_i]
-                    )
-                    QFIM_res[para_i][para_j] = np.real(
-                        0.5 * np.trace(np.dot(rho, SLD_ac))
-                    )
-                    QFIM_res[para_j][para_i] = QFIM_res[para_i][para_j]
-        elif LDtype == "RLD":
-            QFIM_res = np.zeros((para_num, para_num), dtype=np.complex128)
-            LD_tp = RLD(rho, drho, eps=eps)
-            for para_i in range(0, para_num):
-                for para_j in range(para_i, para_num):
-                    QFIM_res[para_i][para_j] = np.trace(
-                            np.dot(
-                                rho,
-                                np.dot(LD_tp[para_i], LD_tp[para_j].conj().transpose()),
-                            )
-                        )
-                    QFIM_res[para_j][para_i] = QFIM_res[para_i][para_j].conj()
-        elif LDtype == "LLD":
-            QFIM_res = np.zeros((para_num, para_num), dtype=np.complex128)
-            LD_tp = LLD(rho, drho, eps=eps)
-            for para_i in range(0, para_num):
-                for para_j in range(para_i, para_num):
-                    QFIM_res[para_i][para_j] = np.trace(
-                            np.dot(
-                                rho,
-                                np.dot(LD_tp[para_i], LD_tp[para_j].conj().transpose()),
-                            )
-                        )
-                    QFIM_res[para_j][para_i] = QFIM_res[para_i][para_j].conj()
-        else:
-            raise ValueError("{!r} is not a valid value for LDtype, supported values are 'SLD', 'RLD' and 'LLD'.".format(LDtype))
+        return QFIM_res, LD_tp
+
+
+def QFIM_batch(rho, drho, LDtype="SLD", exportLD=False, eps=1e-8):
+    r"""
+    Calculation of the quantum Fisher information matrix (QFIM) for a stack of 
+    density matrices. All the density matrices are diagonalized with one batched 
+    call of `eigh` and the SLDs are obtained as 
+    \begin{align}
+    \langle\lambda_i|L_{a}|\lambda_j\rangle=\frac{2\langle\lambda_i| \partial_{a}\rho |\lambda_j\rangle}{\lambda_i+\lambda_j}
+    \end{align}
+
+    for all the entries at once. The entry of QFIM is then calculated in the eigenspace 
+    via $\mathcal{F}_{ab}=\sum_{ij}\frac{1}{2}(\lambda_i+\lambda_j)\mathrm{Re}
+    (\langle\lambda_i|L_a|\lambda_j\rangle\langle\lambda_j|L_b|\lambda_i\rangle)$.
+    The RLDs (LLDs) are obtained in the same way by dividing the derivatives by 
+    $\lambda_i$ ($\lambda_j$) and 
+    $\mathcal{F}_{ab}=\sum_{ij}\lambda_i\langle\lambda_i|\mathcal{R}_a|\lambda_j\rangle
+    \langle\lambda_i|\mathcal{R}_b|\lambda_j\rangle^*$.
+
+    Parameters
+    ----------
+    > **rho:** `array`
+        -- Density matrices with the shape (N, d, d).
+
+    > **drho:** `array`
+        -- Derivatives of the density matrices on the unknown parameters to be 
+        estimated with the shape (N, P, d, d). For example, drho[n][0] is the 
+        derivative of rho[n] on the first parameter.
+
+    > **LDtype:** `string`
+        -- Types of QFIM. Options are:  
+        "SLD" (default) -- QFIM based on symmetric logarithmic derivative (SLD).  
+        "RLD" -- QFIM based on right logarithmic derivative (RLD).  
+        "LLD" -- QFIM based on left logarithmic derivative (LLD).
+
+    > **exportLD:** `bool`
+        -- Whether or not to export the values of logarithmic derivatives. If set 
+        True then the logarithmic derivatives with the shape (N, P, d, d) will be 
+        exported.
+
+    > **eps:** `float`
+        -- Machine epsilon.
+
+    Returns
+    ----------
+    **QFIM:** `array`
+        -- QFIMs with the shape (N, P, P). The output is always a stack of matrices, 
+        also for single parameter estimation.
+    """
+
+    rho = np.asarray(rho)
+    drho = np.asarray(drho)
+    if rho.ndim < 3 or drho.ndim != rho.ndim + 1:
+        raise ValueError("Please make sure the shapes of rho and drho are (N, d, d) and (N, P, d, d)!")
+
+    val, vec = np.linalg.eigh(precision_cast(rho))
+    LD_eig = _LD_eig(val, _eig_project(vec, precision_cast(drho)), LDtype, eps)
+    QFIM_res = precision_promote(_QFIM_LD_eig(val, LD_eig, LDtype))
 
     if exportLD == False:
         return QFIM_res
     else:
-        return QFIM_res, LD_tp
+        vec = vec[..., None, :, :]
+        LD = vec @ LD_eig @ vec.conj().swapaxes(-1, -2)
+        return QFIM_res, LD
+
+
+def QFIM_trajectory(rho_t, drho_t, LDtype="SLD", warm_start=True, eps=1e-8, tol=1e-10):
+    r"""
+    Calculation of the quantum Fisher information matrix (QFIM) along a trajectory 
+    of density matrices, for example the output of `Lindblad.expm()` or 
+    `Lindblad.ode()`. For low-rank states the support of each density matrix is 
+    obtained from the support of the previous step via subspace iteration: the 
+    previous eigenvectors $V$ are replaced by the orthonormalized columns of 
+    $\rho V$ and rotated by the eigenvectors of the projected matrix until the 
+    residuals $\Vert\rho|\lambda_i\rangle-\lambda_i|\lambda_i\rangle\Vert$ are below 
+    tol. The SLD based QFIM is then calculated on the support as in `QFIM_support`. 
+    A full diagonalization is used at the first step, when the iteration does not 
+    converge or when the rank grows beyond the tracked subspace. For full-rank 
+    trajectories all the steps are diagonalized in one batched call.
+
+    Parameters
+    ----------
+    > **rho_t:** `list`
+        -- Density matrices at all the time steps, the shape is (T, d, d).
+
+    > **drho_t:** `list`
+        -- Derivatives of the density matrices on the unknown parameters to be 
+        estimated at all the time steps, the shape is (T, P, d, d).
+
+    > **LDtype:** `string`
+        -- Types of QFIM. Options are:  
+        "SLD" (default) -- QFIM based on symmetric logarithmic derivative (SLD).  
+        "RLD" -- QFIM based on right logarithmic derivative (RLD).  
+        "LLD" -- QFIM based on left logarithmic derivative (LLD).  
+        The warm start is only used for the SLD.
+
+    > **warm_start:** `bool`
+        -- Whether or not to start from the support of the previous step. If set 
+        False all the density matrices are diagonalized independently.
+
+    > **eps:** `float`
+        -- Machine epsilon.
+
+    > **tol:** `float`
+        -- Tolerance of the residuals of the warm-started eigenvectors.
+
+    Returns
+    ----------
+    **QFIM:** `array`
+        -- QFIMs with the shape (T, P, P).
+    """
+
+    rho_t = precision_cast(np.asarray(rho_t))
+    drho_t = precision_cast(np.asarray(drho_t))
+    if rho_t.ndim != 3 or drho_t.ndim != 4:
+        raise ValueError("Please make sure the shapes of rho_t and drho_t are (T, d, d) and (T, P, d, d)!")
+
+    dim = rho_t.shape[-1]
+    eps, tol = _eps_floor(eps, rho_t.dtype), _eps_floor(tol, rho_t.dtype)
+    QFIM_res = np.zeros(drho_t.shape[:2] + drho_t.shape[1:2])
+    vec = None
+    for ti in range(len(rho_t)):
+        if warm_start == False or LDtype != "SLD":
+            break
+        if vec is not None:
+            val, vec = _support_warm(rho_t[ti], vec, eps, tol)
+        if vec is None:
+            val, vec = np.linalg.eigh(rho_t[ti])
+            rank = np.sum(val > eps)
+            if rank > dim // 2:
+                break
+            # a few more eigenvectors than the rank are tracked to follow its growth
+            num = min(dim, rank + max(rank, 4))
+            val, vec = val[-num:], vec[:, -num:]
+        idx = val > eps
+        QFIM_res[ti] = _QFIM_support_eig(val[idx], vec[:, idx], drho_t[ti])
+    else:
+        return QFIM_res
+
+    QFIM_res[ti:] = QFIM_batch(rho_t[ti:], drho_t[ti:], LDtype=LDtype, eps=eps)
+    return QFIM_res
+
+
+def _support_warm(rho, vec, eps, tol, max_iter=5):
+    # subspace iteration with the Rayleigh-Ritz projection starting from vec (d, m)
+    for _ in range(max_iter):
+        Q, _ = np.linalg.qr(rho @ vec)
+        rho_Q = rho @ Q
+        val, U = np.linalg.eigh(Q.conj().T @ rho_Q)
+        vec = Q @ U
+        res = np.linalg.norm(rho_Q @ U - vec * val, axis=0)
+        if np.all(res[val > eps] < tol):
+            if val[0] > eps:
+                return None, None
+            return val, vec
+    return None, None
+
+
+def QFIM_support(rho, drho, rank=None, factor=None, eps=1e-8):
+    r"""
+    Calculation of the SLD based quantum Fisher information (QFI) and quantum 
+    Fisher information matrix (QFIM) from the support of the density matrix. 
+    With $\{\lambda_i, |\lambda_i\rangle\}$ the nonzero eigenvalues and the 
+    corresponding eigenvectors of $\rho$, the entry of QFIM is
+    \begin{align}
+    \mathcal{F}_{ab}=\sum_{i,j}\frac{2\mathrm{Re}(\langle\lambda_i|\partial_a\rho|\lambda_j\rangle
+    \langle\lambda_j|\partial_b\rho|\lambda_i\rangle)}{\lambda_i+\lambda_j}
+    +\sum_{i}\frac{4}{\lambda_i}\mathrm{Re}\left(\langle\lambda_i|\partial_a\rho\partial_b\rho
+    |\lambda_i\rangle-\sum_{j}\langle\lambda_i|\partial_a\rho|\lambda_j\rangle\langle\lambda_j|
+    \partial_b\rho|\lambda_i\rangle\right),
+    \end{align}
+
+    where the second term is the contribution of the kernel of $\rho$. The cost is 
+    $O(d^2r)$ for a state with rank $r$ instead of $O(d^3)$.
+
+    Parameters
+    ----------
+    > **rho:** `matrix`
+        -- Density matrix. It can be set to None if `factor` is given.
+
+    > **drho:** `list`
+        -- Derivatives of the density matrix on the unknown parameters to be 
+        estimated. For example, drho[0] is the derivative vector on the first 
+        parameter.
+
+    > **rank:** `int`
+        -- The number of the largest eigenvalues of rho calculated by the iterative 
+        Hermitian eigensolver `scipy.sparse.linalg.eigsh`. It should not be smaller 
+        than the rank of rho.
+
+    > **factor:** `matrix`
+        -- A matrix $A$ with the shape (d, r) satisfying $\rho=AA^{\dagger}$. If it 
+        is given, the support of rho is obtained via the singular value decomposition 
+        of $A$ and rho is not used.
+
+    > **eps:** `float`
+        -- Machine epsilon.
+
+    Returns
+    ----------
+    **QFI or QFIM:** `float or matrix` 
+        -- For single parameter estimation (the length of drho is equal to one), 
+        the output is QFI and for multiparameter estimation (the length of drho 
+        is more than one), it returns QFIM.
+    """
+
+    if type(drho) != list:
+        raise TypeError("Please make sure drho is a list")
+
+    para_num = len(drho)
+    val, vec = _support_eig(rho, rank, factor, eps)
+    QFIM_res = _QFIM_support_eig(val, vec, drho)
+
+    if para_num == 1:
+        return QFIM_res[0][0]
+    else:
+        return QFIM_res
+
+
+def QFIM_pure(psi, dpsi):
+    r"""
+    Calculation of the SLD based quantum Fisher information (QFI) and quantum 
+    Fisher information matrix (QFIM) for a pure state $|\psi\rangle$. The entry 
+    of QFIM is
+    \begin{align}
+    \mathcal{F}_{ab}=4\mathrm{Re}(\langle\partial_a\psi|\partial_b\psi\rangle
+    -\langle\partial_a\psi|\psi\rangle\langle\psi|\partial_b\psi\rangle),
+    \end{align}
+
+    which costs $O(dP^2)$ time and $O(dP)$ memory. The density matrix is not constructed.
+
+    Parameters
+    ----------
+    > **psi:** `array`
+        -- The probe state (ket) with the shape (d,) or (d, 1), or a stack of kets 
+        with the shape (N, d).
+
+    > **dpsi:** `list or array`
+        -- Derivatives of the ket on the unknown parameters to be estimated. For 
+        example, dpsi[0] is the derivative vector on the first parameter. For a 
+        stack of kets its shape is (N, P, d).
+
+    Returns
+    ----------
+    **QFI or QFIM:** `float or matrix` 
+        -- For single parameter estimation (the length of dpsi is equal to one), 
+        the output is QFI and for multiparameter estimation (the length of dpsi 
+        is more than one), it returns QFIM. For a stack of kets it returns the 
+        QFIMs with the shape (N, P, P).
+    """
+
+    psi, dpsi, batch = _ket_check(psi, dpsi)
+    dpsi_psi = np.einsum("...ai,...i->...a", dpsi.conj(), psi)
+    QFIM_res = 4 * np.real(
+        np.einsum("...ai,...bi->...ab", dpsi.conj(), dpsi)
+        - dpsi_psi[..., :, None] * dpsi_psi.conj()[..., None, :]
+    )
+
+    if batch or len(dpsi) > 1:
+        return QFIM_res
+    else:
+        return QFIM_res[0][0]
+
+
+def _support_eig(rho, rank, factor, eps):
+    if factor is not None:
+        U, s, _ = np.linalg.svd(np.asarray(factor), full_matrices=False)
+        val, vec = s**2, U
+    elif rank is None:
+        raise ValueError("Please set the rank of rho or the factor of rho!")
+    elif rank < rho.shape[0] - 1:
+        val, vec = eigsh(rho, k=rank, which="LA")
+    else:
+        val, vec = np.linalg.eigh(_dense(rho))
+        val, vec = val[-rank:], vec[:, -rank:]
+    idx = val > eps
+    return val[idx], vec[:, idx]
+
+
+def _QFIM_support_eig(val, vec, drho):
+    # W_a = drho_a V and D_a = V^dagger drho_a V
+    W = np.array([drho_i @ vec for drho_i in drho])
+    D = vec.conj().T @ W
+    val_sum = val[:, None] + val[None, :]
+    F_supp = 2 * np.real(np.einsum("aij,bij->ab", D, D.conj() / val_sum))
+    F_ker = np.einsum("ami,bmi->abi", W.conj(), W) - np.einsum("aij,bji->abi", D, D)
+    return F_supp + 4 * np.real(np.sum(F_ker / val, axis=-1))
+
+
+def _dense(A):
+    if issparse(A):
+        return A.toarray()
+    return np.asarray(A)
+
+
+def _trace_prod(A, B):
+    # Tr(AB) = sum_ij A_ij B_ji without forming the product AB
+    if issparse(A):
+        return A.multiply(B.T).sum()
+    elif issparse(B):
+        return B.multiply(A.T).sum()
+    return np.einsum("ij,ji->", A, B)
+
+
+def _eig_project(vec, drho):
+    # drho in the eigenspace of rho, the leading dimensions of vec (..., d, d) and 
+    # drho (..., P, d, d) are broadcast. Sparse derivatives are only multiplied 
+    # with the eigenvectors.
+    if type(drho) == list and issparse(drho[0]):
+        return np.array([vec.conj().T @ (drho_i @ vec) for drho_i in drho])
+    vec = vec[..., None, :, :]
+    return vec.conj().swapaxes(-1, -2) @ np.asarray(drho) @ vec
+
+
+def _SLD_eig(val, drho_eig, eps):
+    # SLDs in the eigenspace of rho, the leading dimensions of val (..., d) and 
+    # drho_eig (..., P, d, d) are broadcast.
+    eps = _eps_floor(eps, val.dtype)
+    val_sum = (val[..., :, None] + val[..., None, :])[..., None, :, :]
+    idx = np.abs(val_sum) > eps
+    return np.where(idx, 2 * drho_eig / np.where(idx, val_sum, 1.0), 0.0)
+
+
+def _RLD_eig(val, drho_eig, eps):
+    # RLDs in the eigenspace of rho, <i|R_a|j> = <i|drho_a|j>/lambda_i. The 
+    # leading dimensions of val (..., d) and drho_eig (..., P, d, d) are broadcast.
+    eps = _eps_floor(eps, val.dtype)
+    supp = np.abs(val) > eps
+    if np.any(np.abs(drho_eig) * ~supp[..., None, :, None] > eps):
+        raise ValueError("The RLD does not exist. It only exist when the support of drho is contained in the support of rho.")
+    val_inv = np.where(supp, 1.0 / np.where(supp, val, 1.0), 0.0)
+    return drho_eig * val_inv[..., None, :, None]
+
+
+def _LLD_eig(val, drho_eig, eps):
+    # LLDs in the eigenspace of rho, <j|R_a|i> = (<i|drho_a|j>/lambda_j)^*
+    eps = _eps_floor(eps, val.dtype)
+    supp = np.abs(val) > eps
+    if np.any(np.abs(drho_eig) * ~supp[..., None, None, :] > eps):
+        raise ValueError("The LLD does not exist. It only exist when the support of drho is contained in the support of rho.")
+    val_inv = np.where(supp, 1.0 / np.where(supp, val, 1.0), 0.0)
+    return (drho_eig * val_inv[..., None, None, :]).conj().swapaxes(-1, -2)
+
+
+def _eps_floor(eps, dtype):
+    # the cutoff is kept above the rounding error of the working precision, 
+    # about 1e-6 in the single precision mode
+    return max(eps, 10 * np.finfo(np.result_type(dtype, np.float32)).eps)
+
+
+def _LD_eig(val, drho_eig, LDtype, eps):
+    if LDtype == "SLD":
+        return _SLD_eig(val, drho_eig, eps)
+    elif LDtype == "RLD":
+        return _RLD_eig(val, drho_eig, eps)
+    elif LDtype == "LLD":
+        return _LLD_eig(val, drho_eig, eps)
+    else:
+        raise ValueError("{!r} is not a valid value for LDtype, supported values are 'SLD', 'RLD' and 'LLD'.".format(LDtype))
+
+
+def _QFIM_LD_eig(val, LD_eig, LDtype):
+    # F_ab = Tr(rho R_a R_b^dagger) = sum_ij lambda_i <i|R_a|j><i|R_b|j>^* for RLD and LLD
+    if LDtype == "SLD":
+        return _QFIM_SLD_eig(val, LD_eig)
+    return np.einsum("...i,...aij,...bij->...ab", val, LD_eig, LD_eig.conj())
+
+
+def _QFIM_SLD_eig(val, SLD_eig):
+    # F_ab = 1/2 * sum_ij (lambda_i + lambda_j) Re(L_a[i,j] * conj(L_b[i,j]))
+    val_sum = val[..., :, None] + val[..., None, :]
+    return 0.5 * np.real(
+        np.einsum("...ij,...aij,...bij->...ab", val_sum, SLD_eig, SLD_eig.conj())
+    )
 
 
 def QFIM_Kraus(rho0, K, dK, LDtype="SLD", exportLD=False, eps=1e-8):
@@ -577,7 +1311,7 @@ def QFIM_Kraus(rho0, K, dK, LDtype="SLD", exportLD=False, eps=1e-8):
         -- Initial state (density matrix).
 
     > **K:** `list`
-        -- Kraus operator(s).
+        -- Kraus operator(s). The operators can be `scipy.sparse` matrices.
 
     > **dK:** `list` 
         -- Derivatives of the Kraus operator(s) on the unknown parameters to be 
@@ -605,13 +1339,13 @@ def QFIM_Kraus(rho0, K, dK, LDtype="SLD", exportLD=False, eps=1e-8):
     """
 
     dK = [[dK[i][j] for i in range(len(K))] for j in range(len(dK[0]))]
-    rho = sum([np.dot(Ki, np.dot(rho0, Ki.conj().T)) for Ki in K])
+    rho = sum([Ki @ rho0 @ Ki.conj().T for Ki in K])
     drho = [
                 sum(
                     [
                         (
-                            np.dot(dKi, np.dot(rho0, Ki.conj().T))
-                            + np.dot(Ki, np.dot(rho0, dKi.conj().T))
+                            dKi @ rho0 @ Ki.conj().T
+                            + Ki @ rho0 @ dKi.conj().T
                         )
                         for (Ki, dKi) in zip(K, dKj)
                     ]
@@ -624,12 +1358,16 @@ def QFIM_Kraus(rho0, K, dK, LDtype="SLD", exportLD=False, eps=1e-8):
 def QFIM_Bloch(r, dr, eps=1e-8):
     """
     Calculation of the SLD based quantum Fisher information (QFI) and quantum  
-    Fisher information matrix (QFIM) in Bloch representation.
+    Fisher information matrix (QFIM) in Bloch representation. For qudits the 
+    anticommutators of the SU($N$) generators are obtained from the cached table 
+    of the symmetric structure constants (see `suN_structure`).
 
     Parameters
     ----------
     > **r:** `list`
-        -- Parameterized Bloch vector.
+        -- Parameterized Bloch vector. A stack of Bloch vectors with the shape 
+        (N, $d^2-1$) can be input together with dr of the shape (N, P, $d^2-1$), 
+        in which case the QFIMs with the shape (N, P, P) are returned.
 
     > **dr:** `list `
         -- Derivatives of the Bloch vector on the unknown parameters to be 
@@ -647,77 +1385,63 @@ def QFIM_Bloch(r, dr, eps=1e-8):
         is more than one), it returns QFIM.
     """
 
+    if type(r) == np.ndarray and r.ndim == 2:
+        return _QFIM_Bloch(r, np.asarray(dr), eps)
+
     if type(dr) != list:
         raise TypeError("Please make sure dr is a list")
 
-    para_num = len(dr)
-    QFIM_res = np.zeros([para_num, para_num])
+    QFIM_res = _QFIM_Bloch(np.array([r]), np.array([dr]), eps)[0]
+    if len(dr) == 1:
+        return QFIM_res[0][0]
+    else:
+        return QFIM_res
+
 
-    dim = int(np.sqrt(len(r) + 1))
-    Lambda = suN_generator(dim)
+def _QFIM_Bloch(r, dr, eps):
+    # r (N, d^2-1) and dr (N, P, d^2-1)
+    r = np.real(r)
+    dr = np.real(dr)
+    num = r.shape[-1]
+    dim = int(np.sqrt(num + 1))
+    dr_dr = np.einsum("nai,nbi->nab", dr, dr)
 
     if dim == 2:
         #### single-qubit system ####
-        r_norm = np.linalg.norm(r) ** 2
-        if np.abs(r_norm - 1.0) < eps:
-            for para_i in range(0, para_num):
-                for para_j in range(para_i, para_num):
-                    QFIM_res[para_i][para_j] = np.real(np.inner(dr[para_i], dr[para_j]))
-                    QFIM_res[para_j][para_i] = QFIM_res[para_i][para_j]
-        else:
-            for para_i in range(0, para_num):
-                for para_j in range(para_i, para_num):
-                    QFIM_res[para_i][para_j] = np.real(
-                        np.inner(dr[para_i], dr[para_j])
-                        + np.inner(r, dr[para_i])
-                        * np.inner(r, dr[para_j])
-                        / (1 - r_norm)
-                    )
-                    QFIM_res[para_j][para_i] = QFIM_res[para_i][para_j]
-    else:
-        rho = np.identity(dim, dtype=np.complex128) / dim
-        for di in range(dim**2 - 1):
-            rho += np.sqrt(dim * (dim - 1) / 2) * r[di] * Lambda[di] / dim
-
-        G = np.zeros((dim**2 - 1, dim**2 - 1), dtype=np.complex128)
-        for row_i in range(dim**2 - 1):
-            for col_j in range(row_i, dim**2 - 1):
-                anti_commu = np.dot(Lambda[row_i], Lambda[col_j]) + np.dot(
-                    Lambda[col_j], Lambda[row_i]
-                )
-                G[row_i][col_j] = 0.5 * np.trace(np.dot(rho, anti_commu))
-                G[col_j][row_i] = G[row_i][col_j]
-
-        mat_tp = G * dim / (2 * (dim - 1)) - np.dot(
-            np.array(r).reshape(len(r), 1), np.array(r).reshape(1, len(r))
+        r_norm = np.sum(r**2, axis=-1)
+        r_dr = np.einsum("ni,nai->na", r, dr)
+        mixed = np.abs(r_norm - 1.0) >= eps
+        denom = np.where(mixed, 1 - r_norm, 1.0)
+        QFIM_res = dr_dr + mixed[:, None, None] * (
+            r_dr[:, :, None] * r_dr[:, None, :] / denom[:, None, None]
         )
-        mat_inv = inv(mat_tp)
-
-        for para_m in range(0, para_num):
-            for para_n in range(para_m, para_num):
-                QFIM_res[para_m][para_n] = np.real(
-                    np.dot(
-                        np.array(dr[para_n]).reshape(1, len(r)),
-                        np.dot(mat_inv, np.array(dr[para_m]).reshape(len(r), 1)),
-                    )[0][0]
-                )
-                QFIM_res[para_n][para_m] = QFIM_res[para_m][para_n]
-
-    if para_num == 1:
-        return QFIM_res[0][0]
     else:
-        return QFIM_res
+        # G_ab = Tr(rho{lambda_a, lambda_b})/2 = 2/d delta_ab + 2c/d sum_k d_abk r_k 
+        # with the symmetric structure constants d_abk and c = sqrt(d(d-1)/2)
+        coef = np.sqrt(dim * (dim - 1) / 2)
+        d_r = np.real(suN_structure(dim) @ r.T).T.reshape(len(r), num, num)
+        G = 2 / dim * np.identity(num) + 2 * coef / dim * d_r
+        mat_tp = G * dim / (2 * (dim - 1)) - r[:, :, None] * r[:, None, :]
+        mat_inv = np.linalg.inv(mat_tp)
+        QFIM_res = np.einsum("nai,nij,nbj->nab", dr, mat_inv, dr)
+
+    return QFIM_res
 
 
 def QFIM_Gauss(R, dR, D, dD):
     """
     Calculation of the SLD based quantum Fisher information (QFI) and quantum 
-    Fisher information matrix (QFIM) with gaussian states.
+    Fisher information matrix (QFIM) with gaussian states. The Williamson 
+    decomposition of the covariance matrix is calculated once and the coefficients 
+    of all the modes are obtained with tensor contractions.
 
     Parameters
     ----------
     > **R:** `array` 
-        -- First-order moment.
+        -- First-order moment. A stack of first-order moments with the shape 
+        (N, 2m) can be input together with the stacks of dR (N, P, 2m), 
+        D (N, 2m, 2m) and dD (N, P, 2m, 2m), in which case the QFIMs with the 
+        shape (N, P, P) are returned.
 
     > **dR:** `list`
         -- Derivatives of the first-order moment on the unknown parameters to be 
@@ -743,29 +1467,30 @@ def QFIM_Gauss(R, dR, D, dD):
         is more than one), it returns QFIM.
     """
 
-    para_num = len(dR)
+    R = np.asarray(R)
+    if R.ndim == 2:
+        return np.array(
+            [_QFIM_Gauss(R[n], dR[n], D[n], dD[n]) for n in range(len(R))]
+        )
+
+    QFIM_res = _QFIM_Gauss(R, dR, D, dD)
+    if len(dR) == 1:
+        return QFIM_res[0][0]
+    else:
+        return QFIM_res
+
+
+def _QFIM_Gauss(R, dR, D, dD):
+    R = np.asarray(R)
+    dR = np.asarray(dR)
+    D = np.asarray(D)
+    dD = np.asarray(dD)
     m = int(len(R) / 2)
-    QFIM_res = np.zeros([para_num, para_num])
 
-    C = np.array(
-        [
-            [D[i][j] - R[i] * R[j] for j in range(2 * m)]
-            for i in range(2 * m)
-        ]
-    )
-    dC = [
-        np.array(
-            [
-                [
-                    dD[k][i][j] - dR[k][i] * R[j] - R[i] * dR[k][j]
-                    for j in range(2 * m)
-                ]
-                for i in range(2 * m)
-            ]
-        )
-        for k in range(para_num)
-    ]
+    C = D - np.outer(R, R)
+    dC = dD - dR[:, :, None] * R[None, None, :] - R[None, :, None] * dR[:, None, :]
 
+    # Williamson decomposition C = S diag(c, c) S^T
     C_sqrt = sqrtm(C)
     J = np.kron([[0, 1], [-1, 0]], np.eye(m))
     B = C_sqrt @ J @ C_sqrt
@@ -776,43 +1501,23 @@ def QFIM_Gauss(R, dR, D, dD):
     c = vals[::2].imag
     Diag = np.diagflat(c**-0.5)
     S = inv(J @ C_sqrt @ Q @ P @ np.kron([[0, 1], [-1, 0]], -Diag)).T @ P.T
+    S_inv = inv(S)
 
     sx = np.array([[0.0, 1.0], [1.0, 0.0]])
     sy = np.array([[0.0, -1.0j], [1.0j, 0.0]])
     sz = np.array([[1.0, 0.0], [0.0, -1.0]])
-    a_Gauss = [1j * sy, sz, np.eye(2), sx]
-
-    es = [
-        [np.eye(1, m**2, m * i + j).reshape(m, m) for j in range(m)] for i in range(m)
-    ]
-
-    As = [[np.kron(s, a_Gauss[i]) / np.sqrt(2) for s in es] for i in range(4)]
-    gs = [
-        [[[np.trace(inv(S) @ dC @ inv(S.T) @ aa.T) for aa in a] for a in A] for A in As]
-        for dC in dC
-    ]
-    G = [np.zeros((2 * m, 2 * m)).astype(np.longdouble) for _ in range(para_num)]
-
-    for i in range(para_num):
-        for j in range(m):
-            for k in range(m):
-                for l in range(4):
-                    G[i] += np.real(
-                        gs[i][l][j][k]
-                        / (4 * c[j] * c[k] + (-1) ** (l + 1))
-                        * inv(S.T)
-                        @ As[l][j][k]
-                        @ inv(S)
-                    )
-
-    QFIM_res += np.real(
-        [
-            [np.trace(G[i] @ dC[j]) + dR[i] @ inv(C) @ dR[j] for j in range(para_num)]
-            for i in range(para_num)
-        ]
+    a_Gauss = np.array([1j * sy, sz, np.eye(2), sx])
+
+    # gs[i][l][j][k] = Tr(S^{-1} dC_i S^{-T} (E_jk \otimes a_l)^T)/sqrt(2) for all 
+    # the modes j, k at once
+    Y = (S_inv @ dC @ S_inv.T).reshape(len(dC), m, 2, m, 2)
+    gs = np.einsum("ijakb,lab->iljk", Y, a_Gauss) / np.sqrt(2)
+    sign = np.array([-1.0, 1.0, -1.0, 1.0])
+    w = gs / (4 * c[None, None, :, None] * c[None, None, None, :] + sign[None, :, None, None])
+    Z = np.einsum("iljk,lab->ijakb", w, a_Gauss).reshape(len(dC), 2 * m, 2 * m) / np.sqrt(2)
+    G = np.real(S_inv.T @ Z @ S_inv)
+
+    QFIM_res = np.real(
+        np.einsum("iab,jba->ij", G, dC) + dR @ inv(C) @ dR.T
     )
-
-    if para_num == 1:
-        return QFIM_res[0][0]
-    else:
-        return QFIM_res
+    return QFIM_res
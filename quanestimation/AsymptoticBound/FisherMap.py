@@ -0,0 +1,259 @@
+import os
+import numpy as np
+from itertools import islice
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from quanestimation.AsymptoticBound.CramerRao import QFIM_batch, CFIM_batch
+
+
+def qfim_map(rho, drho, LDtype="SLD", eps=1e-8, workers=None, executor="thread", chunksize=None, progress=None, out=None):
+    r"""
+    Calculation of the quantum Fisher information matrices (QFIMs) for a large
+    number of independent density matrices, for example on the grid of a
+    Bayesian scan. The states are split into chunks which are calculated with
+    `QFIM_batch` in a thread or process pool, and the results are written into
+    the output array in the input order.
+
+    Parameters
+    ----------
+    > **rho:** `array or iterable`
+        -- Density matrices with the shape (N, d, d), or an iterable of density
+        matrices which is consumed chunk by chunk.
+
+    > **drho:** `array or iterable`
+        -- Derivatives of the density matrices on the unknown parameters to be
+        estimated with the shape (N, P, d, d), or an iterable of the lists of
+        derivatives.
+
+    > **LDtype:** `string`
+        -- Types of QFIM. Options are:
+        "SLD" (default) -- QFIM based on symmetric logarithmic derivative (SLD).
+        "RLD" -- QFIM based on right logarithmic derivative (RLD).
+        "LLD" -- QFIM based on left logarithmic derivative (LLD).
+
+    > **eps:** `float`
+        -- Machine epsilon.
+
+    > **workers:** `int`
+        -- Number of workers. The default is the number of processors.
+
+    > **executor:** `string or Executor`
+        -- Options are:
+        "thread" (default) -- `ThreadPoolExecutor`, the LAPACK kernels release the GIL.
+        "process" -- `ProcessPoolExecutor`, rho and drho are copied once into
+        shared memory and each task only receives its index range.
+        An instance of `concurrent.futures.Executor` is used as it is and is not
+        shut down.
+
+    > **chunksize:** `int`
+        -- Number of states per task. The default splits the states into about four
+        chunks per worker.
+
+    > **progress:** `callable`
+        -- A function called as progress(done, total) after each finished chunk,
+        total is None if the number of states is unknown.
+
+    > **out:** `array`
+        -- Preallocated output array with the shape (N, P, P).
+
+    Returns
+    ----------
+    **QFIM:** `array`
+        -- QFIMs with the shape (N, P, P).
+    """
+
+    return _fisher_map(_qfim_chunk, (LDtype, eps), rho, drho, workers, executor, chunksize, progress, out)
+
+
+def cfim_map(rho, drho, M=[], eps=1e-8, workers=None, executor="thread", chunksize=None, progress=None, out=None):
+    r"""
+    Calculation of the classical Fisher information matrices (CFIMs) for a large
+    number of independent density matrices with the same measurement. The states
+    are split into chunks which are calculated with `CFIM_batch` in a thread or
+    process pool, and the results are written into the output array in the input
+    order.
+
+    Parameters
+    ----------
+    > **rho:** `array or iterable`
+        -- Density matrices with the shape (N, d, d), or an iterable of density
+        matrices which is consumed chunk by chunk.
+
+    > **drho:** `array or iterable`
+        -- Derivatives of the density matrices on the unknown parameters to be
+        estimated with the shape (N, P, d, d), or an iterable of the lists of
+        derivatives.
+
+    > **M:** `list of matrices or array`
+        -- A set of positive operator-valued measure (POVM), see `CFIM`. The default
+        measurement is a set of rank-one symmetric informationally complete POVM
+        (SIC-POVM).
+
+    > **eps:** `float`
+        -- Machine epsilon.
+
+    > **workers:** `int`
+        -- Number of workers. The default is the number of processors.
+
+    > **executor:** `string or Executor`
+        -- Options are:
+        "thread" (default) -- `ThreadPoolExecutor`, the LAPACK kernels release the GIL.
+        "process" -- `ProcessPoolExecutor`, rho and drho are copied once into
+        shared memory and each task only receives its index range.
+        An instance of `concurrent.futures.Executor` is used as it is and is not
+        shut down.
+
+    > **chunksize:** `int`
+        -- Number of states per task. The default splits the states into about four
+        chunks per worker.
+
+    > **progress:** `callable`
+        -- A function called as progress(done, total) after each finished chunk,
+        total is None if the number of states is unknown.
+
+    > **out:** `array`
+        -- Preallocated output array with the shape (N, P, P).
+
+    Returns
+    ----------
+    **CFIM:** `array`
+        -- CFIMs with the shape (N, P, P).
+    """
+
+    return _fisher_map(_cfim_chunk, (M, eps), rho, drho, workers, executor, chunksize, progress, out)
+
+
+def _qfim_chunk(rho, drho, LDtype, eps):
+    return QFIM_batch(rho, drho, LDtype=LDtype, eps=eps)
+
+
+def _cfim_chunk(rho, drho, M, eps):
+    return CFIM_batch(rho, drho, M=M, eps=eps)
+
+
+def _shared_chunk(func, args, blocks, start, stop):
+    # calculation of a chunk in a worker process from the shared rho and drho
+    from multiprocessing.shared_memory import SharedMemory
+
+    shms = [SharedMemory(name=name) for name, _, _ in blocks]
+    try:
+        rho, drho = [
+            np.ndarray(shape, dtype=dtype, buffer=shm.buf)[start:stop]
+            for shm, (_, shape, dtype) in zip(shms, blocks)
+        ]
+        res = np.array(func(rho, drho, *args))
+        del rho, drho
+        return res
+    finally:
+        for shm in shms:
+            shm.close()
+
+
+def _share(arrays):
+    # copy the arrays into shared memory blocks, the blocks are described by
+    # (name, shape, dtype) for the workers
+    from multiprocessing.shared_memory import SharedMemory
+
+    shms, blocks = [], []
+    for A in arrays:
+        A = np.asarray(A)
+        shm = SharedMemory(create=True, size=max(A.nbytes, 1))
+        shms.append(shm)
+        np.ndarray(A.shape, dtype=A.dtype, buffer=shm.buf)[...] = A
+        blocks.append((shm.name, A.shape, A.dtype.str))
+    return shms, blocks
+
+
+def _tasks(func, args, rho, drho, chunksize, blocks):
+    # (start, number of states, function, arguments) of the tasks
+    if blocks is not None:
+        total = blocks[0][1][0]
+        for start in range(0, total, chunksize):
+            stop = min(start + chunksize, total)
+            yield start, stop - start, _shared_chunk, (func, args, blocks, start, stop)
+    else:
+        for start, rho_tp, drho_tp in _chunks(rho, drho, chunksize):
+            yield start, len(rho_tp), func, (rho_tp, drho_tp) + tuple(args)
+
+
+def _chunks(rho, drho, chunksize):
+    # (start, rho, drho) of consecutive chunks, arrays are sliced and iterables
+    # are consumed lazily
+    if hasattr(rho, "__getitem__") and hasattr(rho, "__len__") and hasattr(drho, "__getitem__"):
+        for start in range(0, len(rho), chunksize):
+            yield start, np.asarray(rho[start : start + chunksize]), np.asarray(drho[start : start + chunksize])
+    else:
+        rho, drho = iter(rho), iter(drho)
+        start = 0
+        while True:
+            rho_tp = list(islice(rho, chunksize))
+            if rho_tp == []:
+                return
+            drho_tp = list(islice(drho, len(rho_tp)))
+            yield start, np.array(rho_tp), np.array(drho_tp)
+            start += len(rho_tp)
+
+
+def _fisher_map(func, args, rho, drho, workers, executor, chunksize, progress, out):
+    total = len(rho) if hasattr(rho, "__len__") else None
+    workers = os.cpu_count() if workers is None else workers
+    if chunksize is None:
+        chunksize = max(1, -(-total // (4 * workers))) if total else 64
+
+    if isinstance(executor, Executor):
+        pool = executor
+    elif executor == "thread":
+        pool = ThreadPoolExecutor(max_workers=workers)
+    elif executor == "process":
+        pool = ProcessPoolExecutor(max_workers=workers)
+    else:
+        raise ValueError("{!r} is not a valid value for executor, supported values are 'thread', 'process' or an Executor.".format(executor))
+
+    # states of a process pool are passed via shared memory instead of pickling
+    # every chunk
+    shms, blocks = [], None
+    if isinstance(pool, ProcessPoolExecutor) and total is not None and hasattr(drho, "__len__"):
+        shms, blocks = _share([rho, drho])
+
+    res_list = []
+    pending = {}
+    state = {"done": 0, "out": out}
+
+    def collect(futures):
+        for future in futures:
+            start, num = pending.pop(future)
+            res = future.result()
+            if state["out"] is None and total is not None:
+                state["out"] = np.zeros((total,) + res.shape[1:], dtype=res.dtype)
+            if state["out"] is not None:
+                state["out"][start : start + num] = res
+            else:
+                res_list.append((start, res))
+            state["done"] += num
+            if progress is not None:
+                progress(state["done"], total)
+
+    try:
+        # at most two chunks per worker are in flight to cap the memory
+        for start, num, task, task_args in _tasks(func, args, rho, drho, chunksize, blocks):
+            pending[pool.submit(task, *task_args)] = (start, num)
+            if len(pending) >= 2 * workers:
+                finished, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                collect(finished)
+        collect(list(pending))
+    finally:
+        if pool is not executor:
+            pool.shutdown()
+        elif shms != []:
+            for future in pending:
+                future.cancel()
+            wait(list(pending))
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+
+    if state["out"] is not None:
+        return state["out"]
+    if res_list == []:
+        return np.zeros((0, 0, 0))
+    res_list.sort(key=lambda x: x[0])
+    return np.concatenate([res for _, res in res_list])
@@ -1,32 +1,62 @@
 from quanestimation.AsymptoticBound.CramerRao import (
     CFIM,
+    CFIM_batch,
+    CFIM_pure,
     QFIM,
+    QFIM_batch,
+    QFIM_trajectory,
+    QFIM_support,
+    QFIM_pure,
     QFIM_Bloch,
     QFIM_Gauss,
     QFIM_Kraus,
     FIM,
     FI_Expt,
+    FI_Expt_CI,
+    FI_ExptStream,
     LLD,
     RLD,
     SLD,
+    FisherContext,
+)
+from quanestimation.AsymptoticBound.FisherMap import (
+    qfim_map,
+    cfim_map,
 )
 from quanestimation.AsymptoticBound.AnalogCramerRao import (
     HCRB,
+    HCRBSolver,
     NHB,
+    NHBSolver,
+    SDPResult,
 )
 
 __all__ = [
     "CramerRao",
     "CFIM",
+    "CFIM_batch",
+    "CFIM_pure",
     "QFIM",
+    "QFIM_batch",
+    "QFIM_trajectory",
+    "QFIM_support",
+    "QFIM_pure",
     "QFIM_Bloch",
     "QFIM_Gauss",
     "QFIM_Kraus",
     "FIM",
     "FI_Expt",
+    "FI_Expt_CI",
+    "FI_ExptStream",
     "LLD",
     "RLD",
     "SLD",
+    "FisherContext",
+    "qfim_map",
+    "cfim_map",
     "HCRB",
+    "HCRBSolver",
     "NHB",
+    "NHBSolver",
+    "SDPResult",
 ]
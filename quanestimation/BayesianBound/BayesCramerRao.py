@@ -2,11 +2,11 @@ import numpy as np
 from scipy import interpolate
 from scipy.integrate import simps, solve_bvp
 from itertools import product
-from quanestimation.AsymptoticBound.CramerRao import CFIM, QFIM
-from quanestimation.Common.Common import SIC, extract_ele
+from quanestimation.AsymptoticBound.CramerRao import QFIM, CFIM_batch, QFIM_batch
+from quanestimation.AsymptoticBound.FisherMap import qfim_map, cfim_map
 
 
-def BCFIM(x, p, rho, drho, M=[], eps=1e-8):
+def BCFIM(x, p, rho, drho, M=[], eps=1e-8, workers=None, executor=None, blocksize=None):
     r"""
     Calculation of the Bayesian classical Fisher information (BCFI) and the 
     Bayesian classical Fisher information matrix (BCFIM) of the form
@@ -24,12 +24,16 @@ def BCFIM(x, p, rho, drho, M=[], eps=1e-8):
     > **p:** `multidimensional array`
         -- The prior distribution.
 
-    > **rho:** `multidimensional list`
-        -- Parameterized density matrix.
+    > **rho:** `multidimensional list, array or callable`
+        -- Parameterized density matrix on the grid of x, an array with the shape 
+        (n1, ..., nk, d, d). Memory-mapped arrays, paths of .npy files and HDF5 
+        datasets are read block by block. It can also be a function of the values 
+        of the parameters (a float or a list) returning the tuple (rho, drho), 
+        for example `FiniteDifference`, then drho is None.
 
-    > **drho:** `multidimensional list`
+    > **drho:** `multidimensional list or array`
         -- Derivatives of the parameterized density matrix (rho) with respect to the unknown
-        parameters to be estimated.
+        parameters to be estimated, an array with the shape (n1, ..., nk, P, d, d).
 
     > **M:** `list of matrices`
         -- A set of positive operator-valued measure (POVM). The default measurement 
@@ -38,6 +42,22 @@ def BCFIM(x, p, rho, drho, M=[], eps=1e-8):
     > **eps:** `float`
         -- Machine epsilon.
 
+    > **workers:** `int`
+        -- Number of workers for the Fisher information matrices of the grid points, 
+        see `qfim_map` and `cfim_map`. The grid is calculated in one batched call if 
+        neither workers nor executor is set.
+
+    > **executor:** `string or Executor`
+        -- Options are "thread", "process" (the grid is placed in shared memory) or an 
+        instance of `concurrent.futures.Executor`. The default is "thread" if workers 
+        is set. The output does not depend on the order in which the chunks finish.
+
+    > **blocksize:** `int`
+        -- Maximum number of grid points whose states are held in memory at once. 
+        The integrals over the inner axes are accumulated block by block and the 
+        result is the same as for the whole grid. The whole grid is read at once 
+        if it is not set.
+
     Returns
     ----------
     **BCFI or BCFIM:** `float or matrix`
@@ -51,68 +71,13 @@ def BCFIM(x, p, rho, drho, M=[], eps=1e-8):
         solutions.html).
     """
 
-    para_num = len(x)
-    if para_num == 1:
-        #### single parameter scenario ####
-        if M == []:
-            M = SIC(len(rho[0]))
-        else:
-            if type(M) != list:
-                raise TypeError("Please make sure M is a list!")
-
-        p_num = len(p)
-        if type(drho[0]) == list:
-            drho = [drho[i][0] for i in range(p_num)]
-        p_num = len(p)
-        F_tp = np.zeros(p_num)
-        for m in range(p_num):
-            F_tp[m] = CFIM(rho[m], [drho[m]], M=M, eps=eps)
-
-        arr = [p[i] * F_tp[i] for i in range(p_num)]
-        return simps(arr, x[0])
-    else:
-        #### multiparameter scenario ####
-        p_shape = np.shape(p)
-        p_ext = extract_ele(p, para_num)
-        rho_ext = extract_ele(rho, para_num)
-        drho_ext = extract_ele(drho, para_num)
-
-        p_list, rho_list, drho_list = [], [], []
-        for p_ele, rho_ele, drho_ele in zip(p_ext, rho_ext, drho_ext):
-            p_list.append(p_ele)
-            rho_list.append(rho_ele)
-            drho_list.append(drho_ele)
-
-        dim = len(rho_list[0])
-        if M == []:
-            M = SIC(dim)
-        else:
-            if type(M) != list:
-                raise TypeError("Please make sure M is a list!")
-
-        F_list = [
-            [[0.0 for i in range(len(p_list))] for j in range(para_num)]
-            for k in range(para_num)
-        ]
-        for i in range(len(p_list)):
-            F_tp = CFIM(rho_list[i], drho_list[i], M=M, eps=eps)
-            for pj in range(para_num):
-                for pk in range(para_num):
-                    F_list[pj][pk][i] = F_tp[pj][pk]
-
-        BCFIM_res = np.zeros([para_num, para_num])
-        for para_i in range(0, para_num):
-            for para_j in range(para_i, para_num):
-                F_ij = np.array(F_list[para_i][para_j]).reshape(p_shape)
-                arr = p * F_ij
-                for si in reversed(range(para_num)):
-                    arr = simps(arr, x[si])
-                BCFIM_res[para_i][para_j] = arr
-                BCFIM_res[para_j][para_i] = arr
-        return BCFIM_res
-
-
-def BQFIM(x, p, rho, drho, LDtype="SLD", eps=1e-8):
+    p = _prior(x, p)
+    weight = lambda index, F: p[index][..., None, None] * F
+    res = _Fisher_int(x, rho, drho, weight, blocksize, "CFIM", workers, executor, M=M, eps=eps)
+    return _Bayes_res(res)
+
+
+def BQFIM(x, p, rho, drho, LDtype="SLD", eps=1e-8, workers=None, executor=None, blocksize=None):
     r"""
     Calculation of the Bayesian quantum Fisher information (BQFI) and the 
     Bayesian quantum Fisher information matrix (BQFIM) of the form
@@ -130,12 +95,16 @@ def BQFIM(x, p, rho, drho, LDtype="SLD", eps=1e-8):
     > **p:** `multidimensional array`
         -- The prior distribution.
 
-    > **rho:** `multidimensional list`
-        -- Parameterized density matrix.
+    > **rho:** `multidimensional list, array or callable`
+        -- Parameterized density matrix on the grid of x, an array with the shape 
+        (n1, ..., nk, d, d). Memory-mapped arrays, paths of .npy files and HDF5 
+        datasets are read block by block. It can also be a function of the values 
+        of the parameters (a float or a list) returning the tuple (rho, drho), 
+        for example `FiniteDifference`, then drho is None.
 
-    > **drho:** `multidimensional list`
+    > **drho:** `multidimensional list or array`
         -- Derivatives of the parameterized density matrix (rho) with respect to the unknown
-        parameters to be estimated.
+        parameters to be estimated, an array with the shape (n1, ..., nk, P, d, d).
 
     > **LDtype:** `string`
         -- Types of QFI (QFIM) can be set as the objective function. Options are:  
@@ -146,6 +115,22 @@ def BQFIM(x, p, rho, drho, LDtype="SLD", eps=1e-8):
     > **eps:** `float`
         -- Machine epsilon.
 
+    > **workers:** `int`
+        -- Number of workers for the Fisher information matrices of the grid points, 
+        see `qfim_map` and `cfim_map`. The grid is calculated in one batched call if 
+        neither workers nor executor is set.
+
+    > **executor:** `string or Executor`
+        -- Options are "thread", "process" (the grid is placed in shared memory) or an 
+        instance of `concurrent.futures.Executor`. The default is "thread" if workers 
+        is set. The output does not depend on the order in which the chunks finish.
+
+    > **blocksize:** `int`
+        -- Maximum number of grid points whose states are held in memory at once. 
+        The integrals over the inner axes are accumulated block by block and the 
+        result is the same as for the whole grid. The whole grid is read at once 
+        if it is not set.
+
     Returns
     ----------
     **BQFI or BQFIM:** `float or matrix`
@@ -154,54 +139,13 @@ def BQFIM(x, p, rho, drho, LDtype="SLD", eps=1e-8):
         it returns BQFIM.
     """
 
-    para_num = len(x)
-    if para_num == 1:
-        #### single parameter scenario ####
-        p_num = len(p)
-        if type(drho[0]) == list:
-            drho = [drho[i][0] for i in range(p_num)]
-
-        F_tp = np.zeros(p_num)
-        for m in range(p_num):
-            F_tp[m] = QFIM(rho[m], [drho[m]], LDtype=LDtype, eps=eps)
-        arr = [p[i] * F_tp[i] for i in range(p_num)]
-        return simps(arr, x[0])
-    else:
-        #### multiparameter scenario ####
-        p_shape = np.shape(p)
-        p_ext = extract_ele(p, para_num)
-        rho_ext = extract_ele(rho, para_num)
-        drho_ext = extract_ele(drho, para_num)
-
-        p_list, rho_list, drho_list = [], [], []
-        for p_ele, rho_ele, drho_ele in zip(p_ext, rho_ext, drho_ext):
-            p_list.append(p_ele)
-            rho_list.append(rho_ele)
-            drho_list.append(drho_ele)
-
-        F_list = [
-            [[0.0 for i in range(len(p_list))] for j in range(para_num)]
-            for k in range(para_num)
-        ]
-        for i in range(len(p_list)):
-            F_tp = QFIM(rho_list[i], drho_list[i], LDtype=LDtype, eps=eps)
-            for pj in range(para_num):
-                for pk in range(para_num):
-                    F_list[pj][pk][i] = F_tp[pj][pk]
-
-        BQFIM_res = np.zeros([para_num, para_num])
-        for para_i in range(0, para_num):
-            for para_j in range(para_i, para_num):
-                F_ij = np.array(F_list[para_i][para_j]).reshape(p_shape)
-                arr = p * F_ij
-                for si in reversed(range(para_num)):
-                    arr = simps(arr, x[si])
-                BQFIM_res[para_i][para_j] = arr
-                BQFIM_res[para_j][para_i] = arr
-        return BQFIM_res
-
-
-def BCRB(x, p, dp, rho, drho, M=[], b=[], db=[], btype=1, eps=1e-8):
+    p = _prior(x, p)
+    weight = lambda index, F: p[index][..., None, None] * F
+    res = _Fisher_int(x, rho, drho, weight, blocksize, "QFIM", workers, executor, LDtype=LDtype, eps=eps)
+    return _Bayes_res(res)
+
+
+def BCRB(x, p, dp, rho, drho, M=[], b=[], db=[], btype=1, eps=1e-8, workers=None, executor=None, blocksize=None):
     r"""
     Calculation of the Bayesian Cramer-Rao bound (BCRB). The covariance matrix 
     with a prior distribution $p(\textbf{x})$ is defined as
@@ -253,12 +197,16 @@ def BCRB(x, p, dp, rho, drho, M=[], b=[], db=[], btype=1, eps=1e-8):
     > **p:** `multidimensional array`
         -- The prior distribution.
 
-    > **rho:** `multidimensional list`
-        -- Parameterized density matrix.
+    > **rho:** `multidimensional list, array or callable`
+        -- Parameterized density matrix on the grid of x, an array with the shape 
+        (n1, ..., nk, d, d). Memory-mapped arrays, paths of .npy files and HDF5 
+        datasets are read block by block. It can also be a function of the values 
+        of the parameters (a float or a list) returning the tuple (rho, drho), 
+        for example `FiniteDifference`, then drho is None.
 
-    > **drho:** `multidimensional list`
+    > **drho:** `multidimensional list or array`
         -- Derivatives of the parameterized density matrix (rho) with respect to the unknown
-        parameters to be estimated.
+        parameters to be estimated, an array with the shape (n1, ..., nk, P, d, d).
 
     > **M:** `list of matrices`
         -- A set of positive operator-valued measure (POVM). The default measurement 
@@ -280,6 +228,22 @@ def BCRB(x, p, dp, rho, drho, M=[], b=[], db=[], btype=1, eps=1e-8):
     > **eps:** `float`
         -- Machine epsilon.
 
+    > **workers:** `int`
+        -- Number of workers for the Fisher information matrices of the grid points, 
+        see `qfim_map` and `cfim_map`. The grid is calculated in one batched call if 
+        neither workers nor executor is set.
+
+    > **executor:** `string or Executor`
+        -- Options are "thread", "process" (the grid is placed in shared memory) or an 
+        instance of `concurrent.futures.Executor`. The default is "thread" if workers 
+        is set. The output does not depend on the order in which the chunks finish.
+
+    > **blocksize:** `int`
+        -- Maximum number of grid points whose states are held in memory at once. 
+        The integrals over the inner axes are accumulated block by block and the 
+        result is the same as for the whole grid. The whole grid is read at once 
+        if it is not set.
+
     Returns
     ----------
     **BCRB:** `float or matrix`
@@ -293,208 +257,12 @@ def BCRB(x, p, dp, rho, drho, M=[], b=[], db=[], btype=1, eps=1e-8):
         solutions.html).
     """
 
-    para_num = len(x)
-    if para_num == 1:
-        #### single parameter scenario ####
-        p_num = len(p)
-        if b == []:
-            b = np.zeros(p_num)
-            db = np.zeros(p_num)
-        if b != [] and db == []:
-            db = np.zeros(p_num)
-
-        if M == []:
-            M = SIC(len(rho[0]))
-        else:
-            if type(M) != list:
-                raise TypeError("Please make sure M is a list!")
-
-        if type(drho[0]) == list:
-            drho = [drho[i][0] for i in range(p_num)]
-        if type(b[0]) == list or type(b[0]) == np.ndarray:
-            b = b[0]
-        if type(db[0]) == list or type(db[0]) == np.ndarray:
-            db = db[0]
-
-        F_tp = np.zeros(p_num)
-        for m in range(p_num):
-            F_tp[m] = CFIM(rho[m], [drho[m]], M=M, eps=eps)
-
-        if btype == 1:
-            arr = [
-                p[i] * ((1 + db[i]) ** 2 / F_tp[i] + b[i] ** 2) for i in range(p_num)
-            ]
-            F = simps(arr, x[0])
-            return F
-        elif btype == 2:
-            arr = [p[i] * F_tp[i] for i in range(p_num)]
-            F1 = simps(arr, x[0])
-            arr2 = [p[j] * (1 + db[j]) for j in range(p_num)]
-            B = simps(arr2, x[0])
-            arr3 = [p[k] * b[k] ** 2 for k in range(p_num)]
-            bb = simps(arr3, x[0])
-            F = B**2 / F1 + bb
-            return F
-        elif btype == 3:
-            I_tp = [np.real(dp[i] * dp[i] / p[i] ** 2) for i in range(p_num)]
-            arr = [p[j]*(dp[j]*b[j]/p[j]+(1 + db[j]))**2 / (I_tp[j] + F_tp[j]) for j in range(p_num)]
-            F = simps(arr, x[0])
-            return F
-        else:
-            raise NameError("NameError: btype should be choosen in {1, 2, 3}.")
-    else:
-        #### multiparameter scenario ####
-        if b == []:
-            b, db = [], []
-            for i in range(para_num):
-                b.append(np.zeros(len(x[i])))
-                db.append(np.zeros(len(x[i])))
-        if b != [] and db == []:
-            db = []
-            for i in range(para_num):
-                db.append(np.zeros(len(x[i])))
-
-        p_shape = np.shape(p)
-        p_ext = extract_ele(p, para_num)
-        dp_ext = extract_ele(dp, para_num)
-        rho_ext = extract_ele(rho, para_num)
-        drho_ext = extract_ele(drho, para_num)
-        b_pro = product(*b)
-        db_pro = product(*db)
-
-        p_list, rho_list, drho_list = [], [], []
-        for p_ele, rho_ele, drho_ele in zip(p_ext, rho_ext, drho_ext):
-            p_list.append(p_ele)
-            rho_list.append(rho_ele)
-            drho_list.append(drho_ele)
-        dp_list = [dpi for dpi in dp_ext]
-
-        b_list, db_list = [], []
-        for b_ele, db_ele in zip(b_pro, db_pro):
-            b_list.append([b_ele[i] for i in range(para_num)])
-            db_list.append([db_ele[j] for j in range(para_num)])
-
-        dim = len(rho_list[0])
-        if M == []:
-            M = SIC(dim)
-        else:
-            if type(M) != list:
-                raise TypeError("Please make sure M is a list!")
-        if btype == 1:
-            F_list = [
-                [[0.0 for i in range(len(p_list))] for j in range(para_num)]
-                for k in range(para_num)
-            ]
-            for i in range(len(p_list)):
-                F_tp = CFIM(rho_list[i], drho_list[i], M=M, eps=eps)
-                F_inv = np.linalg.pinv(F_tp)
-                B = np.diag([(1.0 + db_list[i][j]) for j in range(para_num)])
-                term1 = np.dot(B, np.dot(F_inv, B))
-                term2 = np.dot(
-                    np.array(b_list[i]).reshape(para_num, 1),
-                    np.array(b_list[i]).reshape(1, para_num),
-                )
-                for pj in range(para_num):
-                    for pk in range(para_num):
-                        F_list[pj][pk][i] = term1[pj][pk] + term2[pj][pk]
-
-            res = np.zeros([para_num, para_num])
-            for para_i in range(0, para_num):
-                for para_j in range(para_i, para_num):
-                    F_ij = np.array(F_list[para_i][para_j]).reshape(p_shape)
-                    arr = p * F_ij
-                    for si in reversed(range(para_num)):
-                        arr = simps(arr, x[si])
-                    res[para_i][para_j] = arr
-                    res[para_j][para_i] = arr
-            return res
-        elif btype == 2:
-            F_list = [
-                [[0.0 for i in range(len(p_list))] for j in range(para_num)]
-                for k in range(para_num)
-            ]
-            B_list = [
-                [[0.0 for i in range(len(p_list))] for j in range(para_num)]
-                for k in range(para_num)
-            ]
-            bb_list = [
-                [[0.0 for i in range(len(p_list))] for j in range(para_num)]
-                for k in range(para_num)
-            ]
-            for i in range(len(p_list)):
-                F_tp = CFIM(rho_list[i], drho_list[i], M=M, eps=eps)
-                B_tp = np.diag([(1.0 + db_list[i][j]) for j in range(para_num)])
-                bb_tp = np.dot(
-                    np.array(b_list[i]).reshape(para_num, 1),
-                    np.array(b_list[i]).reshape(1, para_num),
-                )
-                for pj in range(para_num):
-                    for pk in range(para_num):
-                        F_list[pj][pk][i] = F_tp[pj][pk]
-                        B_list[pj][pk][i] = B_tp[pj][pk]
-                        bb_list[pj][pk][i] = bb_tp[pj][pk]
-
-            F_res = np.zeros([para_num, para_num])
-            for para_i in range(0, para_num):
-                for para_j in range(para_i, para_num):
-                    F_ij = np.array(F_list[para_i][para_j]).reshape(p_shape)
-                    arr = p * F_ij
-                    for si in reversed(range(para_num)):
-                        arr = simps(arr, x[si])
-                    F_res[para_i][para_j] = arr
-                    F_res[para_j][para_i] = arr
-            B_res = np.zeros([para_num, para_num])
-            bb_res = np.zeros([para_num, para_num])
-            for para_m in range(para_num):
-                for para_n in range(para_num):
-                    B_mn = np.array(B_list[para_m][para_n]).reshape(p_shape)
-                    bb_mn = np.array(bb_list[para_m][para_n]).reshape(p_shape)
-                    arr2 = p * B_mn
-                    arr3 = p * bb_mn
-                    for sj in reversed(range(para_num)):
-                        arr2 = simps(arr2, x[sj])
-                        arr3 = simps(arr3, x[sj])
-                    B_res[para_m][para_n] = arr2
-                    bb_res[para_m][para_n] = arr3
-            res = np.dot(B_res, np.dot(np.linalg.pinv(F_res), B_res)) + bb_res
-            return res
-        elif btype == 3:
-            F_list = [
-                [[0.0 for i in range(len(p_list))] for j in range(para_num)]
-                for k in range(para_num)
-            ]
-            for i in range(len(p_list)):
-                F_tp = CFIM(rho_list[i], drho_list[i], M=M, eps=eps)
-                I_tp = np.zeros((para_num, para_num))
-                G_tp = np.zeros((para_num, para_num))
-                for pm in range(para_num):
-                    for pn in range(para_num):
-                        if pm == pn:
-                            G_tp[pm][pn] = dp_list[i][pn]*b_list[i][pm]/p_list[i]+(1.0 + db_list[i][pm])
-                        else:
-                            G_tp[pm][pn] = dp_list[i][pn]*b_list[i][pm]/p_list[i]
-                        I_tp[pm][pn] = dp_list[i][pm] * dp_list[i][pn] / p_list[i] ** 2
-
-                F_tot = np.dot(G_tp, np.dot(np.linalg.pinv(F_tp + I_tp), G_tp.T))
-                for pj in range(para_num):
-                    for pk in range(para_num):
-                        F_list[pj][pk][i] = F_tot[pj][pk]
-
-            res = np.zeros([para_num, para_num])
-            for para_i in range(0, para_num):
-                for para_j in range(para_i, para_num):
-                    F_ij = np.array(F_list[para_i][para_j]).reshape(p_shape)
-                    arr = p * F_ij
-                    for si in reversed(range(para_num)):
-                        arr = simps(arr, x[si])
-                    res[para_i][para_j] = arr
-                    res[para_j][para_i] = arr
-            return res
-        else:
-            raise NameError("NameError: btype should be choosen in {1, 2, 3}.")
+    weight = _BCRB_weight(x, _prior(x, p), dp, b, db, btype)
+    res = _Fisher_int(x, rho, drho, weight, blocksize, "CFIM", workers, executor, M=M, eps=eps)
+    return _Bayes_res(_BCRB_res(res, btype))
 
 
-def BQCRB(x, p, dp, rho, drho, b=[], db=[], btype=1, LDtype="SLD", eps=1e-8):
+def BQCRB(x, p, dp, rho, drho, b=[], db=[], btype=1, LDtype="SLD", eps=1e-8, workers=None, executor=None, blocksize=None):
     r"""
     Calculation of the Bayesian quantum Cramer-Rao bound (BQCRB). The covariance matrix 
     with a prior distribution $p(\textbf{x})$ is defined as
@@ -546,12 +314,16 @@ def BQCRB(x, p, dp, rho, drho, b=[], db=[], btype=1, LDtype="SLD", eps=1e-8):
     > **p:** `multidimensional array`
         -- The prior distribution.
 
-    > **rho:** `multidimensional list`
-        -- Parameterized density matrix.
+    > **rho:** `multidimensional list, array or callable`
+        -- Parameterized density matrix on the grid of x, an array with the shape 
+        (n1, ..., nk, d, d). Memory-mapped arrays, paths of .npy files and HDF5 
+        datasets are read block by block. It can also be a function of the values 
+        of the parameters (a float or a list) returning the tuple (rho, drho), 
+        for example `FiniteDifference`, then drho is None.
 
-    > **drho:** `multidimensional list`
+    > **drho:** `multidimensional list or array`
         -- Derivatives of the parameterized density matrix (rho) with respect to the unknown
-        parameters to be estimated.
+        parameters to be estimated, an array with the shape (n1, ..., nk, P, d, d).
 
     > **b:** `list`
         -- Vector of biases of the form $\textbf{b}=(b(x_0),b(x_1),\dots)^{\mathrm{T}}$.
@@ -575,6 +347,22 @@ def BQCRB(x, p, dp, rho, drho, b=[], db=[], btype=1, LDtype="SLD", eps=1e-8):
     > **eps:** `float`
         -- Machine epsilon.
 
+    > **workers:** `int`
+        -- Number of workers for the Fisher information matrices of the grid points, 
+        see `qfim_map` and `cfim_map`. The grid is calculated in one batched call if 
+        neither workers nor executor is set.
+
+    > **executor:** `string or Executor`
+        -- Options are "thread", "process" (the grid is placed in shared memory) or an 
+        instance of `concurrent.futures.Executor`. The default is "thread" if workers 
+        is set. The output does not depend on the order in which the chunks finish.
+
+    > **blocksize:** `int`
+        -- Maximum number of grid points whose states are held in memory at once. 
+        The integrals over the inner axes are accumulated block by block and the 
+        result is the same as for the whole grid. The whole grid is read at once 
+        if it is not set.
+
     Returns
     ----------
     **BQCRB:** `float or matrix`
@@ -583,198 +371,12 @@ def BQCRB(x, p, dp, rho, drho, b=[], db=[], btype=1, LDtype="SLD", eps=1e-8):
         more than one), it returns a matrix.
     """
 
-    para_num = len(x)
-
-    if para_num == 1:
-        #### single parameter scenario ####
-        p_num = len(p)
-
-        if b == []:
-            b = np.zeros(p_num)
-            db = np.zeros(p_num)
-        if b != [] and db == []:
-            db = np.zeros(p_num)
-
-        if type(drho[0]) == list:
-            drho = [drho[i][0] for i in range(p_num)]
-        if type(b[0]) == list or type(b[0]) == np.ndarray:
-            b = b[0]
-        if type(db[0]) == list or type(db[0]) == np.ndarray:
-            db = db[0]
+    weight = _BCRB_weight(x, _prior(x, p), dp, b, db, btype)
+    res = _Fisher_int(x, rho, drho, weight, blocksize, "QFIM", workers, executor, LDtype=LDtype, eps=eps)
+    return _Bayes_res(_BCRB_res(res, btype))
 
-        F_tp = np.zeros(p_num)
-        for m in range(p_num):
-            F_tp[m] = QFIM(rho[m], [drho[m]], LDtype=LDtype, eps=eps)
 
-        if btype == 1:
-            arr = [
-                p[i] * ((1 + db[i]) ** 2 / F_tp[i] + b[i] ** 2) for i in range(p_num)
-            ]
-            F = simps(arr, x[0])
-            return F
-        elif btype == 2:
-            arr2 = [p[i] * F_tp[i] for i in range(p_num)]
-            F2 = simps(arr2, x[0])
-            arr2 = [p[j] * (1 + db[j]) for j in range(p_num)]
-            B = simps(arr2, x[0])
-            arr3 = [p[k] * b[k] ** 2 for k in range(p_num)]
-            bb = simps(arr3, x[0])
-            F = B**2 / F2 + bb
-            return F
-        elif btype == 3:
-            I_tp = [np.real(dp[i] * dp[i] / p[i] ** 2) for i in range(p_num)]
-            arr = [p[j]*(dp[j]*b[j]/p[j]+(1 + db[j]))**2 / (I_tp[j] + F_tp[j]) for j in range(p_num)]
-            F = simps(arr, x[0])
-            return F
-        else:
-            raise NameError("NameError: btype should be choosen in {1, 2, 3}.")
-    else:
-        #### multiparameter scenario ####
-        if b == []:
-            b, db = [], []
-            for i in range(para_num):
-                b.append(np.zeros(len(x[i])))
-                db.append(np.zeros(len(x[i])))
-        if b != [] and db == []:
-            db = []
-            for i in range(para_num):
-                db.append(np.zeros(len(x[i])))
-
-        p_shape = np.shape(p)
-        p_ext = extract_ele(p, para_num)
-        dp_ext = extract_ele(dp, para_num)
-        rho_ext = extract_ele(rho, para_num)
-        drho_ext = extract_ele(drho, para_num)
-        b_pro = product(*b)
-        db_pro = product(*db)
-
-        p_list, rho_list, drho_list = [], [], []
-        for p_ele, rho_ele, drho_ele in zip(p_ext, rho_ext, drho_ext):
-            p_list.append(p_ele)
-            rho_list.append(rho_ele)
-            drho_list.append(drho_ele)
-        dp_list = [dpi for dpi in dp_ext]
-
-        b_list, db_list = [], []
-        for b_ele, db_ele in zip(b_pro, db_pro):
-            b_list.append([b_ele[i] for i in range(para_num)])
-            db_list.append([db_ele[j] for j in range(para_num)])
-
-        if btype == 1:
-            F_list = [
-                [[0.0 for i in range(len(p_list))] for j in range(para_num)]
-                for k in range(para_num)
-            ]
-            for i in range(len(p_list)):
-                F_tp = QFIM(rho_list[i], drho_list[i], LDtype=LDtype, eps=eps)
-                F_inv = np.linalg.pinv(F_tp)
-                B = np.diag([(1.0 + db_list[i][j]) for j in range(para_num)])
-                term1 = np.dot(B, np.dot(F_inv, B))
-                term2 = np.dot(
-                    np.array(b_list[i]).reshape(para_num, 1),
-                    np.array(b_list[i]).reshape(1, para_num),
-                )
-                for pj in range(para_num):
-                    for pk in range(para_num):
-                        F_list[pj][pk][i] = term1[pj][pk] + term2[pj][pk]
-
-            res = np.zeros([para_num, para_num])
-            for para_i in range(0, para_num):
-                for para_j in range(para_i, para_num):
-                    F_ij = np.array(F_list[para_i][para_j]).reshape(p_shape)
-                    arr = p * F_ij
-                    for si in reversed(range(para_num)):
-                        arr = simps(arr, x[si])
-                    res[para_i][para_j] = arr
-                    res[para_j][para_i] = arr
-            return res
-        elif btype == 2:
-            F_list = [
-                [[0.0 for i in range(len(p_list))] for j in range(para_num)]
-                for k in range(para_num)
-            ]
-            B_list = [
-                [[0.0 for i in range(len(p_list))] for j in range(para_num)]
-                for k in range(para_num)
-            ]
-            bb_list = [
-                [[0.0 for i in range(len(p_list))] for j in range(para_num)]
-                for k in range(para_num)
-            ]
-            for i in range(len(p_list)):
-                F_tp = QFIM(rho_list[i], drho_list[i], LDtype=LDtype, eps=eps)
-                B_tp = np.diag([(1.0 + db_list[i][j]) for j in range(para_num)])
-                bb_tp = np.dot(
-                    np.array(b_list[i]).reshape(para_num, 1),
-                    np.array(b_list[i]).reshape(1, para_num),
-                )
-                for pj in range(para_num):
-                    for pk in range(para_num):
-                        F_list[pj][pk][i] = F_tp[pj][pk]
-                        B_list[pj][pk][i] = B_tp[pj][pk]
-                        bb_list[pj][pk][i] = bb_tp[pj][pk]
-
-            F_res = np.zeros([para_num, para_num])
-            for para_i in range(0, para_num):
-                for para_j in range(para_i, para_num):
-                    F_ij = np.array(F_list[para_i][para_j]).reshape(p_shape)
-                    arr = p * F_ij
-                    for si in reversed(range(para_num)):
-                        arr = simps(arr, x[si])
-                    F_res[para_i][para_j] = arr
-                    F_res[para_j][para_i] = arr
-            B_res = np.zeros([para_num, para_num])
-            bb_res = np.zeros([para_num, para_num])
-            for para_m in range(para_num):
-                for para_n in range(para_num):
-                    B_mn = np.array(B_list[para_m][para_n]).reshape(p_shape)
-                    bb_mn = np.array(bb_list[para_m][para_n]).reshape(p_shape)
-                    arr2 = p * B_mn
-                    arr3 = p * bb_mn
-                    for sj in reversed(range(para_num)):
-                        arr2 = simps(arr2, x[sj])
-                        arr3 = simps(arr3, x[sj])
-                    B_res[para_m][para_n] = arr2
-                    bb_res[para_m][para_n] = arr3
-            res = np.dot(B_res, np.dot(np.linalg.pinv(F_res), B_res)) + bb_res
-            return res
-        elif btype == 3:
-            F_list = [
-                [[0.0 for i in range(len(p_list))] for j in range(para_num)]
-                for k in range(para_num)
-            ]
-            for i in range(len(p_list)):
-                F_tp = QFIM(rho_list[i], drho_list[i], LDtype=LDtype, eps=eps)
-                I_tp = np.zeros((para_num, para_num))
-                G_tp = np.zeros((para_num, para_num))
-                for pm in range(para_num):
-                    for pn in range(para_num):
-                        if pm == pn:
-                            G_tp[pm][pn] = dp_list[i][pn]*b_list[i][pm]/p_list[i]+(1.0 + db_list[i][pm])
-                        else:
-                            G_tp[pm][pn] = dp_list[i][pn]*b_list[i][pm]/p_list[i]
-                        I_tp[pm][pn] = dp_list[i][pm] * dp_list[i][pn] / p_list[i] ** 2
-
-                F_tot = np.dot(G_tp, np.dot(np.linalg.pinv(F_tp + I_tp), G_tp.T))
-                for pj in range(para_num):
-                    for pk in range(para_num):
-                        F_list[pj][pk][i] = F_tot[pj][pk]
-
-            res = np.zeros([para_num, para_num])
-            for para_i in range(0, para_num):
-                for para_j in range(para_i, para_num):
-                    F_ij = np.array(F_list[para_i][para_j]).reshape(p_shape)
-                    arr = p * F_ij
-                    for si in reversed(range(para_num)):
-                        arr = simps(arr, x[si])
-                    res[para_i][para_j] = arr
-                    res[para_j][para_i] = arr
-            return res
-        else:
-            raise NameError("NameError: btype should be choosen in {1, 2, 3}.")
-
-
-def VTB(x, p, dp, rho, drho, M=[], eps=1e-8):
+def VTB(x, p, dp, rho, drho, M=[], eps=1e-8, workers=None, executor=None, blocksize=None):
     r"""
     Calculation of the Bayesian version of Cramer-Rao bound introduced by
     Van Trees (VTB). The covariance matrix with a prior distribution $p(\textbf{x})$ 
@@ -813,12 +415,16 @@ def VTB(x, p, dp, rho, drho, M=[], eps=1e-8):
         to be estimated. For example, dp[0] is the derivative vector with respect to the first 
         parameter.
 
-    > **rho:** `multidimensional list`
-        -- Parameterized density matrix.
+    > **rho:** `multidimensional list, array or callable`
+        -- Parameterized density matrix on the grid of x, an array with the shape 
+        (n1, ..., nk, d, d). Memory-mapped arrays, paths of .npy files and HDF5 
+        datasets are read block by block. It can also be a function of the values 
+        of the parameters (a float or a list) returning the tuple (rho, drho), 
+        for example `FiniteDifference`, then drho is None.
 
-    > **drho:** `multidimensional list`
+    > **drho:** `multidimensional list or array`
         -- Derivatives of the parameterized density matrix (rho) with respect to the 
-        unknown parameters to be estimated.
+        unknown parameters to be estimated, an array with the shape (n1, ..., nk, P, d, d).
 
     > **M:** `list of matrices`
         -- A set of positive operator-valued measure (POVM). The default measurement 
@@ -827,6 +433,22 @@ def VTB(x, p, dp, rho, drho, M=[], eps=1e-8):
     > **eps:** `float`
         -- Machine epsilon.
 
+    > **workers:** `int`
+        -- Number of workers for the Fisher information matrices of the grid points, 
+        see `qfim_map` and `cfim_map`. The grid is calculated in one batched call if 
+        neither workers nor executor is set.
+
+    > **executor:** `string or Executor`
+        -- Options are "thread", "process" (the grid is placed in shared memory) or an 
+        instance of `concurrent.futures.Executor`. The default is "thread" if workers 
+        is set. The output does not depend on the order in which the chunks finish.
+
+    > **blocksize:** `int`
+        -- Maximum number of grid points whose states are held in memory at once. 
+        The integrals over the inner axes are accumulated block by block and the 
+        result is the same as for the whole grid. The whole grid is read at once 
+        if it is not set.
+
     Returns
     ----------
     **VTB:** `float or matrix`
@@ -840,89 +462,12 @@ def VTB(x, p, dp, rho, drho, M=[], eps=1e-8):
         solutions.html).
     """
 
-    para_num = len(x)
-    p_num = len(p)
-
-    if para_num == 1:
-        #### single parameter scenario ####
-        if M == []:
-            M = SIC(len(rho[0]))
-        else:
-            if type(M) != list:
-                raise TypeError("Please make sure M is a list!")
+    weight = _VTB_weight(x, _prior(x, p), dp)
+    res = _Fisher_int(x, rho, drho, weight, blocksize, "CFIM", workers, executor, M=M, eps=eps)
+    return _Bayes_res(_Bayes_inv(res))
 
-        if type(drho[0]) == list:
-            drho = [drho[i][0] for i in range(p_num)]
-        if type(dp[0]) == list or type(dp[0]) == np.ndarray:
-            dp = [dp[i][0] for i in range(p_num)]
 
-        F_tp = np.zeros(p_num)
-        for m in range(p_num):
-            F_tp[m] = CFIM(rho[m], [drho[m]], M=M, eps=eps)
-
-
-        arr1 = [np.real(dp[i] * dp[i] / p[i]) for i in range(p_num)]
-        I = simps(arr1, x[0])
-        arr2 = [np.real(F_tp[j] * p[j]) for j in range(p_num)]
-        F = simps(arr2, x[0])
-        return 1.0 / (I + F)
-    else:
-        #### multiparameter scenario ####
-        p_shape = np.shape(p)
-        p_ext = extract_ele(p, para_num)
-        dp_ext = extract_ele(dp, para_num)
-        rho_ext = extract_ele(rho, para_num)
-        drho_ext = extract_ele(drho, para_num)
-
-        p_list, rho_list, drho_list = [], [], []
-        for p_ele, rho_ele, drho_ele in zip(p_ext, rho_ext, drho_ext):
-            p_list.append(p_ele)
-            rho_list.append(rho_ele)
-            drho_list.append(drho_ele)
-        dp_list = [dpi for dpi in dp_ext]
-
-        dim = len(rho_list[0])
-        if M == []:
-            M = SIC(dim)
-        else:
-            if type(M) != list:
-                raise TypeError("Please make sure M is a list!")
-        
-        F_list = [
-                [[0.0 for i in range(len(p_list))] for j in range(para_num)]
-                for k in range(para_num)
-            ]
-        I_list = [
-                [[0.0 for i in range(len(p_list))] for j in range(para_num)]
-                for k in range(para_num)
-            ]
-        for i in range(len(p_list)):
-            F_tp = CFIM(rho_list[i], drho_list[i], M=M, eps=eps)
-            for pj in range(para_num):
-                for pk in range(para_num):
-                    F_list[pj][pk][i] = F_tp[pj][pk]
-                    I_list[pj][pk][i] = (
-                            dp_list[i][pj] * dp_list[i][pk] / p_list[i] ** 2
-                        )
-
-        F_res = np.zeros([para_num, para_num])
-        I_res = np.zeros([para_num, para_num])
-        for para_i in range(0, para_num):
-            for para_j in range(para_i, para_num):
-                F_ij = np.array(F_list[para_i][para_j]).reshape(p_shape)
-                I_ij = np.array(I_list[para_i][para_j]).reshape(p_shape)
-                arr1 = p * F_ij
-                arr2 = p * I_ij
-                for si in reversed(range(para_num)):
-                    arr1 = simps(arr1, x[si])
-                    arr2 = simps(arr2, x[si])
-                F_res[para_i][para_j] = arr1
-                F_res[para_j][para_i] = arr1
-                I_res[para_i][para_j] = arr2
-                I_res[para_j][para_i] = arr2
-        return np.linalg.pinv(F_res + I_res)
-
-def QVTB(x, p, dp, rho, drho, LDtype="SLD", eps=1e-8):
+def QVTB(x, p, dp, rho, drho, LDtype="SLD", eps=1e-8, workers=None, executor=None, blocksize=None):
     r"""
     Calculation of the Bayesian version of quantum Cramer-Rao bound introduced 
     by Van Trees (QVTB). The covariance matrix with a prior distribution p(\textbf{x}) 
@@ -960,12 +505,16 @@ def QVTB(x, p, dp, rho, drho, LDtype="SLD", eps=1e-8):
         estimated. For example, dp[0] is the derivative vector with respect to the first 
         parameter.
 
-    > **rho:** `multidimensional list`
-        -- Parameterized density matrix.
+    > **rho:** `multidimensional list, array or callable`
+        -- Parameterized density matrix on the grid of x, an array with the shape 
+        (n1, ..., nk, d, d). Memory-mapped arrays, paths of .npy files and HDF5 
+        datasets are read block by block. It can also be a function of the values 
+        of the parameters (a float or a list) returning the tuple (rho, drho), 
+        for example `FiniteDifference`, then drho is None.
 
-    > **drho:** `multidimensional list`
+    > **drho:** `multidimensional list or array`
         -- Derivatives of the parameterized density matrix (rho) with respect to the unknown
-        parameters to be estimated.
+        parameters to be estimated, an array with the shape (n1, ..., nk, P, d, d).
 
     > **LDtype:** `string`
         -- Types of QFI (QFIM) can be set as the objective function. Options are:  
@@ -976,6 +525,22 @@ def QVTB(x, p, dp, rho, drho, LDtype="SLD", eps=1e-8):
     > **eps:** `float`
         -- Machine epsilon.
 
+    > **workers:** `int`
+        -- Number of workers for the Fisher information matrices of the grid points, 
+        see `qfim_map` and `cfim_map`. The grid is calculated in one batched call if 
+        neither workers nor executor is set.
+
+    > **executor:** `string or Executor`
+        -- Options are "thread", "process" (the grid is placed in shared memory) or an 
+        instance of `concurrent.futures.Executor`. The default is "thread" if workers 
+        is set. The output does not depend on the order in which the chunks finish.
+
+    > **blocksize:** `int`
+        -- Maximum number of grid points whose states are held in memory at once. 
+        The integrals over the inner axes are accumulated block by block and the 
+        result is the same as for the whole grid. The whole grid is read at once 
+        if it is not set.
+
     Returns
     ----------
     **QVTB:** `float or matrix`
@@ -983,72 +548,223 @@ def QVTB(x, p, dp, rho, drho, LDtype="SLD", eps=1e-8):
         output is a float and for multiparameter estimation (the length of x is 
         more than one), it returns a matrix.
     """
-    para_num = len(x)
-    p_num = len(p)
 
-    if para_num == 1:
-        if type(drho[0]) == list:
-            drho = [drho[i][0] for i in range(p_num)]
-        if type(dp[0]) == list or type(dp[0]) == np.ndarray:
-            dp = [dp[i][0] for i in range(p_num)]
-
-        F_tp = np.zeros(p_num)
-        for m in range(p_num):
-            F_tp[m] = QFIM(rho[m], [drho[m]], LDtype=LDtype, eps=eps)
-
-        arr1 = [np.real(dp[i] * dp[i] / p[i]) for i in range(p_num)]
-        I = simps(arr1, x[0])
-        arr2 = [np.real(F_tp[j] * p[j]) for j in range(p_num)]
-        F = simps(arr2, x[0])
-        return 1.0 / (I + F)
+    weight = _VTB_weight(x, _prior(x, p), dp)
+    res = _Fisher_int(x, rho, drho, weight, blocksize, "QFIM", workers, executor, LDtype=LDtype, eps=eps)
+    return _Bayes_res(_Bayes_inv(res))
+
+
+
+class _BayesGrid:
+    # density matrices and their derivatives on the grid of x, read block by block.
+    # rho and drho can be (nested) lists, arrays, memory-mapped arrays, paths of
+    # .npy files or HDF5 datasets with the shapes (n1, ..., nk, d, d) and
+    # (n1, ..., nk, P, d, d), or rho is a function of the parameters returning
+    # the density matrix or the tuple (rho, drho).
+
+    def __init__(self, x, rho, drho=None):
+        self.x = x
+        self.shape = tuple(len(xi) for xi in x)
+        self.rho = self._array(rho, ())
+        self.drho = None if callable(rho) else self._array(drho, (-1,))
+
+    def _array(self, A, axes):
+        if A is None or callable(A):
+            return A
+        if isinstance(A, str):
+            A = np.load(A, mmap_mode="r")
+        if not hasattr(A, "shape"):
+            A = np.asarray(A)
+        if isinstance(A, np.ndarray):
+            # arrays with the flattened grid are accepted as well
+            A = A.reshape(self.shape + axes + A.shape[-2:])
+        return A
+
+    def dim(self):
+        if callable(self.rho):
+            return len(self[(0,) * len(self.shape)][0])
+        return self.rho.shape[-1]
+
+    def __getitem__(self, index):
+        # (rho, drho) of the block given by the leading indices, integer indices
+        # remove the corresponding axes as for arrays
+        if callable(self.rho):
+            full = index + (slice(None),) * (len(self.shape) - len(index))
+            coords = [np.atleast_1d(np.asarray(xi)[i]) for xi, i in zip(self.x, full)]
+            shape = tuple(len(c) for c, i in zip(coords, full) if not isinstance(i, int))
+            res = [self.rho(xi[0] if len(xi) == 1 else list(xi)) for xi in product(*coords)]
+            if not isinstance(res[0], tuple):
+                return np.array(res).reshape(shape + np.shape(res[0])), None
+            rho = np.array([r[0] for r in res]).reshape(shape + np.shape(res[0][0]))
+            drho = np.array([r[1] for r in res]).reshape(shape + (-1,) + rho.shape[-2:])
+            return rho, drho
+
+        rho = np.asarray(self.rho[index])
+        if self.drho is None:
+            return rho, None
+        drho = np.asarray(self.drho[index])
+        if drho.ndim == rho.ndim:
+            drho = drho[..., None, :, :]
+        return rho, drho
+
+
+def _prior(x, p):
+    # prior distribution with the shape (n1, ..., nk)
+    return np.reshape(np.asarray(p), tuple(len(xi) for xi in x))
+
+
+def _Fisher_grid(kind, rho, drho, workers, executor, **kwargs):
+    # Fisher information matrices of all the points with the shape (n1, ..., nk, P, P),
+    # in one batched call or split into chunks over a worker pool
+    if drho is None:
+        raise ValueError("Please make sure the function rho returns the density matrix and its derivatives!")
+    shape = rho.shape[:-2]
+    rho = rho.reshape((-1,) + rho.shape[-2:])
+    drho = drho.reshape((-1,) + drho.shape[-3:])
+    if workers is None and executor is None:
+        F = {"CFIM": CFIM_batch, "QFIM": QFIM_batch}[kind](rho, drho, **kwargs)
+    else:
+        executor = "thread" if executor is None else executor
+        F = {"CFIM": cfim_map, "QFIM": qfim_map}[kind](rho, drho, workers=workers, executor=executor, **kwargs)
+    return F.reshape(shape + F.shape[1:])
+
+
+def _Fisher_int(x, rho, drho, weight, blocksize, kind, workers, executor, **kwargs):
+    # integral of weight(index, F) with F the Fisher information matrices of the
+    # block of the grid given by index
+    grid = _BayesGrid(x, rho, drho)
+
+    def integrand(index):
+        rho_tp, drho_tp = grid[index]
+        return weight(index, _Fisher_grid(kind, rho_tp, drho_tp, workers, executor, **kwargs))
+
+    return _Bayes_stream(x, integrand, blocksize)
+
+
+def _Bayes_int(arr, x, axis=0):
+    # Simpson integration over the grid axes starting from axis, the last parameter first
+    for si in reversed(range(len(x))):
+        arr = simps(arr, x[si], axis=axis + si)
+    return arr
+
+
+def _Bayes_blocks(shape, blocksize, index=()):
+    # leading indices of the blocks with at most blocksize grid points (at least
+    # one point along the last axis) in the order of the grid
+    if blocksize is None:
+        yield index
+        return
+    sub = shape[len(index):]
+    size = int(np.prod(sub[1:]))
+    if size > blocksize:
+        for i in range(sub[0]):
+            yield from _Bayes_blocks(shape, blocksize, index + (i,))
     else:
-        #### multiparameter scenario ####
-        p_shape = np.shape(p)
-        p_ext = extract_ele(p, para_num)
-        dp_ext = extract_ele(dp, para_num)
-        rho_ext = extract_ele(rho, para_num)
-        drho_ext = extract_ele(drho, para_num)
-
-        p_list, rho_list, drho_list = [], [], []
-        for p_ele, rho_ele, drho_ele in zip(p_ext, rho_ext, drho_ext):
-            p_list.append(p_ele)
-            rho_list.append(rho_ele)
-            drho_list.append(drho_ele)
-        dp_list = [dpi for dpi in dp_ext]
-
-        F_list = [
-                [[0.0 for i in range(len(p_list))] for j in range(para_num)]
-                for k in range(para_num)
-            ]
-        I_list = [
-                [[0.0 for i in range(len(p_list))] for j in range(para_num)]
-                for k in range(para_num)
-            ]
-        for i in range(len(p_list)):
-            F_tp = QFIM(rho_list[i], drho_list[i], LDtype=LDtype, eps=eps)
-            for pj in range(para_num):
-                for pk in range(para_num):
-                    F_list[pj][pk][i] = F_tp[pj][pk]
-                    I_list[pj][pk][i] = (
-                            dp_list[i][pj] * dp_list[i][pk] / p_list[i] ** 2
-                        )
-
-        F_res = np.zeros([para_num, para_num])
-        I_res = np.zeros([para_num, para_num])
-        for para_i in range(0, para_num):
-            for para_j in range(para_i, para_num):
-                F_ij = np.array(F_list[para_i][para_j]).reshape(p_shape)
-                I_ij = np.array(I_list[para_i][para_j]).reshape(p_shape)
-                arr1 = p * F_ij
-                arr2 = p * I_ij
-                for si in reversed(range(para_num)):
-                    arr1 = simps(arr1, x[si])
-                    arr2 = simps(arr2, x[si])
-                F_res[para_i][para_j] = arr1
-                F_res[para_j][para_i] = arr1
-                I_res[para_i][para_j] = arr2
-                I_res[para_j][para_i] = arr2
-        return np.linalg.pinv(F_res + I_res)
+        rows = max(1, blocksize // size)
+        for i in range(0, sub[0], rows):
+            yield index + (slice(i, i + rows),)
+
+
+def _Bayes_stream(x, integrand, blocksize, index=()):
+    # integral of integrand(index) over the grid axes from len(index) on. Only
+    # blocks of at most blocksize points are evaluated at once, the partial
+    # integrals over the inner axes are collected along the outer ones and the
+    # axes are integrated in the same order as in _Bayes_int.
+    sub = x[len(index):]
+    if blocksize is None:
+        return _Bayes_int(integrand(index), sub)
+    size = int(np.prod([len(xi) for xi in sub[1:]]))
+    if size > blocksize:
+        vals = np.array([_Bayes_stream(x, integrand, blocksize, index + (i,)) for i in range(len(sub[0]))])
+    else:
+        rows = max(1, blocksize // size)
+        vals = np.concatenate([
+            _Bayes_int(integrand(index + (slice(i, i + rows),)), sub[1:], axis=1)
+            for i in range(0, len(sub[0]), rows)
+        ])
+    return simps(vals, sub[0], axis=0)
+
+
+def _Bayes_res(res):
+    # the output is a float for single parameter estimation
+    res = np.real(res)
+    if len(res) == 1:
+        return float(res[0][0])
+    return res
+
+
+def _Bayes_inv(A):
+    # 1/F for single parameter estimation as in the scalar bounds, a vanishing 
+    # Fisher information gives an infinite bound, and the pseudo-inverse for 
+    # multiparameter estimation
+    if A.shape[-1] == 1:
+        return 1.0 / A
+    return np.linalg.pinv(A)
+
+
+def _prior_grid(dp, p, para_num):
+    # derivatives of the prior distribution with the shape (n1, ..., nk, P)
+    return np.real(np.asarray(dp)).reshape(p.shape + (para_num,))
+
+
+def _bias_grid(b, x):
+    # biases (or their derivatives) given on the regimes of the parameters to
+    # the vectors on the grid with the shape (n1, ..., nk, P)
+    if len(b) == 0:
+        b = [np.zeros(len(xi)) for xi in x]
+    elif len(x) == 1 and np.ndim(b[0]) == 0:
+        b = [b]
+    b = [np.real(np.asarray(bi)).reshape(len(xi)) for bi, xi in zip(b, x)]
+    return np.stack(np.meshgrid(*b, indexing="ij"), axis=-1)
+
+
+def _BCRB_weight(x, p, dp, b, db, btype):
+    # integrand of the BCRB on a block of the grid, for btype 2 the integrands
+    # of the averages of F, B and bb are stacked
+    para_num = len(x)
+    if btype not in [1, 2, 3]:
+        raise NameError("NameError: btype should be choosen in {1, 2, 3}.")
+    b = _bias_grid(b, x)
+    B = 1.0 + _bias_grid(db, x)
+    if btype == 3:
+        dp = _prior_grid(dp, p, para_num)
+
+    def weight(index, F):
+        w = p[index][..., None, None]
+        b_tp = b[index]
+        B_tp = B[index]
+        bb = b_tp[..., :, None] * b_tp[..., None, :]
+        if btype == 1:
+            arr = B_tp[..., :, None] * _Bayes_inv(F) * B_tp[..., None, :] + bb
+        elif btype == 2:
+            return np.stack([w * F, w * B_tp[..., None] * np.identity(para_num), w * bb], axis=-3)
+        else:
+            dp_tp = dp[index]
+            # G_ab = [\partial_b ln p][b]_a + B_aa delta_ab and [I_p]_ab = [\partial_a ln p][\partial_b ln p]
+            G = b_tp[..., :, None] * dp_tp[..., None, :] / w + B_tp[..., None] * np.identity(para_num)
+            I_p = dp_tp[..., :, None] * dp_tp[..., None, :] / w**2
+            arr = G @ _Bayes_inv(F + I_p) @ G.swapaxes(-1, -2)
+        return w * arr
+
+    return weight
+
+
+def _BCRB_res(res, btype):
+    if btype == 2:
+        F_res, B_res, bb_res = res
+        return B_res @ _Bayes_inv(F_res) @ B_res + bb_res
+    return res
+
+
+def _VTB_weight(x, p, dp):
+    dp = _prior_grid(dp, p, len(x))
+
+    def weight(index, F):
+        w = p[index][..., None, None]
+        I_p = dp[index][..., :, None] * dp[index][..., None, :] / w**2
+        return w * (F + I_p)
+
+    return weight
 
 
 def OBB_func(x, y, t, J, F):
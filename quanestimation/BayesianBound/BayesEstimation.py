@@ -2,10 +2,12 @@ import numpy as np
 from scipy.integrate import simps
 from quanestimation.Common.Common import extract_ele
 from quanestimation.Common.Common import SIC
+from quanestimation.AsymptoticBound.CramerRao import FisherContext
+from quanestimation.BayesianBound.BayesCramerRao import _BayesGrid, _Bayes_blocks, _Bayes_int
 from itertools import product
 
 
-def Bayes(x, p, rho, y, M=[], estimator="mean", savefile=False):
+def Bayes(x, p, rho, y, M=[], estimator="mean", savefile=False, blocksize=None):
     """
     Bayesian estimation. The prior distribution is updated via the posterior  
     distribution obtained by the Bayes’ rule and the estimated value of parameters
@@ -20,8 +22,12 @@ def Bayes(x, p, rho, y, M=[], estimator="mean", savefile=False):
     > **p:** `multidimensional array`
         -- The prior distribution.
 
-    > **rho:** `multidimensional list`
-        -- Parameterized density matrix.
+    > **rho:** `multidimensional list, array or callable`
+        -- Parameterized density matrix on the grid of x, an array with the shape 
+        (n1, ..., nk, d, d). Memory-mapped arrays, paths of .npy files and HDF5 
+        datasets are read block by block. It can also be a function of the values 
+        of the parameters (a float or a list) returning the density matrix or the 
+        tuple (rho, drho).
 
     > **y:** `array`
         -- The experimental results obtained in practice.
@@ -42,6 +48,11 @@ def Bayes(x, p, rho, y, M=[], estimator="mean", savefile=False):
         `False` the posterior distribution in the final iteration and the estimated values
         in all iterations will be saved in "pout.npy" and "xout.npy". 
 
+    > **blocksize:** `int`
+        -- Maximum number of grid points whose density matrices are held in memory 
+        at once. Only the probabilities of the measurement results which occur in y 
+        are kept on the grid. The whole grid is read at once if it is not set.
+
     Returns
     ----------
     **pout and xout:** `array and float`
@@ -54,188 +65,53 @@ def Bayes(x, p, rho, y, M=[], estimator="mean", savefile=False):
     """
 
     para_num = len(x)
-    max_episode = len(y)
-    if para_num == 1:
-        #### single parameter scenario ####
-        if M == []:
-            M = SIC(len(rho[0]))
-        else:
-            if type(M) != list:
-                raise TypeError("Please make sure M is a list!")
-        if savefile == False:
-            x_out = []
-            if estimator == "mean":
-                for mi in range(max_episode):
-                    res_exp = int(y[mi])
-                    pyx = np.zeros(len(x[0]))
-                    for xi in range(len(x[0])):
-                        p_tp = np.real(np.trace(np.dot(rho[xi], M[res_exp])))
-                        pyx[xi] = p_tp
-                    arr = [pyx[m] * p[m] for m in range(len(x[0]))]
-                    py = simps(arr, x[0])
-                    p_update = pyx * p / py
-                    p = p_update
-                    mean = simps([p[m]*x[0][m] for m in range(len(x[0]))], x[0])
-                    x_out.append(mean)
-            elif estimator == "MAP":
-                for mi in range(max_episode):
-                    res_exp = int(y[mi])
-                    pyx = np.zeros(len(x[0]))
-                    for xi in range(len(x[0])):
-                        p_tp = np.real(np.trace(np.dot(rho[xi], M[res_exp])))
-                        pyx[xi] = p_tp
-                    arr = [pyx[m] * p[m] for m in range(len(x[0]))]
-                    py = simps(arr, x[0])
-                    p_update = pyx * p / py
-                    p = p_update
-                    indx = np.where(p == max(p))[0][0]
-                    x_out.append(x[0][indx])
-            else:
-                raise ValueError(
-                "{!r} is not a valid value for estimator, supported values are 'mean' and 'MAP'.".format(estimator))
-            np.save("pout", p)
-            np.save("xout", x_out)
-            return p, x_out[-1]
-        else:
-            p_out, x_out = [], []
-            if estimator == "mean":
-                for mi in range(max_episode):
-                    res_exp = int(y[mi])
-                    pyx = np.zeros(len(x[0]))
-                    for xi in range(len(x[0])):
-                        p_tp = np.real(np.trace(np.dot(rho[xi], M[res_exp])))
-                        pyx[xi] = p_tp
-                    arr = [pyx[m] * p[m] for m in range(len(x[0]))]
-                    py = simps(arr, x[0])
-                    p_update = pyx * p / py
-                    p = p_update
-                    mean = simps([p[m]*x[0][m] for m in range(len(x[0]))], x[0])
-                    p_out.append(p)
-                    x_out.append(mean)
-            elif estimator == "MAP":
-                for mi in range(max_episode):
-                    res_exp = int(y[mi])
-                    pyx = np.zeros(len(x[0]))
-                    for xi in range(len(x[0])):
-                        p_tp = np.real(np.trace(np.dot(rho[xi], M[res_exp])))
-                        pyx[xi] = p_tp
-                    arr = [pyx[m] * p[m] for m in range(len(x[0]))]
-                    py = simps(arr, x[0])
-                    p_update = pyx * p / py
-                    p = p_update
-                    indx = np.where(p == max(p))[0][0]
-                    p_out.append(p)
-                    x_out.append(x[0][indx])
-            else:
-                raise ValueError(
-                "{!r} is not a valid value for estimator, supported values are 'mean' and 'MAP'.".format(estimator))
-            np.save("pout", p_out)
-            np.save("xout", x_out)
-            return p, x_out[-1]
-    else:
-        #### multiparameter scenario ####
-        p_shape = np.shape(p)
-        p_ext = extract_ele(p, para_num)
-        rho_ext = extract_ele(rho, para_num)
+    if estimator not in ["mean", "MAP"]:
+        raise ValueError(
+        "{!r} is not a valid value for estimator, supported values are 'mean' and 'MAP'.".format(estimator))
 
-        p_list, rho_list = [], []
-        for p_ele, rho_ele in zip(p_ext, rho_ext):
-            p_list.append(p_ele)
-            rho_list.append(rho_ele)
-
-        dim = len(rho_list[0])
-        if M == []:
-            M = SIC(dim)
-        else:
-            if type(M) != list:
-                raise TypeError("Please make sure M is a list!")
-
-        if savefile == False:
-            x_out = []
-            if estimator == "mean":
-                for mi in range(max_episode):
-                    res_exp = int(y[mi])
-                    pyx_list = np.zeros(len(p_list))
-                    for xi in range(len(p_list)):
-                        p_tp = np.real(np.trace(np.dot(rho_list[xi], M[res_exp])))
-                        pyx_list[xi] = p_tp
-                    pyx = pyx_list.reshape(p_shape)
-                    arr = p * pyx
-                    for si in reversed(range(para_num)):
-                        arr = simps(arr, x[si])
-                    py = arr
-                    p_update = p * pyx / py
-                    p = p_update
-                    
-                    mean = integ(x, p)
-                    x_out.append(mean)
-            elif estimator == "MAP":
-                for mi in range(max_episode):
-                    res_exp = int(y[mi])
-                    pyx_list = np.zeros(len(p_list))
-                    for xi in range(len(p_list)):
-                        p_tp = np.real(np.trace(np.dot(rho_list[xi], M[res_exp])))
-                        pyx_list[xi] = p_tp
-                    pyx = pyx_list.reshape(p_shape)
-                    arr = p * pyx
-                    for si in reversed(range(para_num)):
-                        arr = simps(arr, x[si])
-                    py = arr
-                    p_update = p * pyx / py
-                    p = p_update
-
-                    indx = np.where(np.array(p) == np.max(np.array(p)))
-                    x_out.append([x[i][indx[i][0]] for i in range(para_num)])
+    grid = _BayesGrid(x, rho)
+    if len(M) == 0:
+        M = SIC(grid.dim())
+    else:
+        if type(M) != list:
+            raise TypeError("Please make sure M is a list!")
+
+    # likelihoods Tr(rho M_y) on the grid of the results which occur in y, the
+    # states are read block by block
+    shape = grid.shape
+    res_list, res_index = np.unique(np.asarray(y, dtype=int), return_inverse=True)
+    M = np.asarray([M[i] for i in res_list])
+    pyx_all = np.zeros((len(res_list),) + shape)
+    for index in _Bayes_blocks(shape, blocksize):
+        rho_tp = grid[index][0]
+        pyx_all[(slice(None),) + index] = np.real(np.einsum("...ij,yji->y...", rho_tp, M))
+
+    p = np.reshape(np.asarray(p), shape)
+    p_out, x_out = [], []
+    for mi in range(len(y)):
+        pyx = pyx_all[res_index[mi]]
+        py = _Bayes_int(p * pyx, x)
+        p = pyx * p / py
+        if estimator == "mean":
+            if para_num == 1:
+                x_out.append(simps(p * x[0], x[0]))
             else:
-                raise ValueError(
-                "{!r} is not a valid value for estimator, supported values are 'mean' and 'MAP'.".format(estimator))
-            np.save("pout", p)
-            np.save("xout", x_out)
-            return p, x_out[-1]
+                x_out.append(integ(x, p))
         else:
-            p_out, x_out = [], []
-            if estimator == "mean":
-                for mi in range(max_episode):
-                    res_exp = int(y[mi])
-                    pyx_list = np.zeros(len(p_list))
-                    for xi in range(len(p_list)):
-                        p_tp = np.real(np.trace(np.dot(rho_list[xi], M[res_exp])))
-                        pyx_list[xi] = p_tp
-                    pyx = pyx_list.reshape(p_shape)
-                    arr = p * pyx
-                    for si in reversed(range(para_num)):
-                        arr = simps(arr, x[si])
-                    py = arr
-                    p_update = p * pyx / py
-                    p = p_update
-
-                    mean = integ(x, p)
-                    p_out.append(p)
-                    x_out.append(mean)
-            elif estimator == "MAP":
-                for mi in range(max_episode):
-                    res_exp = int(y[mi])
-                    pyx_list = np.zeros(len(p_list))
-                    for xi in range(len(p_list)):
-                        p_tp = np.real(np.trace(np.dot(rho_list[xi], M[res_exp])))
-                        pyx_list[xi] = p_tp
-                    pyx = pyx_list.reshape(p_shape)
-                    arr = p * pyx
-                    for si in reversed(range(para_num)):
-                        arr = simps(arr, x[si])
-                    py = arr
-                    p_update = p * pyx / py
-                    p = p_update
-
-                    indx = np.where(np.array(p) == np.max(np.array(p)))
-                    p_out.append(p)
-                    x_out.append([x[i][indx[i][0]] for i in range(para_num)])
+            indx = np.unravel_index(np.argmax(p), shape)
+            if para_num == 1:
+                x_out.append(x[0][indx[0]])
             else:
-                raise ValueError(
-                "{!r} is not a valid value for estimator, supported values are 'mean' and 'MAP'.".format(estimator))
-            np.save("pout", p_out)
-            np.save("xout", x_out)
-            return p, x_out[-1]
+                x_out.append([x[i][indx[i]] for i in range(para_num)])
+        if savefile == True:
+            p_out.append(p)
+
+    if savefile == False:
+        np.save("pout", p)
+    else:
+        np.save("pout", p_out)
+    np.save("xout", x_out)
+    return p, x_out[-1]
 
 
 def MLE(x, rho, y, M=[], savefile=False):
@@ -570,17 +446,5 @@ def BCB(x, p, rho, W=[], eps=1e-8):
         return minBC
         
 def Lambda_avg(rho_avg, rho_pri, eps=1e-8):
-    para_num = len(rho_pri)
-    dim = len(rho_avg)
-    Lambda = [[] for i in range(0, para_num)]
-    val, vec = np.linalg.eig(rho_avg)
-    val = np.real(val)
-    for para_i in range(0, para_num):
-        Lambda_eig = np.array([[0.0 + 0.0 * 1.0j for i in range(0, dim)] for i in range(0, dim)])
-        for fi in range(0, dim):
-            for fj in range(0, dim):
-                if np.abs(val[fi] + val[fj]) > eps:
-                    Lambda_eig[fi][fj] = (2* np.dot(vec[:, fi].conj().transpose(),np.dot(rho_pri[para_i], vec[:, fj]))/ (val[fi] + val[fj]))
-        Lambda_eig[Lambda_eig == np.inf] = 0.0
-        Lambda[para_i] = np.dot(vec, np.dot(Lambda_eig, vec.conj().transpose()))
-    return Lambda
+    # Lambda solves rho_pri = (rho_avg Lambda + Lambda rho_avg)/2, the same equation as the SLD
+    return FisherContext(rho_avg, list(rho_pri)).LD("SLD", eps)
@@ -1,7 +1,8 @@
 import numpy as np
 import os
 import copy
-from scipy.sparse import csc_matrix, csr_matrix
+from functools import lru_cache
+from scipy.sparse import csc_matrix, csr_matrix, coo_matrix, load_npz, save_npz, issparse
 from sympy import Matrix, GramSchmidt
 from itertools import product
 
@@ -85,6 +86,120 @@ def suN_generator(n):
         return Lambda
 
 
+@lru_cache(maxsize=None)
+def suN_stack(n):
+    """
+    SU($N$) generators stacked in a read-only array with the shape 
+    ($N^2-1$, $N$, $N$). The stack is calculated once per dimension.
+    """
+    Lambda = np.array(suN_generator(n))
+    Lambda.flags.writeable = False
+    return Lambda
+
+
+# format version of the persisted structure-constant tables
+_STRUCTURE_VERSION = 1
+
+# format version and length (2+3+...+151) of the bundle of the SIC fiducial states
+_SIC_STORE_VERSION = 1
+_SIC_STORE_SIZE = 151 * 152 // 2 - 1
+
+
+def cache_dir():
+    """
+    Directory for the persisted tables, it can be set via the environment 
+    variable `QUANESTIMATION_CACHE` and is `~/.cache/quanestimation` by default.
+    """
+    return os.environ.get(
+        "QUANESTIMATION_CACHE",
+        os.path.join(os.path.expanduser("~"), ".cache", "quanestimation"),
+    )
+
+
+@lru_cache(maxsize=None)
+def suN_structure(n):
+    r"""
+    Sparse table of the structure constants of the SU($N$) generators $\{\lambda_a\}$
+    returned by `suN_generator`. The entries of the table are 
+    \begin{align}
+    t_{abc}=\frac{1}{2}\mathrm{Tr}(\lambda_a\lambda_b\lambda_c)=d_{abc}+if_{abc}
+    \end{align}
+
+    with $d_{abc}$ the symmetric and $f_{abc}$ the antisymmetric structure constants, 
+    so that $\{\lambda_a,\lambda_b\}=\frac{4}{N}\delta_{ab}\openone+2\sum_c d_{abc}\lambda_c$. 
+    The table is calculated once per dimension and saved to the directory given by 
+    `cache_dir()`. The file name contains the format version and the dtype of the 
+    table, and a saved table is only used after its shape and some of its rows are 
+    verified, otherwise it is recalculated.
+
+    Parameters
+    ----------
+    > **n:** `int` 
+        -- The dimension of the system.
+
+    Returns
+    ----------
+    **table:** `csr_matrix`
+        -- The structure constants with the shape ($(N^2-1)^2$, $N^2-1$), the row 
+        $a(N^2-1)+b$ and the column $c$ is $t_{abc}$.
+    """
+
+    num = n**2 - 1
+    Lambda = suN_stack(n)
+    file_path = os.path.join(
+        cache_dir(), "suN_structure_d%d_v%d_complex128.npz" % (n, _STRUCTURE_VERSION)
+    )
+    if os.path.exists(file_path):
+        try:
+            table = load_npz(file_path).tocsr()
+            if _structure_check(table, Lambda):
+                return table
+        except Exception:
+            pass
+
+    gen, row, col = np.nonzero(Lambda)
+    val = Lambda[gen, row, col]
+
+    # (lambda_a lambda_b)_ik as a sparse matrix with rows (a, i) and columns (b, k)
+    A = csr_matrix((val, (gen * n + row, col)), shape=(num * n, n))
+    B = csr_matrix((val, (row, gen * n + col)), shape=(n, num * n))
+    AB = (A @ B).tocoo()
+    a, i = np.divmod(AB.row, n)
+    b, k = np.divmod(AB.col, n)
+    AB = coo_matrix((AB.data, (a * num + b, i * n + k)), shape=(num**2, n**2)).tocsr()
+
+    # contraction with (lambda_c)_ki
+    C = csr_matrix((val, (col * n + row, gen)), shape=(n**2, num))
+    table = (0.5 * (AB @ C)).tocsr()
+    table.data[np.abs(table.data) < 1e-12] = 0.0
+    table.eliminate_zeros()
+
+    # write to a temporary file first so that other processes never read a
+    # partially written table
+    try:
+        os.makedirs(cache_dir(), exist_ok=True)
+        tmp_path = "%s.%d.tmp.npz" % (file_path[:-4], os.getpid())
+        save_npz(tmp_path, table)
+        os.replace(tmp_path, file_path)
+    except OSError:
+        pass
+    return table
+
+
+def _structure_check(table, Lambda):
+    # shape, dtype and the rows (a, b) = (0, 0), (0, N^2-2) and (N^2-2, 0) of a saved table
+    num = len(Lambda)
+    if table.shape != (num**2, num) or table.dtype != np.complex128:
+        return False
+    if not np.all(np.isfinite(table.data)):
+        return False
+    for a, b in [(0, 0), (0, num - 1), (num - 1, 0)]:
+        row = 0.5 * np.einsum("ij,jk,cki->c", Lambda[a], Lambda[b], Lambda)
+        if not np.allclose(table[a * num + b].toarray().ravel(), row, atol=1e-10):
+            return False
+    return True
+
+
 def gramschmidt(A):
     dim = len(A)
     n = len(A[0])
@@ -113,36 +228,106 @@ def sic_povm(fiducial):
     https://doi.org/10.3390/axioms6030021 and it is realized in QBism.
     """
 
+    vec = sic_vectors(fiducial)
+    return [np.outer(v, v.conj()) for v in vec]
+
+
+def sic_vectors(fiducial):
+    """
+    Vectors $|m_y\rangle=D_{ab}|\psi\rangle/\sqrt{d}$ of the rank-one SIC-POVM 
+    $\Pi_y=|m_y\rangle\langle m_y|$ generated by the Weyl-Heisenberg displacement 
+    operators $D_{ab}$ and the fiducial state $|\psi\rangle$, the output is an array 
+    with the shape ($d^2$, d).
+    """
+
+    # D_ab = (-e^{i pi/d})^{ab} X^a Z^b with Z^b the phases w^{bk} and X^a the cyclic 
+    # shift k -> k+a, so that (D_ab psi)_k = (-e^{i pi/d})^{ab} w^{bs} psi_s, s = k-a
     d = fiducial.shape[0]
-    w = np.exp(2.0 * np.pi * 1.0j / d)
-    Z = np.diag([w**i for i in range(d)])
-    X = np.zeros((d, d), dtype=np.complex128)
-    for i in range(d):
-        for j in range(d):
-            if j != (d - 1):
-                X += np.dot(basis(d, j + 1), basis(d, j).transpose().conj())
-            else:
-                X += np.dot(basis(d, 0), basis(d, j).transpose().conj())
-    X = X / d
-
-    D = [[[] for i in range(d)] for j in range(d)]
-    for a in range(d):
-        for b in range(d):
-            X_a = np.linalg.matrix_power(X, a)
-            Z_b = np.linalg.matrix_power(Z, b)
-            D[a][b] = (-np.exp(1.0j * np.pi / d)) ** (a * b) * np.dot(X_a, Z_b)
-
-    res = []
-    for m in range(d):
-        for n in range(d):
-            res_tp = np.dot(D[m][n], fiducial)
-            res_tp = res_tp / np.linalg.norm(res_tp)
-            basis_res = np.dot(res_tp, res_tp.conj().transpose()) / d
-            res.append(basis_res)
-    return res
+    fiducial = np.asarray(fiducial).reshape(d)
+    fiducial = fiducial / np.linalg.norm(fiducial)
+    a = np.arange(d)[:, None, None]
+    b = np.arange(d)[None, :, None]
+    s = (np.arange(d)[None, None, :] - a) % d
+    phase = np.exp(2.0j * np.pi * ((b * s) % d) / d)
+    phase_ab = np.exp(1.0j * np.pi * (((d + 1) * a * b) % (2 * d)) / d)
+    res = fiducial[s] * phase * phase_ab
+    return res.reshape(d**2, d) / np.sqrt(d)
+
+
+def build_SIC_store(file_path=None):
+    """
+    Convert the fiducial states in `sic_fiducial_vectors/d*.txt` into one binary 
+    bundle which can be memory-mapped. The fiducial states of all the dimensions 
+    are concatenated in the order of the dimension. The package directory is 
+    never written to.
 
+    Parameters
+    ----------
+    > **file_path:** `string` 
+        -- The path of the bundle. The default is `sic_fiducials_v1.npy` in the 
+        directory given by `cache_dir()`.
 
-def SIC(dim):
+    Returns
+    ----------
+    The path of the bundle.
+    """
+
+    if file_path is None:
+        file_path = _SIC_store_path()
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    # write to a temporary file first so that other processes never read a
+    # partially written bundle
+    tmp_path = "%s.%d.tmp.npy" % (file_path[:-4], os.getpid())
+    np.save(tmp_path, _SIC_data())
+    os.replace(tmp_path, file_path)
+    return file_path
+
+
+def _SIC_dir():
+    return os.path.join(os.path.dirname(os.path.dirname(__file__)), "sic_fiducial_vectors")
+
+
+def _SIC_store_path():
+    return os.path.join(cache_dir(), "sic_fiducials_v%d.npy" % (_SIC_STORE_VERSION))
+
+
+def _SIC_data():
+    data = []
+    for dim in range(2, 152):
+        data_tp = np.loadtxt(os.path.join(_SIC_dir(), "d%d.txt" % (dim)))
+        data.append(data_tp[:, 0] + data_tp[:, 1] * 1.0j)
+    return np.concatenate(data)
+
+
+@lru_cache(maxsize=None)
+def _SIC_store():
+    # the bundle in the cache directory, it is built on first use and the fiducial
+    # states are kept in memory if the cache directory is not writable
+    file_path = _SIC_store_path()
+    if os.path.exists(file_path):
+        try:
+            store = np.load(file_path, mmap_mode="r")
+            if store.shape == (_SIC_STORE_SIZE,) and store.dtype == np.complex128:
+                return store
+        except (OSError, ValueError):
+            pass
+    try:
+        return np.load(build_SIC_store(file_path), mmap_mode="r")
+    except OSError:
+        return _SIC_data()
+
+
+@lru_cache(maxsize=32)
+def _SIC_vectors(dim):
+    # the fiducial state of dimension d starts at 2+3+...+(d-1) in the bundle
+    start = dim * (dim - 1) // 2 - 1
+    fiducial = np.array(_SIC_store()[start : start + dim]).reshape(dim, 1)
+    vec = sic_vectors(fiducial)
+    vec.flags.writeable = False
+    return vec
+
+
+def SIC(dim, rank_one=False):
     """
     Generation of a set of rank-one symmetric informationally complete 
     positive operator-valued measure (SIC-POVM).
@@ -152,6 +337,12 @@ def SIC(dim):
     > **dim:** `int` 
         -- The dimension of the system.
 
+    > **rank_one:** `bool` 
+        -- Whether or not to return the vectors $|m_y\rangle$ of the SIC-POVM 
+        $\Pi_y=|m_y\rangle\langle m_y|$ instead of the matrices. If set True then 
+        an array with the shape ($d^2$, d) is returned, which can be used as the 
+        measurement in `CFIM`.
+
     Returns
     ----------
     A set of SCI-POVM.
@@ -159,19 +350,15 @@ def SIC(dim):
     **Note:** 
         SIC-POVM is calculated by the Weyl-Heisenberg covariant SIC-POVM fiducial state 
         which can be downloaded from [here](http://www.physics.umb.edu/Research/QBism/
-        solutions.html).
+        solutions.html). The fiducial states are read from a binary bundle built by 
+        `build_SIC_store` and the SIC-POVMs are cached per dimension.
     """
 
     if dim <= 151:
-        file_path = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)),
-            "sic_fiducial_vectors/d%d.txt" % (dim),
-        )
-        data = np.loadtxt(file_path)
-        fiducial = data[:, 0] + data[:, 1] * 1.0j
-        fiducial = np.array(fiducial).reshape(len(fiducial), 1)
-        M = sic_povm(fiducial)
-        return M
+        vec = _SIC_vectors(dim)
+        if rank_one == True:
+            return vec
+        return [np.outer(v, v.conj()) for v in vec]
     else:
         raise ValueError("The dimension of the space should be less or equal to 151.")
 
@@ -193,6 +380,87 @@ def annihilation(n):
     return a
 
 
+def sparse_memory(ops):
+    """
+    Memory footprint of a set of operators stored as dense arrays and as 
+    `scipy.sparse` matrices in CSR format.
+
+    Parameters
+    ----------
+    > **ops:** `list`
+        -- Operators, for example the Kraus operators, the derivatives of the 
+        density matrix or the POVM. The elements can be dense or sparse.
+
+    Returns
+    ----------
+    **memory:** `dict`
+        -- The number of bytes of the dense storage ("dense"), the sparse storage 
+        ("sparse") and the difference between them ("saved").
+    """
+
+    dense, sparse = 0, 0
+    for op in ops:
+        op = csr_matrix(op)
+        dense += np.prod(op.shape) * op.dtype.itemsize
+        sparse += op.data.nbytes + op.indices.nbytes + op.indptr.nbytes
+    return {"dense": int(dense), "sparse": int(sparse), "saved": int(dense - sparse)}
+
+
+def _precision_check(precision):
+    if precision not in ["single", "double"]:
+        raise ValueError("{!r} is not a valid value for precision, supported values are 'single' and 'double'.".format(precision))
+    return precision
+
+
+_PRECISION = _precision_check(os.environ.get("QUANESTIMATION_PRECISION", "double"))
+
+
+def set_precision(precision):
+    """
+    Set the floating-point precision of the batched Fisher information 
+    calculations (`QFIM_batch`, `CFIM_batch`, `QFIM_trajectory`, `FIM`, ...), the 
+    Bayesian bounds and the NumPy parameterizations. In the single precision mode 
+    the density matrices are cast to `complex64` before the eigendecompositions 
+    and the Fisher information matrices are returned in double precision. The 
+    default can also be set via the environment variable 
+    `QUANESTIMATION_PRECISION`, any value other than "single" or "double" raises 
+    a ValueError on import.
+
+    Parameters
+    ----------
+    > **precision:** `string`
+        -- Options are:  
+        "double" (default) -- `complex128` arithmetic.  
+        "single" -- `complex64` arithmetic, suitable for screening scans over 
+        large grids.
+    """
+    global _PRECISION
+    _PRECISION = _precision_check(precision)
+
+
+def get_precision():
+    """
+    The current floating-point precision, "single" or "double".
+    """
+    return _PRECISION
+
+
+def precision_cast(A):
+    # cast to complex64 (float32 for real input) in the single precision mode, 
+    # A is returned unchanged in the double precision mode
+    if _PRECISION != "single":
+        return A
+    if issparse(A):
+        return A.astype(np.complex64 if np.iscomplexobj(A.data) else np.float32)
+    A = np.asarray(A)
+    return A.astype(np.complex64 if np.iscomplexobj(A) else np.float32, copy=False)
+
+
+def precision_promote(A):
+    # promote the results of the single precision mode back to double precision
+    return np.asarray(A, dtype=np.result_type(A, np.float64))
+
+
 def brgd(n):
     if n == 1:
         return ["0", "1"]
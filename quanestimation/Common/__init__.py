@@ -1,19 +1,29 @@
 from quanestimation.Common.Common import (
     mat_vec_convert,
     suN_generator,
+    suN_structure,
     gramschmidt,
     basis,
     SIC,
+    build_SIC_store,
     annihilation,
+    sparse_memory,
+    set_precision,
+    get_precision,
     BayesInput,
 )
 
 __all__ = [
     "mat_vec_convert",
     "suN_generator",
+    "suN_structure",
     "gramschmidt",
     "basis",
     "SIC",
+    "build_SIC_store",
     "annihilation",
+    "sparse_memory",
+    "set_precision",
+    "get_precision",
     "BayesInput",
 ]
@@ -0,0 +1,193 @@
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+
+class FiniteDifference:
+    r"""
+    Derivatives of a density matrix $\rho(\textbf{x})$ that is only available as a
+    function of the parameters. The first derivatives are calculated with the
+    central difference
+    \begin{align}
+    \partial_a\rho\approx\frac{\rho(\textbf{x}+h_a\textbf{e}_a)
+    -\rho(\textbf{x}-h_a\textbf{e}_a)}{2h_a},
+    \end{align}
+
+    or with its Richardson extrapolation $[4D(h_a/2)-D(h_a)]/3$ with $D(h_a)$ the
+    central difference above. The density matrices at the stencil points are
+    evaluated in a thread or process pool and cached by the parameter tuple, so
+    that repeated evaluations on the same grid do not recompute the dynamics.
+
+    Attributes
+    ----------
+    > **func:** `callable`
+        -- A function which takes the values of the parameters (a float or a list)
+        and returns the density matrix. It should be picklable (a module-level
+        function) if `pool="process"`.
+
+    > **method:** `string`
+        -- Finite difference scheme. Options are:
+        "central" (default) -- central difference with the error of $O(h^2)$.
+        "richardson" -- Richardson extrapolated central difference with the
+        error of $O(h^4)$.
+
+    > **step:** `float or list`
+        -- Step sizes of the parameters. If it is not set, the step of the $a$th
+        parameter is $h_a=\epsilon^{1/3}\max(|x_a|, 1)$ for the central difference
+        and $h_a=\epsilon^{1/5}\max(|x_a|, 1)$ for the Richardson extrapolation
+        with $\epsilon$ the machine epsilon. The step for the second derivatives
+        is $h_a=\epsilon^{1/4}\max(|x_a|, 1)$.
+
+    > **workers:** `int`
+        -- Number of workers for the evaluations of func. The evaluations are
+        serial if it is not set.
+
+    > **pool:** `string`
+        -- Type of the worker pool. Options are:
+        "thread" (default) -- `concurrent.futures.ThreadPoolExecutor`.
+        "process" -- `concurrent.futures.ProcessPoolExecutor`.
+    """
+
+    def __init__(self, func, method="central", step=None, workers=None, pool="thread"):
+
+        if method not in ["central", "richardson"]:
+            raise ValueError("{!r} is not a valid value for method, supported values are 'central' and 'richardson'.".format(method))
+        if pool not in ["thread", "process"]:
+            raise ValueError("{!r} is not a valid value for pool, supported values are 'thread' and 'process'.".format(pool))
+
+        self.func = func
+        self.method = method
+        self.step = step
+        self.workers = workers
+        self.pool = pool
+        self.cache = {}
+
+    def __call__(self, x):
+        r"""
+        Calculation of the density matrix and its derivatives at x.
+
+        Parameters
+        ----------
+        > **x:** `float or list`
+            -- The values of the parameters.
+
+        Returns
+        ----------
+        Density matrix and its derivatives on the unknown parameters.
+        """
+
+        rho, drho = self.grid([x])
+        return rho[0], drho[0]
+
+    def grid(self, xspan):
+        r"""
+        Calculation of the density matrices and their derivatives at a set of
+        points. The stencil points of all the points are evaluated in one pass
+        of the worker pool.
+
+        Parameters
+        ----------
+        > **xspan:** `list`
+            -- The values of the parameters at the points, for example the grid
+            of the prior distribution in the Bayesian bounds.
+
+        Returns
+        ----------
+        Lists of the density matrices and their derivatives on the unknown
+        parameters at all the points.
+        """
+
+        xspan = [self._point(x) for x in xspan]
+        stencils = [self._stencil(x) for x in xspan]
+        self._evaluate([x for x in xspan] + [p for s in stencils for p, _, _ in s])
+
+        rho = [self.cache[x] for x in xspan]
+        drho = []
+        for x, stencil in zip(xspan, stencils):
+            drho_x = [0.0 for i in range(len(x))]
+            for p, a, coef in stencil:
+                drho_x[a] = drho_x[a] + coef * self.cache[p]
+            drho.append(drho_x)
+        return rho, drho
+
+    def secondorder_derivative(self, x):
+        r"""
+        Calculation of the density matrix, its derivatives and the second
+        derivatives $\partial^2_a\rho$ at x via
+        \begin{align}
+        \partial^2_a\rho\approx\frac{\rho(\textbf{x}+h_a\textbf{e}_a)-2\rho(\textbf{x})
+        +\rho(\textbf{x}-h_a\textbf{e}_a)}{h_a^2}.
+        \end{align}
+
+        Parameters
+        ----------
+        > **x:** `float or list`
+            -- The values of the parameters.
+
+        Returns
+        ----------
+        Density matrix and its first and second derivatives on the unknown
+        parameters.
+        """
+
+        rho, drho = self(x)
+        x = self._point(x)
+        h = self._steps(x, 1.0 / 4.0)
+        points = [(self._shift(x, a, h[a]), self._shift(x, a, -h[a])) for a in range(len(x))]
+        self._evaluate([p for pair in points for p in pair])
+
+        d2rho = [
+            (self.cache[p] - 2 * rho + self.cache[m]) / h[a]**2
+            for a, (p, m) in enumerate(points)
+        ]
+        return rho, drho, d2rho
+
+    def _point(self, x):
+        return tuple(float(xi) for xi in np.atleast_1d(x))
+
+    def _shift(self, x, a, h):
+        x = list(x)
+        x[a] = x[a] + h
+        return tuple(x)
+
+    def _steps(self, x, power):
+        if self.step is None:
+            eps = np.finfo(float).eps
+            return [eps**power * max(abs(xi), 1.0) for xi in x]
+        return list(np.broadcast_to(self.step, len(x)))
+
+    def _stencil(self, x):
+        # stencil points of the first derivatives as (point, parameter, coefficient)
+        stencil = []
+        if self.method == "central":
+            h = self._steps(x, 1.0 / 3.0)
+            for a in range(len(x)):
+                stencil += [
+                    (self._shift(x, a, h[a]), a, 0.5 / h[a]),
+                    (self._shift(x, a, -h[a]), a, -0.5 / h[a]),
+                ]
+        else:
+            h = self._steps(x, 1.0 / 5.0)
+            for a in range(len(x)):
+                # [4D(h/2)-D(h)]/3 with D(h) the central difference
+                stencil += [
+                    (self._shift(x, a, h[a] / 2), a, 4.0 / (3.0 * h[a])),
+                    (self._shift(x, a, -h[a] / 2), a, -4.0 / (3.0 * h[a])),
+                    (self._shift(x, a, h[a]), a, -1.0 / (6.0 * h[a])),
+                    (self._shift(x, a, -h[a]), a, 1.0 / (6.0 * h[a])),
+                ]
+        return stencil
+
+    def _evaluate(self, points):
+        # evaluate func at the points which are not in the cache
+        todo = list(dict.fromkeys(p for p in points if p not in self.cache))
+        if todo == []:
+            return
+        args = [p[0] if len(p) == 1 else list(p) for p in todo]
+        if self.workers is None or self.workers == 1:
+            res = [self.func(arg) for arg in args]
+        else:
+            Executor = ThreadPoolExecutor if self.pool == "thread" else ProcessPoolExecutor
+            with Executor(max_workers=self.workers) as executor:
+                res = list(executor.map(self.func, args))
+        for p, rho in zip(todo, res):
+            self.cache[p] = np.array(rho, dtype=np.complex128)
@@ -1,4 +1,5 @@
 import numpy as np
+from quanestimation.Common.Common import precision_cast
 
 
 def Kraus(rho0, K, dK):
@@ -28,12 +29,15 @@ def Kraus(rho0, K, dK):
     Density matrix and its derivatives on the unknown parameters.
     """
 
+    rho0 = precision_cast(rho0)
+    K = [precision_cast(Ki) for Ki in K]
+    dK = [[precision_cast(dKi) for dKi in dKj] for dKj in dK]
     k_num = len(K)
     para_num = len(dK[0])
     dK_reshape = [[dK[i][j] for i in range(k_num)] for j in range(para_num)]
 
-    rho = sum([np.dot(Ki, np.dot(rho0, Ki.conj().T)) for Ki in K])
-    drho = [sum([(np.dot(dKi, np.dot(rho0, Ki.conj().T))+ np.dot(Ki, np.dot(rho0, dKi.conj().T))) for (Ki, dKi) in zip(K, dKj)]) for dKj in dK_reshape]
+    rho = sum([Ki @ rho0 @ Ki.conj().T for Ki in K])
+    drho = [sum([(dKi @ rho0 @ Ki.conj().T + Ki @ rho0 @ dKi.conj().T) for (Ki, dKi) in zip(K, dKj)]) for dKj in dK_reshape]
 
     return rho, drho
     
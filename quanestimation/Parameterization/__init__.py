@@ -4,9 +4,13 @@ from quanestimation.Parameterization.GeneralDynamics import (
 from quanestimation.Parameterization.NonDynamics import (
     Kraus,
 )
+from quanestimation.Parameterization.FiniteDifference import (
+    FiniteDifference,
+)
 
 __all__ = [
     "Lindblad",
     "secondorder_derivative",
     "Kraus", 
+    "FiniteDifference",
 ]
@@ -13,18 +13,34 @@ if julia.find_libpython.linked_libpython() is None:
 
 from quanestimation.AsymptoticBound.CramerRao import (
     CFIM,
+    CFIM_batch,
+    CFIM_pure,
     QFIM,
+    QFIM_batch,
+    QFIM_trajectory,
+    QFIM_support,
+    QFIM_pure,
     QFIM_Bloch,
     QFIM_Gauss,
     QFIM_Kraus,
     FIM,
     FI_Expt,
+    FI_Expt_CI,
+    FI_ExptStream,
     LLD,
     RLD,
     SLD,
+    FisherContext,
+)
+from quanestimation.AsymptoticBound.FisherMap import (
+    qfim_map,
+    cfim_map,
 )
 from quanestimation.AsymptoticBound.AnalogCramerRao import (
     HCRB, NHB, 
+    HCRBSolver,
+    NHBSolver,
+    SDPResult,
 )
 from quanestimation.BayesianBound.BayesCramerRao import (
     BCFIM,
@@ -48,10 +64,15 @@ from quanestimation.BayesianBound.BayesEstimation import (
 from quanestimation.Common.Common import (
     mat_vec_convert,
     suN_generator,
+    suN_structure,
     gramschmidt,
     basis,
     SIC,
+    build_SIC_store,
     annihilation,
+    sparse_memory,
+    set_precision,
+    get_precision,
     BayesInput,
 )
 
@@ -93,6 +114,9 @@ from quanestimation.Parameterization.GeneralDynamics import (
 from quanestimation.Parameterization.NonDynamics import (
     Kraus,
 )
+from quanestimation.Parameterization.FiniteDifference import (
+    FiniteDifference,
+)
 
 from quanestimation.MeasurementOpt.MeasurementStruct import (
     MeasurementSystem,
@@ -149,17 +173,31 @@ __all__ = [
     "MeasurementOpt",
     "ComprehensiveOpt",
     "CFIM",
+    "CFIM_batch",
+    "CFIM_pure",
     "QFIM",
+    "QFIM_batch",
+    "QFIM_trajectory",
+    "QFIM_support",
+    "QFIM_pure",
     "QFIM_Bloch",
     "LLD",
     "RLD",
     "SLD",
+    "FisherContext",
+    "qfim_map",
+    "cfim_map",
     "HCRB",
+    "HCRBSolver",
     "NHB",
+    "NHBSolver",
+    "SDPResult",
     "QFIM_Gauss",
     "QFIM_Kraus",
     "FIM",
     "FI_Expt",
+    "FI_Expt_CI",
+    "FI_ExptStream",
     "BCFIM",
     "BQFIM",
     "BCRB",
@@ -174,6 +212,7 @@ __all__ = [
     "BayesCost",
     "Lindblad",
     "Kraus",
+    "FiniteDifference",
     "SpinSqueezing",
     "TargetTime",
     "GRAPE_Copt",
@@ -191,10 +230,15 @@ __all__ = [
     "RI_Sopt",
     "mat_vec_convert",
     "suN_generator",
+    "suN_structure",
     "gramschmidt",
     "basis",
     "SIC",
+    "build_SIC_store",
     "annihilation",
+    "sparse_memory",
+    "set_precision",
+    "get_precision",
     "BayesInput",
     "csv2npy_controls",
     "csv2npy_states",
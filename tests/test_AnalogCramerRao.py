@@ -0,0 +1,76 @@
+import json
+import unittest
+import numpy as np
+from quanestimation import HCRB, HCRBSolver, NHB, NHBSolver, SDPResult
+from tests.test_CramerRao import random_state
+
+
+class TestHCRB(unittest.TestCase):
+    def test_kernel_block(self):
+        # rank-deficient state whose first derivative does not vanish on the
+        # kernel, the support-reduced formulation does not apply here
+        rho = np.diag([0.6, 0.4, 0.0]).astype(np.complex128)
+        drho = [
+            np.diag([-1.0, 0.0, 1.0]).astype(np.complex128),
+            np.array(
+                [[0.5, 0.2 - 0.3j, 0.1j], [0.2 + 0.3j, -0.5, 0.4], [-0.1j, 0.4, 0.0]]
+            ),
+        ]
+        W = np.identity(2)
+
+        value = HCRB(rho, drho, W)
+        full = HCRBSolver(3, 2, W).solve(rho, drho)
+        self.assertAlmostEqual(value, full, places=5)
+        with self.assertRaises(ValueError):
+            HCRBSolver(3, 2, W, rank=2).solve(rho, drho)
+
+    def test_solver_reuse(self):
+        # the value of a reused solver does not depend on the previous solves
+        rng = np.random.default_rng(9)
+        states = [random_state(rng, 3, 2) for i in range(2)]
+        W = np.identity(2)
+        solver = HCRBSolver(3, 2, W)
+        for rho, drho in states + states[::-1]:
+            self.assertAlmostEqual(solver.solve(rho, drho), HCRB(rho, drho, W), places=6)
+        rho, drho = states[0]
+        self.assertAlmostEqual(
+            solver.solve(rho, drho, warm_start=True), HCRB(rho, drho, W), places=4
+        )
+
+    def test_native(self):
+        rho, drho = random_state(np.random.default_rng(8), 3, 2)
+        W = np.array([[1.0, 0.2], [0.2, 0.5]])
+        self.assertAlmostEqual(
+            HCRB(rho, drho, W, method="native"), HCRB(rho, drho, W), places=4
+        )
+
+    def test_result(self):
+        rho, drho = random_state(np.random.default_rng(8), 3, 2)
+        W = np.identity(2)
+        for method in ["cvxpy", "native"]:
+            res = HCRB(rho, drho, W, method=method, result=True)
+            self.assertIsInstance(res, SDPResult)
+            self.assertAlmostEqual(res.value, HCRB(rho, drho, W, method=method), places=6)
+            self.assertEqual(np.shape(res.X), (2, 3, 3))
+            self.assertEqual(json.loads(res.to_json())["value"], res.value)
+
+
+class TestNHB(unittest.TestCase):
+    def test_native(self):
+        rho, drho = random_state(np.random.default_rng(8), 3, 2)
+        W = np.array([[1.0, 0.2], [0.2, 0.5]])
+        self.assertAlmostEqual(
+            NHB(rho, drho, W, method="native"), NHB(rho, drho, W), places=4
+        )
+
+    def test_solver_reuse(self):
+        rng = np.random.default_rng(10)
+        states = [random_state(rng, 2, 2) for i in range(2)]
+        W = np.identity(2)
+        solver = NHBSolver(2, 2, W)
+        for rho, drho in states + states[::-1]:
+            self.assertAlmostEqual(solver.solve(rho, drho), NHB(rho, drho, W), places=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import h5py
+import numpy as np
+from scipy.integrate import simps
+from quanestimation import BCFIM, BCRB, BQCRB, BQFIM, QFIM, QVTB, VTB
+
+
+def phase(x):
+    # |+> rotated by exp(-i x sigma_z / 2), the QFI is equal to one
+    rho = 0.5 * np.array([[1.0, np.exp(-1j * x)], [np.exp(1j * x), 1.0]])
+    drho = 0.5 * np.array([[0.0, -1j * np.exp(-1j * x)], [1j * np.exp(1j * x), 0.0]])
+    return rho, [drho]
+
+
+def qubit(x):
+    # mixed qubit state with the Bloch vector 0.9(sin(x1)cos(x0), sin(x1)sin(x0), cos(x1))
+    r = 0.9 * np.array([np.sin(x[1]) * np.cos(x[0]), np.sin(x[1]) * np.sin(x[0]), np.cos(x[1])])
+    dr = 0.9 * np.array([
+        [-np.sin(x[1]) * np.sin(x[0]), np.sin(x[1]) * np.cos(x[0]), 0.0],
+        [np.cos(x[1]) * np.cos(x[0]), np.cos(x[1]) * np.sin(x[0]), -np.sin(x[1])],
+    ])
+
+    def bloch(v, c):
+        return 0.5 * np.array([[c + v[2], v[0] - 1j * v[1]], [v[0] + 1j * v[1], c - v[2]]])
+
+    return bloch(r, 1.0), [bloch(d, 0.0) for d in dr]
+
+
+def qubit_grid():
+    x = [np.linspace(-1.0, 1.0, 9), np.linspace(0.4, 1.2, 7)]
+    X0, X1 = np.meshgrid(x[0], x[1], indexing="ij")
+    p = np.exp(-X0**2 - (X1 - 0.8) ** 2)
+    p = p / simps(simps(p, x[1]), x[0])
+    dp = np.array([-2 * X0 * p, -2 * (X1 - 0.8) * p])
+    states = [qubit([x0, x1]) for x0 in x[0] for x1 in x[1]]
+    rho = np.array([s[0] for s in states]).reshape(9, 7, 2, 2)
+    drho = np.array([s[1] for s in states]).reshape(9, 7, 2, 2, 2)
+    return x, p, list(dp), rho, drho
+
+
+class TestBayesBound(unittest.TestCase):
+    def setUp(self):
+        self.x = np.linspace(-1.0, 1.0, 41)
+        p = np.exp(-self.x**2 / 0.5)
+        self.p = p / simps(p, self.x)
+        self.dp = -4.0 * self.x * self.p
+        states = [phase(xi) for xi in self.x]
+        self.rho = [s[0] for s in states]
+        self.drho = [s[1] for s in states]
+
+    def test_single_parameter(self):
+        x, p, dp = [self.x], self.p, self.dp
+        self.assertAlmostEqual(BQCRB(x, p, dp, self.rho, self.drho), 1.0, places=8)
+        self.assertAlmostEqual(BQCRB(x, p, dp, self.rho, self.drho, btype=2), 1.0, places=8)
+        I_p = simps(dp**2 / p, self.x)
+        self.assertAlmostEqual(QVTB(x, p, dp, self.rho, self.drho), 1.0 / (1.0 + I_p), places=8)
+
+    def test_vanishing_fisher(self):
+        # the CFI of the measurement in the x basis vanishes at x=0, the bounds of
+        # the first and third type are infinite as for 1/F
+        M = [0.5 * np.array([[1.0, 1.0], [1.0, 1.0]]), 0.5 * np.array([[1.0, -1.0], [-1.0, 1.0]])]
+        x = [self.x]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.assertEqual(BCRB(x, self.p, self.dp, self.rho, self.drho, M=M), np.inf)
+            self.assertEqual(BCRB(x, self.p, self.dp, self.rho, self.drho, M=M, btype=3), np.inf)
+            self.assertTrue(np.isfinite(BCRB(x, self.p, self.dp, self.rho, self.drho, M=M, btype=2)))
+
+    def test_multiparameter(self):
+        x, p, dp, rho, drho = qubit_grid()
+        F = np.array([[QFIM(rho[i, j], list(drho[i, j])) for j in range(7)] for i in range(9)])
+        expect = simps(simps(p[..., None, None] * np.linalg.inv(F), x[1], axis=1), x[0], axis=0)
+        np.testing.assert_allclose(BQCRB(x, p, dp, rho, drho), expect, atol=1e-10)
+        # nested lists are accepted as well
+        np.testing.assert_allclose(
+            BQCRB(x, p, dp, rho.tolist(), drho.tolist()), expect, atol=1e-10
+        )
+        expect = simps(simps(p[..., None, None] * F, x[1], axis=1), x[0], axis=0)
+        np.testing.assert_allclose(BQFIM(x, p, rho, drho), expect, atol=1e-10)
+
+
+class TestBayesParallel(unittest.TestCase):
+    def setUp(self):
+        self.x, self.p, self.dp, self.rho, self.drho = qubit_grid()
+
+    def bounds(self, **kwargs):
+        x, p, dp, rho, drho = self.x, self.p, self.dp, self.rho, self.drho
+        return [
+            BCFIM(x, p, rho, drho, **kwargs),
+            BQFIM(x, p, rho, drho, **kwargs),
+            BCRB(x, p, dp, rho, drho, btype=3, **kwargs),
+            BQCRB(x, p, dp, rho, drho, btype=2, **kwargs),
+            VTB(x, p, dp, rho, drho, **kwargs),
+            QVTB(x, p, dp, rho, drho, **kwargs),
+        ]
+
+    def test_workers(self):
+        expect = self.bounds()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for kwargs in [
+                {"workers": 2},
+                {"workers": 3, "executor": "process"},
+                {"executor": executor},
+            ]:
+                for res, res0 in zip(self.bounds(**kwargs), expect):
+                    np.testing.assert_allclose(res, res0, atol=1e-12)
+
+
+class TestBayesStream(unittest.TestCase):
+    def setUp(self):
+        self.x, self.p, self.dp, self.rho, self.drho = qubit_grid()
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def bounds(self, rho, drho, **kwargs):
+        x, p, dp = self.x, self.p, self.dp
+        return [
+            BCFIM(x, p, rho, drho, **kwargs),
+            BQCRB(x, p, dp, rho, drho, **kwargs),
+            BCRB(x, p, dp, rho, drho, btype=2, **kwargs),
+            QVTB(x, p, dp, rho, drho, **kwargs),
+        ]
+
+    def assertBounds(self, res, expect):
+        for res_i, expect_i in zip(res, expect):
+            np.testing.assert_allclose(res_i, expect_i, atol=1e-12)
+
+    def test_blocksize(self):
+        expect = self.bounds(self.rho, self.drho)
+        for blocksize in [1, 5, 7, 20, 1000]:
+            self.assertBounds(self.bounds(self.rho, self.drho, blocksize=blocksize), expect)
+
+    def test_callable(self):
+        expect = self.bounds(self.rho, self.drho)
+        self.assertBounds(self.bounds(qubit, None), expect)
+        self.assertBounds(self.bounds(qubit, None, blocksize=10), expect)
+
+    def test_files(self):
+        expect = self.bounds(self.rho, self.drho)
+        rho_path = os.path.join(self.tmp.name, "rho.npy")
+        drho_path = os.path.join(self.tmp.name, "drho.npy")
+        np.save(rho_path, self.rho)
+        np.save(drho_path, self.drho)
+        self.assertBounds(self.bounds(rho_path, drho_path, blocksize=8), expect)
+        rho = np.load(rho_path, mmap_mode="r")
+        drho = np.load(drho_path, mmap_mode="r")
+        self.assertBounds(self.bounds(rho, drho, blocksize=8), expect)
+
+        with h5py.File(os.path.join(self.tmp.name, "grid.h5"), "w") as f:
+            f["rho"] = self.rho
+            f["drho"] = self.drho
+            self.assertBounds(self.bounds(f["rho"], f["drho"], blocksize=8), expect)
+
+    def test_flat(self):
+        expect = self.bounds(self.rho, self.drho)
+        self.assertBounds(
+            self.bounds(self.rho.reshape(63, 2, 2), self.drho.reshape(63, 2, 2, 2)), expect
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
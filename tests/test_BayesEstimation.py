@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from quanestimation import Bayes
+from tests.test_BayesCramerRao import qubit, qubit_grid
+
+
+class TestBayes(unittest.TestCase):
+    def setUp(self):
+        # Bayes saves pout.npy and xout.npy in the working directory
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        self.x, self.p, _, self.rho, _ = qubit_grid()
+        self.M = [np.diag([1.0, 0.0]).astype(np.complex128), np.diag([0.0, 1.0]).astype(np.complex128)]
+        self.y = np.random.default_rng(11).integers(0, 2, size=20)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_likelihood(self):
+        # posterior from the likelihoods of the observed results
+        pyx = np.real(np.einsum("abij,yji->yab", self.rho, np.array(self.M)))
+        post = self.p * np.prod(pyx[self.y], axis=0)
+        pout, xout = Bayes(self.x, self.p, self.rho, self.y, M=self.M, estimator="MAP")
+        np.testing.assert_allclose(pout / pout.max(), post / post.max(), atol=1e-10)
+        index = np.unravel_index(np.argmax(post), post.shape)
+        self.assertEqual(xout, [self.x[0][index[0]], self.x[1][index[1]]])
+
+    def test_blocksize(self):
+        pout, xout = Bayes(self.x, self.p, self.rho, self.y, M=self.M)
+        for rho, blocksize in [(self.rho, 5), (self.rho, 1000), (qubit, None), (qubit, 4)]:
+            res = Bayes(self.x, self.p, rho, self.y, M=self.M, blocksize=blocksize)
+            np.testing.assert_allclose(res[0], pout, atol=1e-12)
+            np.testing.assert_allclose(res[1], xout, atol=1e-12)
+
+    def test_file(self):
+        pout, xout = Bayes(self.x, self.p, self.rho, self.y, M=self.M)
+        np.save("rho.npy", self.rho)
+        res = Bayes(self.x, self.p, "rho.npy", self.y, M=self.M, blocksize=8)
+        np.testing.assert_allclose(res[0], pout, atol=1e-12)
+        np.testing.assert_allclose(res[1], xout, atol=1e-12)
+
+
+if __name__ == "__main__":
+    unittest.main()
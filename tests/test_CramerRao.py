@@ -0,0 +1,157 @@
+import unittest
+import numpy as np
+import scipy.sparse as sp
+from quanestimation import CFIM, CFIM_batch, CFIM_pure, QFIM, QFIM_batch, QFIM_Kraus, QFIM_pure, QFIM_support, QFIM_trajectory, SLD
+
+
+def random_state(rng, dim, para_num):
+    # full-rank density matrix and the derivatives generated by random Hamiltonians
+    A = rng.normal(size=(dim, dim)) + 1j * rng.normal(size=(dim, dim))
+    rho = A @ A.conj().T
+    rho = rho / np.trace(rho)
+    drho = []
+    for i in range(para_num):
+        H = rng.normal(size=(dim, dim)) + 1j * rng.normal(size=(dim, dim))
+        H = H + H.conj().T
+        drho.append(-1j * (H @ rho - rho @ H))
+    return rho, drho
+
+
+def random_batch(rng, num, dim, para_num):
+    states = [random_state(rng, dim, para_num) for i in range(num)]
+    return np.array([s[0] for s in states]), np.array([s[1] for s in states])
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(1)
+        self.rho, self.drho = random_batch(self.rng, 4, 3, 2)
+
+    def test_QFIM_batch(self):
+        F = QFIM_batch(self.rho, self.drho)
+        self.assertEqual(F.shape, (4, 2, 2))
+        for i in range(4):
+            np.testing.assert_allclose(F[i], QFIM(self.rho[i], list(self.drho[i])), atol=1e-10)
+
+    def test_QFIM_batch_RLD(self):
+        F = QFIM_batch(self.rho, self.drho, LDtype="RLD")
+        for i in range(4):
+            np.testing.assert_allclose(
+                F[i], QFIM(self.rho[i], list(self.drho[i]), LDtype="RLD"), atol=1e-10
+            )
+
+    def test_CFIM_batch(self):
+        vec = np.linalg.qr(self.rng.normal(size=(3, 3)) + 1j * self.rng.normal(size=(3, 3)))[0]
+        M = [np.outer(vec[:, i], vec[:, i].conj()) for i in range(3)]
+        F = CFIM_batch(self.rho, self.drho, M)
+        F_SIC = CFIM_batch(self.rho, self.drho)
+        for i in range(4):
+            np.testing.assert_allclose(F[i], CFIM(self.rho[i], list(self.drho[i]), M), atol=1e-10)
+            np.testing.assert_allclose(F_SIC[i], CFIM(self.rho[i], list(self.drho[i])), atol=1e-10)
+
+
+class TestSparse(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(4)
+        self.rho, self.drho = random_state(rng, 4, 2)
+        self.M = [np.diag(np.eye(4)[i]).astype(np.complex128) for i in range(4)]
+
+    def test_QFIM(self):
+        rho = sp.csr_matrix(self.rho)
+        drho = [sp.csr_matrix(d) for d in self.drho]
+        np.testing.assert_allclose(QFIM(rho, drho), QFIM(self.rho, self.drho), atol=1e-10)
+        np.testing.assert_allclose(SLD(rho, drho), SLD(self.rho, self.drho), atol=1e-10)
+
+    def test_CFIM(self):
+        rho = sp.csr_matrix(self.rho)
+        drho = [sp.csr_matrix(d) for d in self.drho]
+        M = [sp.csr_matrix(Mi) for Mi in self.M]
+        np.testing.assert_allclose(
+            CFIM(rho, drho, M), CFIM(self.rho, self.drho, self.M), atol=1e-10
+        )
+
+    def test_QFIM_Kraus(self):
+        gamma = 0.3
+        K = [np.array([[1, 0], [0, np.sqrt(1 - gamma)]]), np.array([[0, np.sqrt(gamma)], [0, 0]])]
+        dK = [
+            [np.array([[0, 0], [0, -0.5 / np.sqrt(1 - gamma)]])],
+            [np.array([[0, 0.5 / np.sqrt(gamma)], [0, 0]])],
+        ]
+        rho0 = 0.5 * np.ones((2, 2), dtype=np.complex128)
+        F = QFIM_Kraus(rho0, K, dK)
+        K_sparse = [sp.csr_matrix(Ki) for Ki in K]
+        dK_sparse = [[sp.csr_matrix(dKi) for dKi in dKj] for dKj in dK]
+        self.assertAlmostEqual(QFIM_Kraus(rho0, K_sparse, dK_sparse), F, places=8)
+
+
+class TestSupport(unittest.TestCase):
+    def test_low_rank(self):
+        rng = np.random.default_rng(3)
+        A = rng.normal(size=(5, 2)) + 1j * rng.normal(size=(5, 2))
+        rho = A @ A.conj().T
+        rho = rho / np.trace(rho)
+        drho = []
+        for i in range(2):
+            H = rng.normal(size=(5, 5)) + 1j * rng.normal(size=(5, 5))
+            H = H + H.conj().T
+            drho.append(-1j * (H @ rho - rho @ H))
+        F = QFIM(rho, drho)
+        np.testing.assert_allclose(QFIM_support(rho, drho, rank=2), F, atol=1e-6)
+        np.testing.assert_allclose(QFIM_support(None, drho, factor=A / np.linalg.norm(A)), F, atol=1e-6)
+
+
+class TestTrajectory(unittest.TestCase):
+    def test_low_rank(self):
+        # rank-two state rotated by exp(-iHt), the parameter enters through H2
+        rng = np.random.default_rng(5)
+        A = rng.normal(size=(4, 2)) + 1j * rng.normal(size=(4, 2))
+        rho0 = A @ A.conj().T
+        rho0 = rho0 / np.trace(rho0)
+        H = rng.normal(size=(4, 4)) + 1j * rng.normal(size=(4, 4))
+        H = H + H.conj().T
+        H2 = rng.normal(size=(4, 4)) + 1j * rng.normal(size=(4, 4))
+        H2 = H2 + H2.conj().T
+        val, vec = np.linalg.eigh(H)
+        rho_t, drho_t = [], []
+        for t in np.linspace(0.0, 1.0, 11):
+            U = vec @ np.diag(np.exp(-1j * val * t)) @ vec.conj().T
+            rho = U @ rho0 @ U.conj().T
+            rho_t.append(rho)
+            drho_t.append([-1j * t * (H2 @ rho - rho @ H2)])
+        F = np.array([QFIM(rho, drho) for rho, drho in zip(rho_t, drho_t)])
+        np.testing.assert_allclose(
+            np.reshape(QFIM_trajectory(rho_t, drho_t), -1), F, atol=1e-6
+        )
+        np.testing.assert_allclose(
+            np.reshape(QFIM_trajectory(rho_t, drho_t, warm_start=False), -1), F, atol=1e-6
+        )
+
+
+class TestPure(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        psi = rng.normal(size=4) + 1j * rng.normal(size=4)
+        self.psi = psi / np.linalg.norm(psi)
+        H = [rng.normal(size=(4, 4)) + 1j * rng.normal(size=(4, 4)) for i in range(2)]
+        self.dpsi = [-1j * (h + h.conj().T) @ self.psi for h in H]
+        self.rho = np.outer(self.psi, self.psi.conj())
+        self.drho = [
+            np.outer(d, self.psi.conj()) + np.outer(self.psi, d.conj()) for d in self.dpsi
+        ]
+        self.M = [np.diag(np.eye(4)[i]).astype(np.complex128) for i in range(4)]
+
+    def test_QFIM_pure(self):
+        np.testing.assert_allclose(
+            QFIM_pure(self.psi, self.dpsi), QFIM(self.rho, self.drho), atol=1e-6
+        )
+
+    def test_CFIM_pure(self):
+        F = CFIM(self.rho, self.drho, self.M)
+        np.testing.assert_allclose(CFIM_pure(self.psi, self.dpsi, self.M), F, atol=1e-10)
+        # list of sparse POVM elements
+        M_sparse = [sp.csr_matrix(Mi) for Mi in self.M]
+        np.testing.assert_allclose(CFIM_pure(self.psi, self.dpsi, M_sparse), F, atol=1e-10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+from quanestimation import FiniteDifference
+
+
+def qubit(x):
+    # Bloch vector (sin(x0)cos(x1), sin(x0)sin(x1), cos(x0))
+    theta, phi = x
+    r = [np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)]
+    return 0.5 * np.array([[1 + r[2], r[0] - 1j * r[1]], [r[0] + 1j * r[1], 1 - r[2]]])
+
+
+def qubit_derivative(x):
+    theta, phi = x
+    dr = [
+        [np.cos(theta) * np.cos(phi), np.cos(theta) * np.sin(phi), -np.sin(theta)],
+        [-np.sin(theta) * np.sin(phi), np.sin(theta) * np.cos(phi), 0.0],
+    ]
+    return [
+        0.5 * np.array([[d[2], d[0] - 1j * d[1]], [d[0] + 1j * d[1], -d[2]]]) for d in dr
+    ]
+
+
+class TestFiniteDifference(unittest.TestCase):
+    def setUp(self):
+        self.x = [0.7, 0.3]
+
+    def test_central(self):
+        rho, drho = FiniteDifference(qubit)(self.x)
+        np.testing.assert_allclose(rho, qubit(self.x), atol=1e-12)
+        np.testing.assert_allclose(drho, qubit_derivative(self.x), atol=1e-8)
+
+    def test_richardson(self):
+        rho, drho = FiniteDifference(qubit, method="richardson")(self.x)
+        np.testing.assert_allclose(drho, qubit_derivative(self.x), atol=1e-10)
+
+    def test_grid(self):
+        xspan = [[0.1, 0.2], [0.7, 0.3], [1.2, -0.5]]
+        for workers, pool in [(None, "thread"), (2, "thread"), (2, "process")]:
+            rho, drho = FiniteDifference(qubit, workers=workers, pool=pool).grid(xspan)
+            for x, rho_x, drho_x in zip(xspan, rho, drho):
+                np.testing.assert_allclose(rho_x, qubit(x), atol=1e-12)
+                np.testing.assert_allclose(drho_x, qubit_derivative(x), atol=1e-8)
+
+    def test_secondorder(self):
+        theta, phi = self.x
+        rho, drho, d2rho = FiniteDifference(qubit).secondorder_derivative(self.x)
+        # d^2 rho / d phi^2 only changes the x and y components of the Bloch vector
+        d2r = [-np.sin(theta) * np.cos(phi), -np.sin(theta) * np.sin(phi)]
+        expect = 0.5 * np.array([[0.0, d2r[0] - 1j * d2r[1]], [d2r[0] + 1j * d2r[1], 0.0]])
+        np.testing.assert_allclose(d2rho[1], expect, atol=1e-6)
+
+    def test_method(self):
+        with self.assertRaises(ValueError):
+            FiniteDifference(qubit, method="forward")
+
+
+if __name__ == "__main__":
+    unittest.main()
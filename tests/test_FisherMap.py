@@ -0,0 +1,39 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from quanestimation import CFIM_batch, QFIM_batch, cfim_map, qfim_map
+from tests.test_CramerRao import random_batch
+
+
+class TestFisherMap(unittest.TestCase):
+    def setUp(self):
+        self.rho, self.drho = random_batch(np.random.default_rng(6), 10, 3, 2)
+
+    def test_qfim_map(self):
+        F = QFIM_batch(self.rho, self.drho)
+        for executor in ["thread", "process"]:
+            res = qfim_map(self.rho, self.drho, workers=2, executor=executor, chunksize=3)
+            np.testing.assert_allclose(res, F, atol=1e-12)
+
+    def test_cfim_map(self):
+        F = CFIM_batch(self.rho, self.drho)
+        for executor in ["thread", "process"]:
+            res = cfim_map(self.rho, self.drho, workers=2, executor=executor, chunksize=3)
+            np.testing.assert_allclose(res, F, atol=1e-12)
+
+    def test_iterable(self):
+        # generators are consumed chunk by chunk and reported with an unknown total
+        calls = []
+        out = np.zeros((10, 2, 2))
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            res = qfim_map(
+                iter(self.rho), iter(self.drho), executor=executor, chunksize=4,
+                progress=lambda done, total: calls.append((done, total)), out=out,
+            )
+        np.testing.assert_allclose(res, QFIM_batch(self.rho, self.drho), atol=1e-12)
+        self.assertIs(res, out)
+        self.assertEqual(calls[-1], (10, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+from quanestimation import (
+    CFIM_batch, FIM, QFIM_batch, QFIM_trajectory, get_precision, set_precision
+)
+from tests.test_CramerRao import random_batch
+
+
+class TestPrecision(unittest.TestCase):
+    def setUp(self):
+        self.rho, self.drho = random_batch(np.random.default_rng(7), 5, 3, 2)
+
+    def tearDown(self):
+        set_precision("double")
+
+    def compare(self, func):
+        ref = func()
+        set_precision("single")
+        try:
+            res = func()
+        finally:
+            set_precision("double")
+        self.assertEqual(res.dtype, np.float64)
+        np.testing.assert_allclose(res, ref, rtol=1e-5, atol=1e-6)
+
+    def test_QFIM_batch(self):
+        self.compare(lambda: QFIM_batch(self.rho, self.drho))
+
+    def test_QFIM_trajectory(self):
+        self.compare(lambda: QFIM_trajectory(self.rho, self.drho))
+
+    def test_CFIM_batch(self):
+        self.compare(lambda: CFIM_batch(self.rho, self.drho))
+
+    def test_FIM(self):
+        p = np.array([[0.2, 0.3, 0.5], [0.6, 0.3, 0.1]])
+        dp = np.array([[[0.1, -0.3, 0.2]], [[-0.2, 0.1, 0.1]]])
+        self.compare(lambda: np.asarray(FIM(p, dp)))
+
+    def test_set_precision(self):
+        set_precision("single")
+        self.assertEqual(get_precision(), "single")
+        with self.assertRaises(ValueError):
+            set_precision("half")
+        self.assertEqual(get_precision(), "single")
+
+
+if __name__ == "__main__":
+    unittest.main()